@@ -0,0 +1,169 @@
+# backup.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Online Backups
+Consistent snapshots of the live (WAL mode) database via SQLite's backup
+API, rotated and gzip-compressed, with a verified restore
+
+Usage:
+    python backup.py create
+    python backup.py list
+    python backup.py restore backups/soccer_forum-20250101-030000.db.gz
+"""
+
+import argparse
+import glob
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from typing import List, Optional
+
+from config import Config
+
+
+def _snapshot_prefix(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def verify_database(path: str, full: bool = True) -> Optional[str]:
+    """None if the file is a healthy SoccerForum database, otherwise the problem"""
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            check = "integrity_check" if full else "quick_check"
+            result = [row[0] for row in conn.execute(f"PRAGMA {check}")]
+            if result != ['ok']:
+                return "; ".join(result[:5])
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            missing = {'users', 'forums', 'threads', 'replies'} - tables
+            if missing:
+                return f"missing tables: {', '.join(sorted(missing))}"
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return str(e)
+    return None
+
+
+def list_snapshots(db_path: str = Config.DATABASE_PATH, backup_dir: str = Config.BACKUP_DIR) -> List[str]:
+    """Snapshots of db_path, oldest first"""
+    # Timestamped names sort chronologically
+    return sorted(glob.glob(os.path.join(backup_dir, f"{_snapshot_prefix(db_path)}-*.db.gz")))
+
+
+def rotate_snapshots(db_path: str = Config.DATABASE_PATH, backup_dir: str = Config.BACKUP_DIR,
+                     keep: int = Config.BACKUP_KEEP) -> List[str]:
+    """Delete all but the newest `keep` snapshots, returns removed paths"""
+    snapshots = list_snapshots(db_path, backup_dir)
+    removed = snapshots[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def create_backup(db_path: str = Config.DATABASE_PATH, backup_dir: str = Config.BACKUP_DIR) -> str:
+    """Copy the live database in one step, verify it and store it compressed.
+
+    A single step is one read transaction: the snapshot is consistent and,
+    unlike a page-stepped copy, never restarts when another connection
+    writes. In WAL mode those writers keep committing meanwhile. Blocks the
+    calling thread, run it off the event loop.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+    snapshot_path = os.path.join(backup_dir, f"{_snapshot_prefix(db_path)}-{stamp}.db.gz")
+    tmp_path = os.path.join(backup_dir, f".{_snapshot_prefix(db_path)}-{stamp}.db.tmp")
+    started = time.perf_counter()
+
+    try:
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target, pages=-1)
+            # The copy inherits WAL mode, snapshots should be one self-contained file
+            target.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            target.close()
+            source.close()
+
+        problem = verify_database(tmp_path, full=False)
+        if problem:
+            raise RuntimeError(f"Backup copy failed verification: {problem}")
+
+        with open(tmp_path, 'rb') as src, gzip.open(snapshot_path + '.part', 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(snapshot_path + '.part', snapshot_path)
+    finally:
+        for path in (tmp_path, snapshot_path + '.part'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    logging.info(f"Backup written to {snapshot_path} in {time.perf_counter() - started:.1f}s")
+    return snapshot_path
+
+
+def restore_backup(snapshot_path: str, db_path: str = Config.DATABASE_PATH) -> str:
+    """Replace db_path with a verified snapshot, returns where the old file was kept.
+
+    Stop the bot first: open connections would keep writing to the old file.
+    """
+    tmp_path = f"{db_path}.restore"
+    previous_path = f"{db_path}.pre-restore"
+
+    try:
+        with gzip.open(snapshot_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        problem = verify_database(tmp_path, full=True)
+        if problem:
+            raise RuntimeError(f"Snapshot failed integrity check: {problem}")
+
+        if os.path.exists(db_path):
+            os.replace(db_path, previous_path)
+        os.replace(tmp_path, db_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    # A hot journal or WAL left by the old file must not be replayed into the restored one
+    for suffix in ('-journal', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.replace(db_path + suffix, previous_path + suffix)
+
+    return previous_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back up and restore the SoccerForum database")
+    parser.add_argument('--db', default=Config.DATABASE_PATH)
+    parser.add_argument('--dir', default=Config.BACKUP_DIR, help="Snapshot directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('create', help="Take a snapshot now and rotate old ones")
+    commands.add_parser('list', help="Show snapshots")
+    restore_parser = commands.add_parser('restore', help="Restore a snapshot (stop the bot first)")
+    restore_parser.add_argument('snapshot')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'create':
+            path = create_backup(args.db, args.dir)
+            removed = rotate_snapshots(args.db, args.dir)
+            print(f"✅ Snapshot {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB), rotated out {len(removed)}")
+        elif args.command == 'list':
+            for path in list_snapshots(args.db, args.dir):
+                print(f"   {path}  {os.path.getsize(path) / 1024 / 1024:8.1f} MB")
+        else:
+            print(f"🔍 Verifying {args.snapshot}...")
+            previous = restore_backup(args.snapshot, args.db)
+            print(f"✅ Restored {args.db} (previous file kept at {previous})")
+    except Exception as e:
+        print(f"❌ {args.command.title()} failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,419 @@
+# benchmark.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Database Benchmark Suite
+Times every public SuperDatabase method on seeded databases
+
+Usage:
+    python benchmark.py --sizes 10000 100000 1000000 --output bench.json
+    python benchmark.py --baseline bench.json --threshold 0.25
+    python benchmark.py --sizes 100000 --memory
+    python benchmark.py --sizes 100000 --cards
+"""
+
+import argparse
+import asyncio
+import gc
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from itertools import islice
+from typing import Dict, List, Any, Callable, Tuple
+
+from config import Config
+from datamanager import SuperDatabase
+from seed_data import seed_database
+
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DEFAULT_REPEAT = 50
+MIN_REGRESSION_MS = 0.05  # Ignore deltas below timer noise
+
+# Startup/schema helpers that are not on any request path
+SKIPPED_METHODS = {
+    'get_connection', 'initialize_database', 'migrate_columns', 'insert_default_data',
+    'load_level_thresholds', 'backfill_hot_scores', 'backfill_activity_rollup', 'create_indexes', 'drop_indexes',
+    'iter_table', 'load_fingerprints'
+}
+
+
+class BenchContext:
+    """Id ranges and a seeded RNG for picking realistic arguments"""
+
+    def __init__(self, db: SuperDatabase, seed: int = 7):
+        self.rng = random.Random(seed)
+        with db.get_connection() as conn:
+            self.user_range = conn.execute("SELECT MIN(telegram_id), MAX(telegram_id) FROM users").fetchone()
+            self.thread_range = conn.execute("SELECT MIN(id), MAX(id) FROM threads").fetchone()
+            self.tournament_range = conn.execute("SELECT MIN(id), MAX(id) FROM tournaments").fetchone()
+            self.forum_ids = [row[0] for row in conn.execute("SELECT id FROM forums")]
+            self.badge_names = [row[0] for row in conn.execute("SELECT name FROM badges")]
+
+    def user(self) -> int:
+        return self.rng.randint(*self.user_range)
+
+    def thread(self) -> int:
+        return self.rng.randint(*self.thread_range)
+
+    def tournament(self) -> int:
+        return self.rng.randint(*self.tournament_range)
+
+    def forum(self) -> int:
+        return self.rng.choice(self.forum_ids)
+
+
+# Method name -> (call(db, ctx), repeat override or None)
+BENCHMARKS: Dict[str, Any] = {
+    'get_user': (lambda db, ctx: db.get_user(ctx.user()), None),
+    'create_default_user': (lambda db, ctx: db.create_default_user(ctx.user()), None),
+    'save_user': (lambda db, ctx: db.save_user(ctx.user(), {'username': 'bench', 'experience': 10}), None),
+    'update_user_stats': (lambda db, ctx: db.update_user_stats(ctx.user(), {'experience': 5, 'post_count': 1}), None),
+    'award_experience': (lambda db, ctx: db.award_experience(ctx.user(), 'reply_posted'), None),
+    'get_level_progress': (lambda db, ctx: db.get_level_progress(ctx.rng.randint(0, 100000)), None),
+    'get_tournaments': (lambda db, ctx: db.get_tournaments(status='pending', limit=6), None),
+    'get_tournament': (lambda db, ctx: db.get_tournament(ctx.tournament()), None),
+    'create_tournament': (lambda db, ctx: db.create_tournament({
+        'name': 'Bench Cup', 'game_version': 'FIFA 14', 'max_teams': 16,
+        'description': 'Benchmark', 'creator_id': ctx.user()
+    }), None),
+    'join_tournament': (lambda db, ctx: db.join_tournament(ctx.user(), ctx.tournament()), None),
+    'complete_tournament': (lambda db, ctx: db.complete_tournament(ctx.tournament(), ctx.user()), None),
+    'get_tournament_participants': (lambda db, ctx: db.get_tournament_participants(ctx.tournament()), None),
+    'get_tournament_players': (lambda db, ctx: db.get_tournament_players(ctx.tournament()), None),
+    'get_forums': (lambda db, ctx: db.get_forums(featured_only=True), None),
+    'get_forum': (lambda db, ctx: db.get_forum(ctx.forum()), None),
+    'get_threads': (lambda db, ctx: db.get_threads(forum_id=ctx.forum(), limit=5), None),
+    'get_thread': (lambda db, ctx: db.get_thread(ctx.thread()), None),
+    'create_thread': (lambda db, ctx: db.create_thread({
+        'title': 'Bench thread', 'content': 'Benchmark', 'forum_id': ctx.forum(), 'creator_id': ctx.user()
+    }), None),
+    'record_thread_view': (lambda db, ctx: db.record_thread_view(ctx.thread()), None),
+    'flush_thread_views': (lambda db, ctx: [db.record_thread_view(ctx.thread()) for _ in range(50)] and db.flush_thread_views(), None),
+    'get_popular_threads': (lambda db, ctx: db.get_popular_threads(forum_id=ctx.forum(), limit=8), None),
+    'decay_hot_scores': (lambda db, ctx: db.decay_hot_scores(), 3),
+    'archive_old_threads': (lambda db, ctx: db.archive_old_threads(), 3),
+    'purge_user': (lambda db, ctx: db.purge_user(ctx.user(), dry_run=True), None),
+    'reconcile_counters': (lambda db, ctx: db.reconcile_counters(), 3),
+    'get_replies': (lambda db, ctx: db.get_replies(ctx.thread()), None),
+    'create_reply': (lambda db, ctx: db.create_reply({
+        'content': 'Benchmark reply', 'thread_id': ctx.thread(), 'user_id': ctx.user()
+    }), None),
+    'check_duplicate': (lambda db, ctx: db.check_duplicate(
+        ctx.user(), 'Cheap FIFA coins at the best price, fast delivery on every platform, message me now'
+    ), None),
+    'prune_fingerprints': (lambda db, ctx: db.prune_fingerprints(), 3),
+    'follow_user': (lambda db, ctx: db.follow_user(ctx.user(), ctx.user()), None),
+    'unfollow_user': (lambda db, ctx: db.unfollow_user(ctx.user(), ctx.user()), None),
+    'get_user_followers': (lambda db, ctx: db.get_user_followers(ctx.user()), None),
+    'get_user_following': (lambda db, ctx: db.get_user_following(ctx.user()), None),
+    'follow_forum': (lambda db, ctx: db.follow_forum(ctx.user(), ctx.forum()), None),
+    'unfollow_forum': (lambda db, ctx: db.unfollow_forum(ctx.user(), ctx.forum()), None),
+    'get_user_forum_follows': (lambda db, ctx: db.get_user_forum_follows(ctx.user()), None),
+    'get_user_followed_forums': (lambda db, ctx: db.get_user_followed_forums(ctx.user()), None),
+    'get_user_following_profiles': (lambda db, ctx: db.get_user_following_profiles(ctx.user()), None),
+    'get_feed': (lambda db, ctx: db.get_feed(ctx.user()), None),
+    'invalidate_feed': (lambda db, ctx: db.invalidate_feed(ctx.user()), None),
+    # Cold lookups: drop the cached set so the query is what gets timed
+    'get_following_set': (lambda db, ctx: db.invalidate_follows(ctx.user()) or db.get_following_set(ctx.user()), None),
+    'is_following': (lambda db, ctx: db.invalidate_follows(ctx.user()) or db.is_following(ctx.user(), ctx.user()), None),
+    'invalidate_follows': (lambda db, ctx: db.invalidate_follows(ctx.user()), None),
+    'get_badges': (lambda db, ctx: db.get_badges(), None),
+    'award_badge': (lambda db, ctx: db.award_badge(ctx.user(), ctx.rng.choice(ctx.badge_names)), None),
+    'get_user_badges': (lambda db, ctx: db.get_user_badges(ctx.user()), None),
+    'get_quick_stats': (lambda db, ctx: db.get_quick_stats(), 10),
+    'get_window_start': (lambda db, ctx: db.get_window_start('week'), None),
+    'get_windowed_rankings': (lambda db, ctx: db.get_windowed_rankings('week', limit=10), 10),
+    'get_user_rankings': (lambda db, ctx: db.get_user_rankings(limit=10), 10),
+    'get_all_users': (lambda db, ctx: db.get_all_users(limit=20), 10),
+    'search_users': (lambda db, ctx: db.search_users('player_1'), None),
+    'get_forums_menu': (lambda db, ctx: db.get_forums_menu(ctx.user()), None),
+    'get_forum_card': (lambda db, ctx: db.get_forum_card(ctx.user(), ctx.forum()), None),
+    'get_thread_card': (lambda db, ctx: db.get_thread_card(ctx.thread()), None),
+    'get_profile_card': (lambda db, ctx: db.get_profile_card(ctx.user(), ctx.user()), None),
+    # Streaming: time to pull the first 1000 rows
+    'iter_users': (lambda db, ctx: list(islice(db.iter_users(), 1000)), 10),
+    'iter_forums': (lambda db, ctx: list(db.iter_forums()), 10),
+    'iter_threads': (lambda db, ctx: list(islice(db.iter_threads(), 1000)), 10),
+    'iter_replies': (lambda db, ctx: list(islice(db.iter_replies(), 1000)), 10),
+    'iter_tournaments': (lambda db, ctx: list(islice(db.iter_tournaments(), 1000)), 10)
+}
+
+
+# Case -> (legacy dict(row) query, model-returning call); {thread} is the largest thread
+MEMORY_CASES: Dict[str, Any] = {
+    'get_replies (largest thread)': (
+        "SELECT r.*, u.username FROM replies r JOIN users u ON r.user_id = u.telegram_id "
+        "WHERE r.thread_id = {thread} ORDER BY r.created_at ASC",
+        lambda db, thread: db.get_replies(thread)
+    ),
+    'get_threads (1000)': (
+        "SELECT t.*, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id "
+        "ORDER BY t.created_at DESC LIMIT 1000",
+        lambda db, thread: db.get_threads(limit=1000)
+    ),
+    'get_user_rankings (1000)': (
+        "SELECT telegram_id, username, level, reputation, threads_created, replies_posted FROM users "
+        "ORDER BY reputation DESC LIMIT 1000",
+        lambda db, thread: db.get_user_rankings(limit=1000)
+    ),
+    'get_all_users (1000)': (
+        "SELECT telegram_id, username, level, reputation FROM users ORDER BY reputation DESC LIMIT 1000",
+        lambda db, thread: db.get_all_users(limit=1000)
+    )
+}
+
+
+# Card -> (build(cards, ctx), most statements one render may run)
+CARD_BUDGETS: Dict[str, Any] = {
+    'create_forums_menu': (lambda cards, ctx: cards.create_forums_menu(ctx.user()), 1),
+    'create_forum_card': (lambda cards, ctx: cards.create_forum_card(ctx.user(), ctx.forum()), 1),
+    'create_thread_card': (lambda cards, ctx: cards.create_thread_card(ctx.user(), ctx.thread()), 1),
+    'create_user_profile_card': (lambda cards, ctx: cards.create_user_profile_card(ctx.user(), ctx.user()), 1)
+}
+
+
+def public_methods() -> List[str]:
+    """Public SuperDatabase methods that must be benchmarked"""
+    return [
+        name for name, member in inspect.getmembers(SuperDatabase, inspect.isfunction)
+        if not name.startswith('_') and name not in SKIPPED_METHODS
+    ]
+
+
+def scale_profile(size: int) -> Dict[str, int]:
+    """Row counts for a scale, `size` is the largest table (replies)"""
+    return {
+        'users': max(100, size // 10),
+        'threads': max(50, size // 5),
+        'replies': size,
+        'follows': size // 2,
+        'forum_follows': size // 10,
+        'tournaments': max(10, size // 1000),
+        'participants': size // 50,
+        'badges': size // 20
+    }
+
+
+def prepare_database(workdir: str, size: int, reseed: bool = False) -> str:
+    """Seed (or reuse) the benchmark database for a scale"""
+    db_path = os.path.join(workdir, f"bench_{size}.db")
+    if reseed or not os.path.exists(db_path):
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        print(f"🌱 Seeding {db_path}...")
+        seed_database(db_path, **scale_profile(size))
+    return db_path
+
+
+def time_method(db: SuperDatabase, ctx: BenchContext, call: Callable, repeat: int) -> Dict[str, float]:
+    """Run one benchmark and summarize latencies in milliseconds"""
+    call(db, ctx)  # warm page cache and statement cache
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call(db, ctx)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        'runs': repeat,
+        'min_ms': samples[0],
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'max_ms': samples[-1]
+    }
+
+
+def run_benchmarks(db_path: str, repeat: int, only: List[str] = None) -> Dict[str, Any]:
+    """Benchmark every public method against a scratch copy of one database"""
+    # Write benchmarks mutate data, keep the seeded file pristine for later runs
+    run_path = db_path.replace('.db', '.run.db')
+    archive_path = db_path.replace('.db', '.archive.db')
+    shutil.copyfile(db_path, run_path)
+    db = SuperDatabase(run_path, archive_path=archive_path)
+    ctx = BenchContext(db)
+    results = {}
+
+    for name in public_methods():
+        if only and name not in only:
+            continue
+        call, repeat_override = BENCHMARKS[name]
+        results[name] = time_method(db, ctx, call, repeat_override or repeat)
+        print(f"   {name:<32} median {results[name]['median_ms']:8.3f} ms   p95 {results[name]['p95_ms']:8.3f} ms")
+
+    for path in (run_path, archive_path):
+        if os.path.exists(path):
+            os.remove(path)
+    return results
+
+
+def retained_bytes(build: Callable) -> Tuple[int, int]:
+    """Python heap bytes still held by build()'s result, and its length"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained, len(result)
+
+
+def run_memory_benchmarks(db_path: str) -> Dict[str, Any]:
+    """Compare slot records with projections against the old dict(row) lists"""
+    db = SuperDatabase(db_path)
+    with db.get_connection() as conn:
+        thread = conn.execute("SELECT id FROM threads ORDER BY reply_count DESC LIMIT 1").fetchone()[0]
+
+    results = {}
+    for name, (legacy_sql, call) in MEMORY_CASES.items():
+        def legacy():
+            with db.get_connection() as conn:
+                return [dict(row) for row in conn.execute(legacy_sql.format(thread=thread)).fetchall()]
+
+        dict_bytes, rows = retained_bytes(legacy)
+        record_bytes, _ = retained_bytes(lambda: call(db, thread))
+        results[name] = {
+            'rows': rows,
+            'dict_bytes': dict_bytes,
+            'record_bytes': record_bytes,
+            'saving_percent': (1 - record_bytes / dict_bytes) * 100 if dict_bytes else 0.0
+        }
+        print(f"   {name:<32} {rows:6d} rows   dicts {dict_bytes / 1024:9.1f} KiB   "
+              f"records {record_bytes / 1024:9.1f} KiB   (-{results[name]['saving_percent']:.0f}%)")
+    return results
+
+
+def statements_run() -> int:
+    from querylog import query_stats
+    return sum(row['count'] for row in query_stats.snapshot())
+
+
+def check_card_budgets(db_path: str, samples: int = 20) -> Dict[str, Any]:
+    """Most statements each card ran over `samples` renders, against its budget"""
+    from bot import CardSystem  # needs python-telegram-bot, unlike the rest of this script
+
+    run_path = db_path.replace('.db', '.cards.db')
+    archive_path = db_path.replace('.db', '.cards-archive.db')
+    shutil.copyfile(db_path, run_path)
+    # Only connections opened while this is set are instrumented
+    Config.QUERY_STATS_ENABLED = True
+    results = {}
+    try:
+        db = SuperDatabase(run_path, archive_path=archive_path)
+        ctx = BenchContext(db)
+        cards = CardSystem(db)
+        for name, (build, budget) in CARD_BUDGETS.items():
+            worst = 0
+            for _ in range(samples):
+                before = statements_run()
+                asyncio.run(build(cards, ctx))
+                worst = max(worst, statements_run() - before)
+            results[name] = {'budget': budget, 'statements': worst}
+            print(f"   {name:<32} {worst} statement(s)   budget {budget}   {'✅' if worst <= budget else '❌'}")
+    finally:
+        Config.QUERY_STATS_ENABLED = False
+        for path in (run_path, archive_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return results
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List methods whose median regressed more than threshold (fraction) vs baseline"""
+    regressions = []
+    for size, methods in results['sizes'].items():
+        base_methods = baseline.get('sizes', {}).get(size, {})
+        for name, stats in methods.items():
+            base = base_methods.get(name)
+            if not base:
+                continue
+            limit = base['median_ms'] * (1 + threshold)
+            if stats['median_ms'] > limit and stats['median_ms'] - base['median_ms'] > MIN_REGRESSION_MS:
+                regressions.append(
+                    f"{name} @ {size}: {base['median_ms']:.3f} ms -> {stats['median_ms']:.3f} ms "
+                    f"(+{(stats['median_ms'] / base['median_ms'] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SuperDatabase methods")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Scales (rows in the largest table)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed calls per method")
+    parser.add_argument('--workdir', default='.', help="Where seeded databases are kept between runs")
+    parser.add_argument('--reseed', action='store_true', help="Rebuild seeded databases")
+    parser.add_argument('--only', nargs='+', help="Benchmark only these methods")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="Saved results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed median slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument('--memory', action='store_true', help="Also compare result memory against dict rows")
+    parser.add_argument('--cards', action='store_true', help="Also check statements per card against CARD_BUDGETS")
+    args = parser.parse_args()
+
+    missing = [name for name in public_methods() if name not in BENCHMARKS]
+    if missing:
+        print(f"❌ No benchmark defined for: {', '.join(missing)}")
+        sys.exit(2)
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'machine': platform.machine(),
+            'repeat': args.repeat
+        },
+        'sizes': {},
+        'memory': {},
+        'cards': {}
+    }
+
+    for size in args.sizes:
+        db_path = prepare_database(args.workdir, size, args.reseed)
+        print(f"📊 Benchmarking {size} rows")
+        results['sizes'][str(size)] = run_benchmarks(db_path, args.repeat, args.only)
+        if args.memory:
+            print(f"🧠 Result memory at {size} rows")
+            results['memory'][str(size)] = run_memory_benchmarks(db_path)
+        if args.cards:
+            print(f"🧮 Statements per card at {size} rows")
+            results['cards'][str(size)] = check_card_budgets(db_path)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print("❌ Regressions beyond threshold:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+    over_budget = [
+        f"{name} @ {size}: {card['statements']} statements (budget {card['budget']})"
+        for size, cards in results['cards'].items() for name, card in cards.items()
+        if card['statements'] > card['budget']
+    ]
+    if over_budget:
+        print("❌ Cards over their statement budget:")
+        for line in over_budget:
+            print(f"   {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
@@ -6,18 +6,46 @@
 
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Set
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters, ConversationHandler
+from telegram.ext import (
+    Application, BaseUpdateProcessor, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, TypeHandler, filters,
+    ConversationHandler
+)
+from telegram.request import BaseRequest, HTTPXRequest
 
 from config import Config
 from datamanager import SuperDatabase
+from querylog import query_stats
+from metrics import (
+    registry, track_handler, instrument_database, callback_route, callbacks_throttled, edits_skipped, user_data_evicted,
+    TimedRequest, MetricsServer, dump_metrics
+)
+from loopwatch import LoopWatchdog
+from profiler import profile_loop
+from backup import create_backup, rotate_snapshots
+from ratelimit import CallbackThrottle
+from rendercache import RenderedMessages
+from singleflight import SingleFlight
+from events import LevelUp
 
 
 # ==================== CARD SYSTEM ====================
 class CardSystem:
     def __init__(self, db):
         self.db = db
+        # Identical reads from users viewing the same card share one query
+        self.flights = SingleFlight() if Config.SINGLE_FLIGHT_ENABLED else None
+
+    async def read(self, method: str, *args, **kwargs) -> Any:
+        """Run a read-only SuperDatabase method in a worker thread, coalesced per method and arguments"""
+        call = lambda: asyncio.to_thread(getattr(self.db, method), *args, **kwargs)
+        if self.flights is None:
+            return await call()
+        return await self.flights.do((method, args, tuple(sorted(kwargs.items()))), call)
 
     def truncate_text(self, text: str, max_length: int = Config.TRUNCATE_LENGTH) -> str:
         """Truncate text with ellipsis"""
@@ -35,7 +63,7 @@ class CardSystem:
     async def create_main_menu(self, user_id: int) -> Dict[str, Any]:
         """Create main menu card"""
         user = self.db.get_user(user_id)
-        stats = self.db.get_quick_stats()
+        stats = await self.read('get_quick_stats')
         
         menu_text = (
             f"🎮 *Welcome to SoccerForum, {user.get('username', 'Player')}!* 🏆\n\n"
@@ -73,8 +101,8 @@ class CardSystem:
     # ==================== TOURNAMENT CARDS ====================
     async def create_tournaments_menu(self, user_id: int) -> Dict[str, Any]:
         """Create tournaments menu card"""
-        tournaments = self.db.get_tournaments(status='pending', limit=6)
-        stats = self.db.get_quick_stats()
+        tournaments = await self.read('get_tournaments', status='pending', limit=6)
+        stats = await self.read('get_quick_stats')
         
         menu_text = (
             "⚽ *Tournament Hub* 🏆\n\n"
@@ -108,11 +136,12 @@ class CardSystem:
 
     async def create_tournament_card(self, user_id: int, tournament_id: int) -> Dict[str, Any]:
         """Create detailed tournament card"""
-        tournament = self.db.get_tournament(tournament_id)
+        tournament, participants = await asyncio.gather(
+            self.read('get_tournament', tournament_id), self.read('get_tournament_participants', tournament_id)
+        )
         if not tournament:
             return await self.create_error_card("Tournament not found")
         
-        participants = self.db.get_tournament_participants(tournament_id)
         user_joined = user_id in participants
         
         # Status emoji
@@ -151,6 +180,10 @@ class CardSystem:
             else:
                 keyboard.append([InlineKeyboardButton("✅ Join Tournament", callback_data=f"tournament_join_{tournament_id}")])
         
+        # Creator can close the tournament by declaring a winner
+        if tournament['creator_id'] == user_id and tournament['status'] != 'completed' and participants:
+            keyboard.append([InlineKeyboardButton("🏆 Declare Winner", callback_data=f"tournament_winner_{tournament_id}")])
+        
         # Additional buttons
         keyboard.extend([
             [InlineKeyboardButton("📋 Fixtures", callback_data=f"tournament_fixtures_{tournament_id}")],
@@ -165,24 +198,59 @@ class CardSystem:
             'parse_mode': 'Markdown'
         }
 
+    async def create_declare_winner_card(self, user_id: int, tournament_id: int, page: int = 0) -> Dict[str, Any]:
+        """Create paginated winner selection card for the tournament creator"""
+        tournament = self.db.get_tournament(tournament_id)
+        if not tournament or tournament['creator_id'] != user_id:
+            return await self.create_error_card("Only the tournament creator can declare a winner.")
+        
+        page_size = Config.TOURNAMENT_PLAYERS_PAGE_SIZE
+        players = self.db.get_tournament_players(tournament_id, limit=page_size + 1, offset=page * page_size)
+        has_next = len(players) > page_size
+        players = players[:page_size]
+        card_text = f"🏆 *Declare Winner* • Page {page + 1}\n\n{tournament['name']}\n\nWho won the tournament?"
+        
+        keyboard = []
+        for player in players:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"🥇 {player['username'] or 'Player'}",
+                    callback_data=f"tournament_win_{tournament_id}_{player['telegram_id']}"
+                )
+            ])
+        
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"tournament_winner_{tournament_id}_{page - 1}"))
+        if has_next:
+            nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"tournament_winner_{tournament_id}_{page + 1}"))
+        if nav_buttons:
+            keyboard.append(nav_buttons)
+        
+        keyboard.append([InlineKeyboardButton("🔙 Tournament", callback_data=f"tournament_view_{tournament_id}")])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
     # ==================== FORUM CARDS ====================
     async def create_forums_menu(self, user_id: int) -> Dict[str, Any]:
         """Create forums menu card"""
-        forums = self.db.get_forums(featured_only=True)
-        user_follows = self.db.get_user_forum_follows(user_id)
-        stats = self.db.get_quick_stats()
+        menu = self.db.get_forums_menu(user_id)
         
         menu_text = (
             "💬 *Forum Hub* 📚\n\n"
-            f"📊 {stats.get('total_threads', 0)} threads • 💭 {stats.get('total_replies', 0)} replies\n\n"
+            f"📊 {menu['total_threads']} threads • 💭 {menu['total_replies']} replies\n\n"
             "Join discussions about your favorite football games!\n"
         )
         
         keyboard = []
         
         # Create forum cards with icons and stats
-        for forum in forums:
-            follow_emoji = "❤️" if forum['id'] in user_follows else "💙"
+        for forum in menu['forums']:
+            follow_emoji = "❤️" if forum['is_following'] else "💙"
             button_text = f"{forum['icon']} {self.truncate_text(forum['name'])} ({forum['thread_count']}) {follow_emoji}"
             keyboard.append([
                 InlineKeyboardButton(button_text, callback_data=f"forum_view_{forum['id']}")
@@ -205,13 +273,12 @@ class CardSystem:
 
     async def create_forum_card(self, user_id: int, forum_id: int) -> Dict[str, Any]:
         """Create detailed forum card"""
-        forum = self.db.get_forum(forum_id)
-        if not forum:
+        card = self.db.get_forum_card(user_id, forum_id)
+        if not card:
             return await self.create_error_card("Forum not found")
         
-        threads = self.db.get_threads(forum_id=forum_id, limit=5)
-        user_follows = self.db.get_user_forum_follows(user_id)
-        is_following = forum_id in user_follows
+        forum, threads = card['forum'], card['threads']
+        is_following = forum['is_following']
         
         # Create visual forum card
         card_text = (
@@ -226,7 +293,7 @@ class CardSystem:
         # Add recent threads
         if threads:
             card_text += "📝 *Recent Threads:*\n"
-            for thread in threads[:3]:
+            for thread in threads:
                 card_text += f"• {self.truncate_text(thread['title'])} by {thread['creator_name']} ({thread['reply_count']}💬)\n"
             card_text += "\n"
         
@@ -242,6 +309,8 @@ class CardSystem:
         keyboard.extend([
             [InlineKeyboardButton("📝 New Thread", callback_data=f"thread_create_{forum_id}")],
             [InlineKeyboardButton("📚 Browse Threads", callback_data=f"forum_threads_{forum_id}")],
+            [InlineKeyboardButton("🔥 Popular", callback_data=f"forum_popular_{forum_id}")],
+            [InlineKeyboardButton("📊 Top Posters", callback_data=f"leaderboard_month_{forum_id}")],
             [InlineKeyboardButton("💬 Forums", callback_data="forums")],
             [InlineKeyboardButton("🔙 Main Menu", callback_data="menu")]
         ])
@@ -252,13 +321,120 @@ class CardSystem:
             'parse_mode': 'Markdown'
         }
 
+    async def create_popular_threads_card(self, user_id: int, forum_id: int = None) -> Dict[str, Any]:
+        """Create popular threads card (global or per forum)"""
+        forum = None
+        if forum_id:
+            forum = self.db.get_forum(forum_id)
+            if not forum:
+                return await self.create_error_card("Forum not found")
+        
+        threads = await self.read('get_popular_threads', forum_id=forum_id, limit=Config.MAX_ROWS_PER_CARD)
+        
+        card_text = f"🔥 *Popular in {forum['name']}*\n\n" if forum else "🔥 *Popular Threads*\n\n"
+        if threads:
+            card_text += "The hottest discussions right now:\n"
+        else:
+            card_text += "Nothing trending yet. Start a discussion!\n"
+        
+        keyboard = []
+        for thread in threads:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"🔥 {self.truncate_text(thread['title'])} ({thread['reply_count']}💬)",
+                    callback_data=f"thread_view_{thread['id']}"
+                )
+            ])
+        
+        if forum:
+            keyboard.append([InlineKeyboardButton("🔙 Forum", callback_data=f"forum_view_{forum_id}")])
+        keyboard.extend([
+            [InlineKeyboardButton("💬 Forums", callback_data="forums")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
+    async def create_feed_card(self, user_id: int, before_id: int = None) -> Dict[str, Any]:
+        """Create personalized feed card from followed forums and users"""
+        threads = self.db.get_feed(user_id, before_id=before_id)
+        personalized = bool(threads) or before_id is not None
+        if not personalized:
+            threads = self.db.get_threads(limit=Config.FEED_PAGE_SIZE)
+        
+        if personalized:
+            card_text = "🕒 *Your Feed*\n\nLatest threads from forums and players you follow:\n"
+        else:
+            card_text = (
+                "🕒 *Recent Threads*\n\n"
+                "Follow forums and players to personalize this feed!\n"
+            )
+        if not threads:
+            card_text += "\nNo more threads."
+        
+        keyboard = []
+        for thread in threads:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"📝 {self.truncate_text(thread['title'])} • {thread['creator_name']}",
+                    callback_data=f"thread_view_{thread['id']}"
+                )
+            ])
+        
+        if personalized and len(threads) >= Config.FEED_PAGE_SIZE:
+            keyboard.append([InlineKeyboardButton("⏬ Older", callback_data=f"feed_more_{threads[-1]['id']}")])
+        keyboard.extend([
+            [InlineKeyboardButton("💬 Forums", callback_data="forums")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
+    async def create_my_forums_card(self, user_id: int) -> Dict[str, Any]:
+        """Create card listing followed forums"""
+        forums = self.db.get_user_followed_forums(user_id)
+        
+        if forums:
+            card_text = f"📚 *My Forums ({len(forums)})*\n\nForums you follow:\n"
+        else:
+            card_text = "📚 *My Forums*\n\nYou don't follow any forums yet. Open a forum and tap ❤️ Follow!\n"
+        
+        keyboard = []
+        for forum in forums:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"{forum['icon']} {self.truncate_text(forum['name'])} ({forum['thread_count']})",
+                    callback_data=f"forum_view_{forum['id']}"
+                )
+            ])
+        
+        keyboard.extend([
+            [InlineKeyboardButton("🕒 My Feed", callback_data="forum_recent")],
+            [InlineKeyboardButton("💬 Forums", callback_data="forums")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
     async def create_thread_card(self, user_id: int, thread_id: int) -> Dict[str, Any]:
         """Create thread card"""
-        thread = self.db.get_thread(thread_id)
-        if not thread:
+        card = await self.read('get_thread_card', thread_id)
+        if not card:
             return await self.create_error_card("Thread not found")
         
-        replies = self.db.get_replies(thread_id)
+        thread, replies = card['thread'], card['replies']
         
         card_text = (
             f"📄 *{thread['title']}*\n\n"
@@ -273,14 +449,14 @@ class CardSystem:
         # Add recent replies preview
         if replies:
             card_text += "--- *Recent Replies* ---\n"
-            for reply in replies[:3]:
+            for reply in replies:
                 card_text += f"\n👤 *{reply['username']}:*\n{reply['content'][:100]}"
                 if len(reply['content']) > 100:
                     card_text += "..."
                 card_text += f"\n🕒 {reply['created_at'][:16]}\n"
         
-        if len(replies) > 3:
-            card_text += f"\n... and {len(replies) - 3} more replies"
+        if thread['reply_count'] > len(replies):
+            card_text += f"\n... and {thread['reply_count'] - len(replies)} more replies"
         
         keyboard = [
             [InlineKeyboardButton("💬 Reply", callback_data=f"reply_create_{thread_id}")],
@@ -296,11 +472,48 @@ class CardSystem:
             'parse_mode': 'Markdown'
         }
 
+    async def create_replies_card(self, user_id: int, thread_id: int, page: int = 0) -> Dict[str, Any]:
+        """Create paginated replies card"""
+        thread = await self.read('get_thread', thread_id)
+        if not thread:
+            return await self.create_error_card("Thread not found")
+        
+        page_size = Config.REPLIES_PAGE_SIZE
+        # One extra row tells us whether a next page exists without a COUNT
+        replies = await self.read('get_replies', thread_id, limit=page_size + 1, offset=page * page_size)
+        has_next = len(replies) > page_size
+        replies = replies[:page_size]
+        
+        card_text = f"📋 *{thread['title']}* • Page {page + 1}\n\n"
+        for reply in replies:
+            card_text += f"👤 *{reply['username']}:*\n{reply['content'][:300]}\n🕒 {reply['created_at'][:16]}\n\n"
+        if not replies:
+            card_text += "No replies yet. Be the first!"
+        
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"thread_replies_{thread_id}_{page - 1}"))
+        if has_next:
+            nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"thread_replies_{thread_id}_{page + 1}"))
+        
+        keyboard = [nav_buttons] if nav_buttons else []
+        keyboard += [
+            [InlineKeyboardButton("💬 Reply", callback_data=f"reply_create_{thread_id}")],
+            [InlineKeyboardButton("🔙 Thread", callback_data=f"thread_view_{thread_id}")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ]
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
     # ==================== SOCIAL CARDS ====================
     async def create_social_menu(self, user_id: int) -> Dict[str, Any]:
         """Create social menu card"""
         user = self.db.get_user(user_id)
-        stats = self.db.get_quick_stats()
+        stats = await self.read('get_quick_stats')
         
         menu_text = (
             "👥 *Social Hub* 🌐\n\n"
@@ -334,27 +547,21 @@ class CardSystem:
 
     async def create_user_profile_card(self, user_id: int, target_user_id: int) -> Dict[str, Any]:
         """Create user profile card"""
-        user = self.db.get_user(target_user_id)
-        if not user:
-            return await self.create_error_card("User not found")
-        
-        badges = self.db.get_user_badges(target_user_id)
-        is_following = target_user_id in self.db.get_user_following(user_id)
+        card = self.db.get_profile_card(user_id, target_user_id)
+        user, badges = card['user'], card['badges']
+        is_following = user['is_following']
         is_self = user_id == target_user_id
         
         # Calculate progress to next level
-        current_level_xp = (user['level'] - 1) * 100
-        next_level_xp = user['level'] * 100
-        xp_progress = user['experience'] - current_level_xp
-        xp_required = next_level_xp - current_level_xp
-        progress_percent = (xp_progress / xp_required) * 100 if xp_required > 0 else 100
+        progress = self.db.get_level_progress(user['experience'])
+        progress_percent = progress['progress_percent']
         
         # Create progress bar
         progress_bar = self.format_progress_bar(progress_percent)
         
         card_text = (
             f"👤 *{user['username']}* {'(You)' if is_self else ''}\n\n"
-            f"🎯 *Level {user['level']}* • ⭐ {user['reputation']} Rep\n"
+            f"🎯 *Level {progress['level']}* • ⭐ {user['reputation']} Rep\n"
             f"{progress_bar} {progress_percent:.0f}%\n"
             f"📝 {user['threads_created']} threads • 💬 {user['replies_posted']} replies\n"
             f"⚽ {user['tournaments_joined']} tournaments\n"
@@ -363,11 +570,12 @@ class CardSystem:
         
         # Add badges section
         if badges:
-            card_text += f"🏆 *Badges ({len(badges)}):*\n"
-            for badge in badges[:3]:
-                card_text += f"• {badge.get('badge_name', 'Achievement')}\n"
-            if len(badges) > 3:
-                card_text += f"... and {len(badges) - 3} more\n"
+            badge_count = max(user['badge_count'] or 0, len(badges))
+            card_text += f"🏆 *Badges ({badge_count}):*\n"
+            for badge in badges:
+                card_text += f"• {badge or 'Achievement'}\n"
+            if badge_count > len(badges):
+                card_text += f"... and {badge_count - len(badges)} more\n"
         else:
             card_text += "🎯 *No badges yet!* Be active to earn achievements.\n"
         
@@ -391,11 +599,41 @@ class CardSystem:
             'parse_mode': 'Markdown'
         }
 
+    async def create_following_card(self, user_id: int) -> Dict[str, Any]:
+        """Create card listing followed players"""
+        following = self.db.get_user_following_profiles(user_id, limit=Config.MAX_ROWS_PER_CARD)
+        
+        if following:
+            card_text = "❤️ *Following*\n\nPlayers you follow:\n"
+        else:
+            card_text = "❤️ *Following*\n\nYou're not following anyone yet. Find players to follow!\n"
+        
+        keyboard = []
+        for user in following:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"👤 {user['username']} (Lv.{user['level']})",
+                    callback_data=f"social_view_{user['telegram_id']}"
+                )
+            ])
+        
+        keyboard.extend([
+            [InlineKeyboardButton("🕒 My Feed", callback_data="forum_recent")],
+            [InlineKeyboardButton("🔙 Social", callback_data="social")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
     async def create_find_users_card(self, user_id: int) -> Dict[str, Any]:
         """Create user discovery card"""
         # Get recommended users (excluding self and already followed)
         all_users = self.db.get_all_users(limit=20)
-        following = self.db.get_user_following(user_id)
+        following = self.db.get_following_set(user_id)
         
         recommended = [
             user for user in all_users 
@@ -415,6 +653,7 @@ class CardSystem:
             ])
         
         keyboard.extend([
+            [InlineKeyboardButton("🔎 Search by Username", callback_data="player_search")],
             [InlineKeyboardButton("🔙 Social", callback_data="social")],
             [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
         ])
@@ -425,6 +664,95 @@ class CardSystem:
             'parse_mode': 'Markdown'
         }
 
+    async def create_player_search_card(self, user_id: int, prefix: str, page: int = 0) -> Dict[str, Any]:
+        """Create paginated username search results card"""
+        page_size = Config.PLAYER_SEARCH_PAGE_SIZE
+        users = self.db.search_users(prefix, limit=page_size + 1, offset=page * page_size)
+        has_next = len(users) > page_size
+        users = users[:page_size]
+        
+        card_text = f"🔎 *Players starting with* `{prefix}` • Page {page + 1}\n\n"
+        if not users:
+            card_text += "No players found. Try a shorter name."
+        
+        keyboard = []
+        for user in users:
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"👤 {user['username']} (Lv.{user['level']})",
+                    callback_data=f"social_view_{user['telegram_id']}"
+                )
+            ])
+        
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("⬅️ Previous", callback_data=f"player_search_page_{page - 1}"))
+        if has_next:
+            nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"player_search_page_{page + 1}"))
+        if nav_buttons:
+            keyboard.append(nav_buttons)
+        
+        keyboard.extend([
+            [InlineKeyboardButton("🔎 New Search", callback_data="player_search")],
+            [InlineKeyboardButton("🔙 Find Players", callback_data="social_find")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': card_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
+    async def create_leaderboard_card(self, user_id: int, window: str = 'all', forum_id: int = None) -> Dict[str, Any]:
+        """Create leaderboard card (all-time, weekly, monthly, per forum)"""
+        forum = self.db.get_forum(forum_id) if forum_id else None
+        if forum_id and not forum:
+            return await self.create_error_card("Forum not found")
+        
+        window_titles = {'all': 'All Time', 'week': 'This Week', 'month': 'This Month'}
+        if window not in window_titles:
+            window = 'all'
+        scope = f" • {forum['name']}" if forum else ""
+        leaderboard_text = f"👑 *Community Leaderboard*\n_{window_titles[window]}{scope}_\n\n"
+        
+        if window == 'all' and not forum:
+            rankings = self.db.get_user_rankings(limit=10)
+        else:
+            rankings = self.db.get_windowed_rankings(window, forum_id, limit=10)
+        
+        for i, user in enumerate(rankings, 1):
+            medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+            if 'points' in user:
+                leaderboard_text += f"{medal} *{user['username']}* - {user['points']} pts • 📝{user['threads']} • 💬{user['replies']}\n"
+            else:
+                leaderboard_text += f"{medal} *{user['username']}* - Lv.{user['level']} • ⭐{user['reputation']}\n"
+        
+        if not rankings:
+            leaderboard_text += "No activity yet. Be the first on the board!\n"
+        
+        suffix = f"_{forum_id}" if forum_id else ""
+        keyboard = [
+            [
+                InlineKeyboardButton("📅 Week", callback_data=f"leaderboard_week{suffix}"),
+                InlineKeyboardButton("🗓️ Month", callback_data=f"leaderboard_month{suffix}"),
+                InlineKeyboardButton("🏆 All Time", callback_data=f"leaderboard_all{suffix}")
+            ]
+        ]
+        
+        if forum:
+            keyboard.append([InlineKeyboardButton("🔙 Forum", callback_data=f"forum_view_{forum_id}")])
+        keyboard.extend([
+            [InlineKeyboardButton("👥 Social", callback_data="social")],
+            [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
+        ])
+        
+        return {
+            'text': leaderboard_text,
+            'reply_markup': InlineKeyboardMarkup(keyboard),
+            'parse_mode': 'Markdown'
+        }
+
     # ==================== PROFILE CARDS ====================
     async def create_profile_card(self, user_id: int) -> Dict[str, Any]:
         """Create user profile card"""
@@ -432,18 +760,15 @@ class CardSystem:
         badges = self.db.get_user_badges(user_id)
         
         # Calculate progress to next level
-        current_level_xp = (user['level'] - 1) * 100
-        next_level_xp = user['level'] * 100
-        xp_progress = user['experience'] - current_level_xp
-        xp_required = next_level_xp - current_level_xp
-        progress_percent = (xp_progress / xp_required) * 100 if xp_required > 0 else 100
+        progress = self.db.get_level_progress(user['experience'])
+        progress_percent = progress['progress_percent']
         
         # Create progress bar
         progress_bar = self.format_progress_bar(progress_percent)
         
         card_text = (
             f"👤 *Your Profile* 🏅\n\n"
-            f"**{user['username']}** • Level {user['level']}\n"
+            f"**{user['username']}** • Level {progress['level']}\n"
             f"{progress_bar} {progress_percent:.0f}%\n"
             f"⭐ {user['reputation']} Reputation\n\n"
             f"📊 *Statistics:*\n"
@@ -550,7 +875,7 @@ class CardSystem:
             "💬 *Forums* - Game discussions\n"
             "👥 *Social* - Connect with players\n"
             "👤 *Profile* - Your stats & achievements\n\n"
-            "Need help? Use /menu to return to main menu!"
+            "Need help? Use /menu to return to main menu, /profile for your stats!"
         )
         
         return {
@@ -565,16 +890,17 @@ class CardSystem:
 
 # ==================== CONVERSATION HANDLERS ====================
 class ConversationHandlers:
-    def __init__(self, db, cards):
+    def __init__(self, db, cards, rendered):
         self.db = db
         self.cards = cards
+        self.rendered = rendered
 
     async def start_tournament_creation(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start tournament creation"""
         query = update.callback_query
         context.user_data.clear()
         
-        await query.edit_message_text(
+        await self.rendered.edit(query, 
             "⚽ Tournament Creation Wizard\n\n"
             "Step 1/4: What should we name your tournament?\n\n"
             "💡 Example: 'FIFA 14 Champions League'\n\n"
@@ -646,9 +972,6 @@ class ConversationHandlers:
             tournament_id = self.db.create_tournament(tournament_data)
             
             if tournament_id:
-                # Award experience
-                self.db.update_user_stats(user_id, {'experience': Config.EXPERIENCE_PER_ACTION['thread_created']})
-                
                 keyboard = [
                     [InlineKeyboardButton("👀 View Tournament", callback_data=f"tournament_view_{tournament_id}")],
                     [InlineKeyboardButton("⚽ Tournaments", callback_data="tournaments")],
@@ -683,7 +1006,7 @@ class ConversationHandlers:
         forum = self.db.get_forum(forum_id)
         context.user_data['forum_name'] = forum['name']
         
-        await query.edit_message_text(
+        await self.rendered.edit(query, 
             f"📝 Creating New Thread in *{forum['name']}*\n\n"
             "Step 1/2: Enter the thread title:\n\n"
             "Type your answer below:",
@@ -713,6 +1036,11 @@ class ConversationHandlers:
             context.user_data.clear()
             return ConversationHandler.END
         
+        if self.db.check_duplicate(user_id, update.message.text) == 'reject':
+            await update.message.reply_text("🚫 You've already posted this. Please don't repeat the same message.")
+            context.user_data.clear()
+            return ConversationHandler.END
+        
         thread_data = {
             "title": context.user_data['thread_title'],
             "content": update.message.text,
@@ -724,9 +1052,6 @@ class ConversationHandlers:
         forum = self.db.get_forum(forum_id)
         
         if thread_id:
-            # Award experience
-            self.db.update_user_stats(user_id, {'experience': Config.EXPERIENCE_PER_ACTION['thread_created']})
-            
             keyboard = [
                 [InlineKeyboardButton("👀 View Thread", callback_data=f"thread_view_{thread_id}")],
                 [InlineKeyboardButton("💬 Forum", callback_data=f"forum_view_{forum_id}")],
@@ -754,7 +1079,7 @@ class ConversationHandlers:
         thread = self.db.get_thread(thread_id)
         context.user_data['thread_title'] = thread['title']
         
-        await query.edit_message_text(
+        await self.rendered.edit(query, 
             f"💬 Writing Reply to: *{thread['title']}*\n\n"
             "Enter your reply:\n\n"
             "Type your answer below:",
@@ -773,6 +1098,11 @@ class ConversationHandlers:
             context.user_data.clear()
             return ConversationHandler.END
         
+        if self.db.check_duplicate(user_id, update.message.text) == 'reject':
+            await update.message.reply_text("🚫 You've already posted this. Please don't repeat the same message.")
+            context.user_data.clear()
+            return ConversationHandler.END
+        
         reply_data = {
             "content": update.message.text,
             "thread_id": thread_id,
@@ -783,9 +1113,6 @@ class ConversationHandlers:
         thread = self.db.get_thread(thread_id)
         
         if reply_id:
-            # Award experience
-            self.db.update_user_stats(user_id, {'experience': Config.EXPERIENCE_PER_ACTION['reply_posted']})
-            
             keyboard = [
                 [InlineKeyboardButton("👀 View Thread", callback_data=f"thread_view_{thread_id}")],
                 [InlineKeyboardButton("💬 Forum", callback_data=f"forum_view_{thread['forum_id']}")]
@@ -801,6 +1128,34 @@ class ConversationHandlers:
         context.user_data.clear()
         return ConversationHandler.END
 
+    async def start_player_search(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Start username search"""
+        query = update.callback_query
+        context.user_data.clear()
+        
+        await self.rendered.edit(query, 
+            "🔎 Player Search\n\n"
+            "Send the start of a username, e.g. 'messi'.\n\n"
+            "Type your answer below:",
+            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("❌ Cancel", callback_data="cancel")]])
+        )
+        return Config.PLAYER_SEARCH
+
+    async def player_search_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle search text and show the first page of matches"""
+        # Backticks would break the Markdown code span the prefix is shown in
+        prefix = update.message.text.strip().lstrip('@').replace('`', '')[:32]
+        
+        if not prefix:
+            await update.message.reply_text("❌ Please send at least one character of a username:")
+            return Config.PLAYER_SEARCH
+        
+        # Kept for the Next/Previous buttons, which only carry the page number
+        context.user_data['player_search'] = prefix
+        card = await self.cards.create_player_search_card(update.message.from_user.id, prefix)
+        await self.rendered.reply(update.message, **card)
+        return ConversationHandler.END
+
     async def cancel_conversation(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Cancel any conversation"""
         context.user_data.clear()
@@ -812,7 +1167,7 @@ class ConversationHandlers:
                 ])
             )
         else:
-            await update.callback_query.edit_message_text(
+            await self.rendered.edit(update.callback_query, 
                 "❌ Operation cancelled.",
                 reply_markup=InlineKeyboardMarkup([
                     [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
@@ -821,61 +1176,332 @@ class ConversationHandlers:
         return ConversationHandler.END
 
 
+# ==================== UPDATE PROCESSING ====================
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Processes different users' updates concurrently and each user's in arrival order.
+
+    Wizards, double taps and user_data stay sequential per user, while a slow
+    card for one user no longer holds up everyone queued behind it.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # user_id -> [lock, updates holding or waiting for it]; dropped when idle
+        self.users: Dict[int, list] = {}
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            await coroutine
+            return
+
+        entry = self.users.setdefault(user.id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self.users[user.id]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
 # ==================== MAIN BOT CLASS ====================
 class SuperSoccerBot:
-    def __init__(self):
-        self.application = Application.builder().token(Config.BOT_TOKEN).build()
-        self.db = SuperDatabase()
+    def __init__(self, token: str = Config.BOT_TOKEN, db: Optional[SuperDatabase] = None, request: Optional[BaseRequest] = None):
+        builder = (
+            Application.builder()
+            .token(token)
+            .post_init(self.post_init)
+            .post_shutdown(self.post_shutdown)
+            .concurrent_updates(PerUserUpdateProcessor(Config.CONCURRENT_UPDATES))
+        )
+        if Config.METRICS_ENABLED:
+            # Same pool size ApplicationBuilder uses for its default transport
+            request = TimedRequest(request or HTTPXRequest(connection_pool_size=256))
+        if request:
+            # Custom transport, e.g. the offline Bot API used by loadtest.py
+            builder = builder.request(request)
+        self.application = builder.build()
+        self.db = db or SuperDatabase()
+        self.metrics_server = None
+        self.loop_watchdog = LoopWatchdog() if Config.LOOP_WATCHDOG_ENABLED else None
+        self.counter_drift: Dict[str, int] = {}
+        self.backup_running = False
+        self.throttle = CallbackThrottle() if Config.THROTTLE_ENABLED else None
+        # user_id -> monotonic time of their last update, least recently active first
+        self.user_seen: OrderedDict = OrderedDict()
+        self.conversation_handlers: Dict[str, ConversationHandler] = {}
+        instrument_database(self.db)
         self.cards = CardSystem(self.db)
-        self.conversations = ConversationHandlers(self.db, self.cards)
+        self.rendered = RenderedMessages()
+        self.conversations = ConversationHandlers(self.db, self.cards, self.rendered)
         
+        self.setup_subscribers()
         self.setup_handlers()
+        self.setup_jobs()
+        self.setup_metrics()
+
+    async def post_init(self, application: Application):
+        """Start background services once the event loop is running"""
+        await self.db.events.start()
+        
+        if self.loop_watchdog:
+            await self.loop_watchdog.start()
+        if Config.METRICS_ENABLED and Config.METRICS_PORT:
+            self.metrics_server = MetricsServer()
+            await self.metrics_server.start()
+
+    async def post_shutdown(self, application: Application):
+        """Flush pending events and thread views before exit"""
+        await self.db.events.stop()
+        self.db.flush_thread_views()
+        
+        if self.loop_watchdog:
+            await self.loop_watchdog.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if Config.METRICS_ENABLED and Config.METRICS_DUMP_PATH:
+            dump_metrics(Config.METRICS_DUMP_PATH)
+        
+        if Config.QUERY_STATS_ENABLED:
+            for stat in query_stats.snapshot(limit=10):
+                logging.info(
+                    f"Query {stat['count']}x total {stat['total_ms']:.1f} ms max {stat['max_ms']:.1f} ms: {stat['sql'][:120]}"
+                )
+
+    def setup_subscribers(self):
+        """Wire side effects to domain events"""
+        events = self.db.events
+        
+        # Experience and achievement badges are awarded in the write's own
+        # transaction (SuperDatabase._reward), the bus only carries notifications
+        events.subscribe(LevelUp, self.notify_level_up)
+
+    def setup_jobs(self):
+        """Schedule periodic maintenance jobs"""
+        job_queue = self.application.job_queue
+        if job_queue is None:
+            logging.warning("Job queue unavailable, install python-telegram-bot[job-queue] for maintenance jobs")
+            return
+        
+        job_queue.run_repeating(self.decay_hot_scores_job, interval=Config.HOT_SCORE_DECAY_INTERVAL, first=Config.HOT_SCORE_DECAY_INTERVAL)
+        job_queue.run_repeating(self.flush_views_job, interval=Config.VIEW_FLUSH_INTERVAL, first=Config.VIEW_FLUSH_INTERVAL)
+        job_queue.run_repeating(self.archive_job, interval=Config.ARCHIVE_INTERVAL, first=Config.ARCHIVE_INTERVAL)
+        job_queue.run_repeating(self.reconcile_job, interval=Config.RECONCILE_INTERVAL, first=Config.RECONCILE_INTERVAL)
+        job_queue.run_repeating(self.prune_fingerprints_job, interval=Config.SPAM_WINDOW, first=Config.SPAM_WINDOW)
+        job_queue.run_repeating(self.sweep_user_data_job, interval=Config.USER_DATA_SWEEP_INTERVAL, first=Config.USER_DATA_SWEEP_INTERVAL)
+        if Config.BACKUP_ENABLED:
+            job_queue.run_repeating(self.backup_job, interval=Config.BACKUP_INTERVAL, first=Config.BACKUP_INTERVAL)
+        if Config.METRICS_ENABLED and Config.METRICS_DUMP_PATH:
+            job_queue.run_repeating(self.dump_metrics_job, interval=Config.METRICS_DUMP_INTERVAL, first=Config.METRICS_DUMP_INTERVAL)
+
+    async def decay_hot_scores_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically re-decay thread hot scores"""
+        updated = self.db.decay_hot_scores()
+        logging.info(f"Decayed hot scores for {updated} threads")
+
+    async def flush_views_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically write buffered thread views"""
+        self.db.flush_thread_views()
+
+    async def archive_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically move inactive threads to the archive database"""
+        moved = await asyncio.to_thread(self.db.archive_old_threads)
+        logging.info(f"Archived {moved['threads']} threads and {moved['replies']} replies")
+
+    async def reconcile_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically repair denormalized counters that drifted"""
+        report = await asyncio.to_thread(self.db.reconcile_counters)
+        self.counter_drift = {name: drift['rows'] for name, drift in report.items()}
+        
+        drifted = {name: drift for name, drift in report.items() if drift['rows']}
+        if not drifted:
+            logging.info(f"Counter reconciliation found no drift in {len(report)} counters")
+            return
+        for name, drift in drifted.items():
+            # Examples are (key, stored, actual)
+            logging.warning(f"Counter drift in {name}: {drift['rows']} rows fixed, net {drift['delta']:+d}, e.g. {drift['examples']}")
+
+    async def prune_fingerprints_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically drop post signatures older than the duplicate window"""
+        pruned = self.db.prune_fingerprints()
+        logging.info(f"Pruned {pruned} post fingerprints")
+
+    async def sweep_user_data_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically drop conversation state of users who went away"""
+        dropped = self.sweep_user_data()
+        for reason, count in dropped.items():
+            if count:
+                user_data_evicted.inc(reason, amount=count)
+        if any(dropped.values()):
+            logging.info(f"Dropped user_data of {dropped['idle']} idle users and {dropped['cap']} over the cap")
+
+    def sweep_user_data(self, now: float = None) -> Dict[str, int]:
+        """Forget users idle past USER_DATA_TTL, then the least recently active over USER_DATA_MAX_USERS"""
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - Config.USER_DATA_TTL
+        excess = len(self.user_seen) - Config.USER_DATA_MAX_USERS
+        in_conversation = self.users_in_conversation()
+        dropped = {'idle': 0, 'cap': 0}
+        
+        for user_id, seen in list(self.user_seen.items()):
+            if seen >= cutoff and excess <= 0:
+                break
+            # A wizard's steps read its draft, those users wait for the conversation timeout
+            if user_id in in_conversation:
+                continue
+            del self.user_seen[user_id]
+            excess -= 1
+            if user_id in self.application.user_data:
+                self.application.drop_user_data(user_id)
+                dropped['idle' if seen < cutoff else 'cap'] += 1
+        return dropped
+
+    def users_in_conversation(self) -> Set[int]:
+        """Users in the middle of a wizard"""
+        # Every live conversation has a timeout job, keyed (chat_id, user_id)
+        return {key[-1] for handler in self.conversation_handlers.values() for key in handler.timeout_jobs}
+
+    async def backup_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically snapshot the database without pausing updates"""
+        if self.backup_running:
+            logging.warning("Previous backup still running, skipping this one")
+            return
+        
+        self.backup_running = True
+        try:
+            # The copy blocks its thread for the whole snapshot, keep it off the event loop
+            for db_path in (self.db.db_path, self.db.archive_path):
+                if not os.path.exists(db_path):
+                    continue
+                await asyncio.to_thread(create_backup, db_path)
+                removed = rotate_snapshots(db_path)
+                if removed:
+                    logging.info(f"Rotated out {len(removed)} old backups of {db_path}")
+        except Exception as e:
+            logging.error(f"Error creating backup: {e}")
+        finally:
+            self.backup_running = False
+
+    async def dump_metrics_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Periodically write metrics for file-based collection"""
+        try:
+            dump_metrics(Config.METRICS_DUMP_PATH)
+        except Exception as e:
+            logging.error(f"Error dumping metrics: {e}")
+
+    def setup_metrics(self):
+        """Expose cache and event queue health alongside handler metrics"""
+        if not Config.METRICS_ENABLED:
+            return
+        
+        registry.gauge_callback('soccerforum_event_bus', "Event bus counters and queue health", self.db.events.get_metrics)
+        registry.gauge_callback('soccerforum_counter_drift_rows', "Rows corrected per counter by the last reconciliation",
+                                lambda: self.counter_drift)
+        registry.gauge_callback('soccerforum_cache_entries', "Entries held in in-process caches",
+                                lambda: {'feed': len(self.db.feed_cache), 'duplicates': len(self.db.duplicates),
+                                         'throttle': len(self.throttle) if self.throttle is not None else 0,
+                                         'rendered': len(self.rendered), 'user_data': len(self.application.user_data)})
+        registry.gauge_callback('soccerforum_conversations_active', "Users in the middle of each wizard",
+                                lambda: {name: len(handler.timeout_jobs) for name, handler in self.conversation_handlers.items()})
+        if self.cards.flights is not None:
+            registry.gauge_callback('soccerforum_coalesced_reads', "Reads in flight and calls served by another's query",
+                                    lambda: {'in_flight': len(self.cards.flights), 'shared': self.cards.flights.shared})
 
     def setup_handlers(self):
         """Setup all bot handlers"""
+        command = lambda name, handler: CommandHandler(name, track_handler('command', handler, name))
+        step = lambda handler: track_handler('conversation', handler, handler.__name__)
+        timeout = {ConversationHandler.TIMEOUT: [TypeHandler(Update, step(self.conversation_timeout))]}
+        
+        # Run before every other handler and let the update through
+        self.application.add_handler(TypeHandler(Update, self.wait_for_event_bus), group=-2)
+        self.application.add_handler(TypeHandler(Update, self.track_activity), group=-1)
+        
         # Command handlers
-        self.application.add_handler(CommandHandler("start", self.start))
-        self.application.add_handler(CommandHandler("menu", self.show_main_menu))
-        self.application.add_handler(CommandHandler("help", self.show_help))
+        self.application.add_handler(command("start", self.start))
+        self.application.add_handler(command("menu", self.show_main_menu))
+        self.application.add_handler(command("help", self.show_help))
+        self.application.add_handler(command("profile", self.show_profile))
+        self.application.add_handler(command("sample", self.sample_command))
+        self.application.add_handler(command("purge", self.purge_command))
         
         # Conversation handlers
         tournament_conv = ConversationHandler(
-            entry_points=[CallbackQueryHandler(self.conversations.start_tournament_creation, pattern="^tournament_create$")],
+            entry_points=[CallbackQueryHandler(step(self.conversations.start_tournament_creation), pattern="^tournament_create$")],
             states={
-                Config.TOURNAMENT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.tournament_name)],
-                Config.TOURNAMENT_GAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.tournament_game)],
-                Config.TOURNAMENT_TEAMS: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.tournament_teams)],
-                Config.TOURNAMENT_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.tournament_description)],
+                Config.TOURNAMENT_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.tournament_name))],
+                Config.TOURNAMENT_GAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.tournament_game))],
+                Config.TOURNAMENT_TEAMS: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.tournament_teams))],
+                Config.TOURNAMENT_DESC: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.tournament_description))],
+                **timeout
             },
-            fallbacks=[CommandHandler("cancel", self.conversations.cancel_conversation)]
+            fallbacks=[CommandHandler("cancel", step(self.conversations.cancel_conversation))],
+            conversation_timeout=Config.CONVERSATION_TIMEOUT
         )
         
         thread_conv = ConversationHandler(
-            entry_points=[CallbackQueryHandler(self.conversations.start_thread_creation, pattern="^thread_create_")],
+            entry_points=[CallbackQueryHandler(step(self.conversations.start_thread_creation), pattern="^thread_create_")],
             states={
-                Config.THREAD_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.thread_title)],
-                Config.THREAD_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.thread_content)],
+                Config.THREAD_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.thread_title))],
+                Config.THREAD_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.thread_content))],
+                **timeout
             },
-            fallbacks=[CommandHandler("cancel", self.conversations.cancel_conversation)]
+            fallbacks=[CommandHandler("cancel", step(self.conversations.cancel_conversation))],
+            conversation_timeout=Config.CONVERSATION_TIMEOUT
         )
         
         reply_conv = ConversationHandler(
-            entry_points=[CallbackQueryHandler(self.conversations.start_reply_creation, pattern="^reply_create_")],
+            entry_points=[CallbackQueryHandler(step(self.conversations.start_reply_creation), pattern="^reply_create_")],
             states={
-                Config.REPLY_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.conversations.reply_content)],
+                Config.REPLY_CONTENT: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.reply_content))],
+                **timeout
             },
-            fallbacks=[CommandHandler("cancel", self.conversations.cancel_conversation)]
+            fallbacks=[CommandHandler("cancel", step(self.conversations.cancel_conversation))],
+            conversation_timeout=Config.CONVERSATION_TIMEOUT
         )
         
-        self.application.add_handler(tournament_conv)
-        self.application.add_handler(thread_conv)
-        self.application.add_handler(reply_conv)
+        search_conv = ConversationHandler(
+            entry_points=[CallbackQueryHandler(step(self.conversations.start_player_search), pattern="^player_search$")],
+            states={
+                Config.PLAYER_SEARCH: [MessageHandler(filters.TEXT & ~filters.COMMAND, step(self.conversations.player_search_query))],
+                **timeout
+            },
+            fallbacks=[CommandHandler("cancel", step(self.conversations.cancel_conversation))],
+            conversation_timeout=Config.CONVERSATION_TIMEOUT
+        )
+        
+        self.conversation_handlers = {
+            'tournament': tournament_conv, 'thread': thread_conv, 'reply': reply_conv, 'search': search_conv
+        }
+        for handler in self.conversation_handlers.values():
+            self.application.add_handler(handler)
         
         # Callback query handler - MUST BE LAST
-        self.application.add_handler(CallbackQueryHandler(self.handle_callback))
+        self.application.add_handler(CallbackQueryHandler(track_handler('callback', self.handle_callback)))
         
         # Message handlers
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, track_handler('message', self.handle_message, 'text')))
+
+    async def notify_level_up(self, event: LevelUp):
+        """Send level up message"""
+        logging.info(f"User {event.user_id} leveled up: {event.old_level} -> {event.new_level}")
+        try:
+            await self.application.bot.send_message(
+                chat_id=event.user_id,
+                text=f"🎉 *Level Up!*\n\nYou reached *Level {event.new_level}*. Keep it up! ⚽",
+                parse_mode='Markdown'
+            )
+        except Exception as e:
+            logging.error(f"Error sending level up to {event.user_id}: {e}")
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -903,9 +1529,9 @@ class SuperSoccerBot:
         ]
         
         if update.message:
-            await update.message.reply_text(welcome_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+            await self.rendered.reply(update.message, welcome_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
         else:
-            await update.callback_query.edit_message_text(welcome_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
+            await self.rendered.edit(update.callback_query, welcome_text, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
 
     async def show_main_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show main menu"""
@@ -913,23 +1539,129 @@ class SuperSoccerBot:
         card = await self.cards.create_main_menu(user_id)
         
         if update.message:
-            await update.message.reply_text(**card)
+            await self.rendered.reply(update.message, **card)
         else:
-            await update.callback_query.edit_message_text(**card)
+            await self.rendered.edit(update.callback_query, **card)
 
     async def show_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show help"""
         card = await self.cards.create_help_card()
         
         if update.message:
-            await update.message.reply_text(**card)
+            await self.rendered.reply(update.message, **card)
         else:
-            await update.callback_query.edit_message_text(**card)
+            await self.rendered.edit(update.callback_query, **card)
+
+    async def show_profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Show the user's own profile"""
+        card = await self.cards.create_profile_card(update.effective_user.id)
+        await self.rendered.reply(update.message, **card)
+
+    async def sample_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin only: /sample [seconds] profiles the running bot"""
+        if update.effective_user.id not in Config.ADMIN_IDS:
+            await update.message.reply_text("⛔ This command is for admins only.")
+            return
+        
+        try:
+            seconds = int(context.args[0]) if context.args else Config.PROFILE_DEFAULT_SECONDS
+        except ValueError:
+            await update.message.reply_text("Usage: /sample [seconds]")
+            return
+        seconds = max(1, min(seconds, Config.PROFILE_MAX_SECONDS))
+        
+        await update.message.reply_text(f"🔬 Profiling for {seconds}s...")
+        # Sampling runs in the background so updates keep flowing while it records
+        context.application.create_task(self.run_profile(update, seconds))
+
+    async def purge_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Admin only: /purge <user_id> previews, /purge <user_id> confirm removes their content"""
+        if update.effective_user.id not in Config.ADMIN_IDS:
+            await update.message.reply_text("⛔ This command is for admins only.")
+            return
+        
+        args = context.args or []
+        if not args or not args[0].isdigit() or args[1:] not in ([], ['confirm']):
+            await update.message.reply_text("Usage: /purge <user_id> [confirm]")
+            return
+        user_id = int(args[0])
+        confirmed = args[1:] == ['confirm']
+        
+        # Large purges take seconds, keep them off the event loop
+        result = await asyncio.to_thread(self.db.purge_user, user_id, not confirmed)
+        if not result:
+            await update.message.reply_text("❌ Purge failed, see logs.")
+            return
+        
+        summary = (
+            f"🧵 Threads: {result['threads']}\n"
+            f"💬 Replies: {result['replies']}\n"
+            f"👥 Follows: {result['follows']}\n"
+            f"🏆 Tournament entries: {result['participations']}"
+        )
+        if confirmed:
+            logging.warning(f"Admin {update.effective_user.id} purged user {user_id}: {result}")
+            await update.message.reply_text(f"🗑️ *Purged user {user_id}*\n\n{summary}", parse_mode='Markdown')
+        else:
+            await update.message.reply_text(
+                f"⚠️ *Purge preview for user {user_id}*\n\n{summary}\n\n"
+                f"Send `/purge {user_id} confirm` to remove all of it.",
+                parse_mode='Markdown'
+            )
+
+    async def run_profile(self, update: Update, seconds: int):
+        """Profile the loop and reply with the top hotspots"""
+        try:
+            profiler, report_path, collapsed_path = await profile_loop(seconds)
+        except RuntimeError as e:
+            await update.message.reply_text(f"❌ {e}")
+            return
+        except Exception as e:
+            logging.error(f"Error profiling: {e}")
+            await update.message.reply_text("❌ Profiling failed, see logs.")
+            return
+        
+        summary = profiler.summary()
+        text = (
+            f"🔬 *Profile complete* ({summary['seconds']:.0f}s, {summary['samples']} samples)\n"
+            f"Loop busy: {summary['busy_percent']:.1f}%\n\n"
+        )
+        for label, percent in summary['top']:
+            text += f"`{percent:5.1f}%  {label}`\n"
+        if not summary['top']:
+            text += "No busy samples recorded.\n"
+        text += f"\n📄 `{report_path}`\n🔥 `{collapsed_path}`"
+        
+        await update.message.reply_text(text, parse_mode='Markdown')
+
+    async def wait_for_event_bus(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Hold new updates while the event queue is full instead of dropping their events"""
+        await self.db.events.wait_for_room()
+
+    async def track_activity(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Note when each user was last active, for the user_data sweep"""
+        user = update.effective_user
+        if user is not None:
+            self.user_seen[user.id] = time.monotonic()
+            self.user_seen.move_to_end(user.id)
+
+    async def conversation_timeout(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Drop the draft of a wizard left idle for Config.CONVERSATION_TIMEOUT"""
+        # The timed-out conversation is already off the list, any other wizard started since owns user_data
+        if update.effective_user.id in self.users_in_conversation():
+            return
+        
+        context.user_data.clear()
+        await context.bot.send_message(
+            update.effective_chat.id,
+            "⌛ Your draft expired after a while without an answer. Start again whenever you're ready!",
+            reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]])
+        )
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages"""
-        # If there's active conversation data, suggest using /cancel
-        if context.user_data and len(context.user_data) > 0:
+        # Mid-wizard, suggest using /cancel
+        if update.effective_user.id in self.users_in_conversation():
             await update.message.reply_text(
                 "It looks like you're in the middle of an operation. "
                 "Use /cancel to cancel the current operation, or use the menu buttons to navigate."
@@ -938,16 +1670,24 @@ class SuperSoccerBot:
         
         # Otherwise show help
         card = await self.cards.create_help_card()
-        await update.message.reply_text(**card)
+        await self.rendered.reply(update.message, **card)
 
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle all callback queries"""
         query = update.callback_query
-        await query.answer()
-        
         user_id = query.from_user.id
         data = query.data
         
+        # Refuse before any DB work, the answer alone is one cheap API call
+        if self.throttle is not None:
+            route = callback_route(update)
+            if not self.throttle.allow(user_id, route):
+                callbacks_throttled.inc(route)
+                await query.answer("⏳ Slow down a little!")
+                return
+        
+        await query.answer()
+        
         logging.info(f"Callback received: {data} from user {user_id}")
         
         try:
@@ -971,8 +1711,6 @@ class SuperSoccerBot:
             elif data.startswith("tournament_join_"):
                 tournament_id = int(data.split("_")[-1])
                 if self.db.join_tournament(user_id, tournament_id):
-                    # Award experience
-                    self.db.update_user_stats(user_id, {'experience': Config.EXPERIENCE_PER_ACTION['tournament_joined']})
                     card = await self.cards.create_success_card(
                         "Tournament Joined!", 
                         "You've successfully joined the tournament!",
@@ -980,6 +1718,21 @@ class SuperSoccerBot:
                     )
                 else:
                     card = await self.cards.create_error_card("Could not join tournament.")
+            elif data.startswith("tournament_winner_"):
+                parts = data.split("_")
+                page = int(parts[3]) if len(parts) > 3 else 0
+                card = await self.cards.create_declare_winner_card(user_id, int(parts[2]), page)
+            elif data.startswith("tournament_win_"):
+                tournament_id, winner_id = (int(part) for part in data.split("_")[-2:])
+                tournament = self.db.get_tournament(tournament_id)
+                if tournament and tournament['creator_id'] == user_id and self.db.complete_tournament(tournament_id, winner_id):
+                    card = await self.cards.create_success_card(
+                        "Tournament Completed!",
+                        "The champion has been crowned and rewarded.",
+                        f"tournament_view_{tournament_id}"
+                    )
+                else:
+                    card = await self.cards.create_error_card("Could not declare winner.")
             
             # Forum handlers
             elif data == "forums":
@@ -997,13 +1750,38 @@ class SuperSoccerBot:
                     )
                 else:
                     card = await self.cards.create_error_card("Already following this forum.")
+            elif data == "forum_recent":
+                card = await self.cards.create_feed_card(user_id)
+            elif data.startswith("feed_more_"):
+                before_id = int(data.split("_")[-1])
+                card = await self.cards.create_feed_card(user_id, before_id)
+            elif data == "forum_my":
+                card = await self.cards.create_my_forums_card(user_id)
+            elif data == "forum_popular":
+                card = await self.cards.create_popular_threads_card(user_id)
+            elif data.startswith("forum_popular_"):
+                forum_id = int(data.split("_")[-1])
+                card = await self.cards.create_popular_threads_card(user_id, forum_id)
             elif data.startswith("thread_view_"):
                 thread_id = int(data.split("_")[-1])
+                self.db.record_thread_view(thread_id)
                 card = await self.cards.create_thread_card(user_id, thread_id)
+            elif data.startswith("thread_replies_"):
+                parts = data.split("_")
+                page = int(parts[3]) if len(parts) > 3 else 0
+                card = await self.cards.create_replies_card(user_id, int(parts[2]), page)
             
             # Social handlers
             elif data == "social":
                 card = await self.cards.create_social_menu(user_id)
+            elif data == "social_following":
+                card = await self.cards.create_following_card(user_id)
+            elif data.startswith("player_search_page_"):
+                prefix = context.user_data.get('player_search')
+                if prefix:
+                    card = await self.cards.create_player_search_card(user_id, prefix, int(data.split("_")[-1]))
+                else:
+                    card = await self.cards.create_error_card("Search expired. Start a new one from Find Players.")
             elif data == "social_find":
                 card = await self.cards.create_find_users_card(user_id)
             elif data.startswith("social_view_"):
@@ -1028,33 +1806,23 @@ class SuperSoccerBot:
             
             # Leaderboard
             elif data == "leaderboard" or data == "social_leaderboard":
-                rankings = self.db.get_user_rankings(limit=10)
-                leaderboard_text = "👑 *Community Leaderboard*\n\n"
-                
-                for i, user in enumerate(rankings, 1):
-                    medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-                    leaderboard_text += f"{medal} *{user['username']}* - Lv.{user['level']} • ⭐{user['reputation']}\n"
-                
-                keyboard = [
-                    [InlineKeyboardButton("👥 Social", callback_data="social")],
-                    [InlineKeyboardButton("🏠 Main Menu", callback_data="menu")]
-                ]
-                
-                card = {
-                    'text': leaderboard_text,
-                    'reply_markup': InlineKeyboardMarkup(keyboard),
-                    'parse_mode': 'Markdown'
-                }
+                card = await self.cards.create_leaderboard_card(user_id)
+            elif data.startswith("leaderboard_"):
+                parts = data.split("_")
+                forum_id = int(parts[2]) if len(parts) > 2 else None
+                card = await self.cards.create_leaderboard_card(user_id, parts[1], forum_id)
             
             else:
                 card = await self.cards.create_error_card("Unknown command. Please try again.")
             
-            await query.edit_message_text(**card)
+            # Tapping the button for the card already on screen costs nothing
+            if not await self.rendered.edit(query, **card):
+                edits_skipped.inc(callback_route(update))
                 
         except Exception as e:
             logging.error(f"Error handling callback {data}: {e}")
             card = await self.cards.create_error_card("An error occurred. Please try again.")
-            await query.edit_message_text(**card)
+            await self.rendered.edit(query, **card)
 
     def run(self):
         """Start the bot"""
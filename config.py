@@ -15,9 +15,19 @@ class Config:
     TOURNAMENT_NAME, TOURNAMENT_GAME, TOURNAMENT_TEAMS, TOURNAMENT_DESC = range(4)
     THREAD_TITLE, THREAD_CONTENT = range(4, 6)
     REPLY_CONTENT, = range(6, 7)
+    PLAYER_SEARCH, = range(7, 8)
+    
+    # Conversation Lifetime
+    CONVERSATION_TIMEOUT = 15 * 60  # idle seconds before a wizard is abandoned and its draft dropped
+    USER_DATA_TTL = 60 * 60  # idle seconds before a user's context.user_data is dropped
+    USER_DATA_MAX_USERS = 20000  # users whose user_data is kept, least recently active dropped first
+    USER_DATA_SWEEP_INTERVAL = 60  # seconds
     
     # Feature Settings
     MAX_BUTTONS_PER_ROW = 2
+    REPLIES_PAGE_SIZE = 5
+    PLAYER_SEARCH_PAGE_SIZE = 8
+    TOURNAMENT_PLAYERS_PAGE_SIZE = 8
     MAX_ROWS_PER_CARD = 8
     TRUNCATE_LENGTH = 35
     PROGRESS_BAR_LENGTH = 10
@@ -25,6 +35,100 @@ class Config:
     # Database Settings
     DATABASE_PATH = 'soccer_forum.db'
     
+    # Cold-Data Archive (inactive threads and their replies)
+    ARCHIVE_DATABASE_PATH = 'soccer_forum_archive.db'
+    ARCHIVE_AFTER_DAYS = 365  # since the last reply
+    ARCHIVE_CHUNK_SIZE = 200  # threads moved per transaction
+    ARCHIVE_INTERVAL = 24 * 60 * 60  # seconds
+    
+    # Counter Reconciliation
+    RECONCILE_INTERVAL = 6 * 60 * 60  # seconds
+    RECONCILE_CHUNK_SIZE = 500  # rows checked per transaction
+    
+    # Moderation
+    PURGE_CHUNK_SIZE = 1000  # ids deleted per statement during a purge
+    
+    # Callback Throttling (ratelimit.py)
+    THROTTLE_ENABLED = True
+    THROTTLE_USER_RATE = 3.0  # taps per second a user can sustain
+    THROTTLE_USER_BURST = 10
+    THROTTLE_ROUTE_RATE = 1.0  # repeats per second of one route, e.g. refreshing a card
+    THROTTLE_ROUTE_BURST = 4
+    THROTTLE_MAX_KEYS = 200000  # buckets kept in memory per limiter
+    
+    # Edit Deduplication (rendercache.py)
+    RENDERED_MESSAGES_SIZE = 50000  # bot messages whose last rendering is remembered, about 260 bytes each
+    
+    # Duplicate Post Detection (spamguard.py)
+    SPAM_SHINGLE_SIZE = 5  # characters per shingle
+    SPAM_MIN_LENGTH = 40  # shorter posts ("great goal!") are never checked
+    SPAM_SIGNATURE_SIZE = 16  # MinHash buckets
+    SPAM_BAND_ROWS = 2  # buckets per LSH band
+    SPAM_SIMILARITY = 0.6  # estimated Jaccard similarity that counts as a copy
+    SPAM_WINDOW = 24 * 60 * 60  # seconds a post is remembered
+    SPAM_INDEX_CAPACITY = 20000  # signatures kept in memory, about 1 KB each
+    SPAM_MAX_REPEATS = 2  # near-copies by the same user before the next is rejected
+    SPAM_FLAG_MATCHES = 5  # near-copies by anyone before a post is flagged
+    
+    # Read Coalescing (singleflight.py)
+    SINGLE_FLIGHT_ENABLED = True  # identical concurrent reads share one query
+    CONCURRENT_UPDATES = 64  # updates processed at once, each user's still in order
+    
+    # Online Backups (backup.py)
+    BACKUP_ENABLED = True
+    BACKUP_DIR = 'backups'
+    BACKUP_INTERVAL = 6 * 60 * 60  # seconds
+    BACKUP_KEEP = 14  # newest snapshots retained
+    
+    # Bulk Export/Import (dataport.py)
+    EXPORT_BATCH_SIZE = 1000  # rows per fetchmany
+    IMPORT_BATCH_SIZE = 5000  # rows per executemany
+    IMPORT_COMMIT_ROWS = 200000  # rows per transaction
+    
+    # Query Instrumentation (per-statement timing and slow query log)
+    QUERY_STATS_ENABLED = False
+    SLOW_QUERY_THRESHOLD_MS = 50
+    SLOW_QUERY_LOG_PATH = 'slow_queries.log'
+    
+    # Metrics (Prometheus text on a local port and/or a periodic file dump)
+    METRICS_ENABLED = True
+    METRICS_HOST = '127.0.0.1'
+    METRICS_PORT = 9108  # None disables the HTTP endpoint
+    METRICS_DUMP_PATH = None  # e.g. 'metrics.prom'
+    METRICS_DUMP_INTERVAL = 60  # seconds
+    
+    # Event Loop Watchdog (flags synchronous code that stalls the loop)
+    LOOP_WATCHDOG_ENABLED = True
+    LOOP_LAG_INTERVAL = 0.1  # seconds between heartbeats
+    LOOP_LAG_THRESHOLD_MS = 250
+    LOOP_LAG_STACK_DEPTH = 12  # frames logged per stall
+    
+    # Admin Profiler (/sample N)
+    PROFILE_DEFAULT_SECONDS = 30
+    PROFILE_MAX_SECONDS = 300
+    PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+    PROFILE_OUTPUT_DIR = 'profiles'
+    
+    # Event Bus Settings
+    EVENT_QUEUE_SIZE = 1000
+    EVENT_BUS_SYNCHRONOUS = False  # Dispatch inline (useful for tests and scripts)
+    
+    # Popular Threads (hot score with exponential decay)
+    HOT_SCORE_WEIGHTS = {'thread': 5.0, 'reply': 3.0, 'view': 0.2}
+    HOT_SCORE_HALF_LIFE_HOURS = 12
+    HOT_SCORE_FLOOR = 0.01
+    HOT_SCORE_DECAY_INTERVAL = 15 * 60  # seconds
+    VIEW_FLUSH_INTERVAL = 60  # seconds thread views are buffered in memory before being written
+    VIEW_BUFFER_MAX_THREADS = 5000  # flush early once this many threads have buffered views
+    
+    # Home Feed
+    FEED_PAGE_SIZE = 8
+    FEED_MERGE_SOURCES = 32  # Followed forums and users read with a cursor each, above this the newest threads are scanned first
+    FEED_SCAN_ROWS = 2000  # Newest threads checked against the follows before falling back to cursors
+    FEED_CACHE_TTL = 60  # seconds
+    FEED_CACHE_SIZE = 10000  # Users with a cached first page
+    FOLLOW_CACHE_SIZE = 10000  # Users whose followed-user ids are cached
+    
     # Tournament Settings
     MAX_TOURNAMENT_TEAMS = 64
     MIN_TOURNAMENT_TEAMS = 2
@@ -40,4 +144,16 @@ class Config:
         'tournament_joined': 15,
         'tournament_won': 50,
         'badge_earned': 25
-    }
\ No newline at end of file
+    }
+    
+    # Achievement Badges (badge name -> (user stat, required value))
+    ACHIEVEMENT_BADGES = {
+        'Forum Expert': ('threads_created', 10),
+        'Active Member': ('replies_posted', 50),
+        'Social Butterfly': ('following_count', 20)
+    }
+    
+    # Level Curve (XP to go from level n to n+1 = LEVEL_BASE_XP * n ** LEVEL_CURVE_EXPONENT)
+    LEVEL_BASE_XP = 100
+    LEVEL_CURVE_EXPONENT = 1.5
+    MAX_LEVEL = 100
@@ -4,21 +4,171 @@
 Database operations and data management
 """
 
+import heapq
 import logging
+import math
+import os
 import sqlite3
-from typing import Dict, List, Any, Optional
+import string
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, FrozenSet, Iterator, Optional, Tuple
+import querylog
 from config import Config
+from models import User, Forum, Thread, Reply, Tournament, column_names, prefixed, fetch_all, fetch_one
+from spamguard import DuplicateIndex, minhash, pack_signature, unpack_signature
+from events import (
+    EventBus, ThreadCreated, ReplyPosted, TournamentCreated, TournamentJoined, TournamentCompleted,
+    UserFollowed, UserUnfollowed, ForumFollowed, ForumUnfollowed, BadgeAwarded, LevelUp
+)
+
+
+# SQLite's lower() only folds ASCII, queries must fold the same way to hit the index
+ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def build_level_thresholds(base_xp: int = Config.LEVEL_BASE_XP,
+                           exponent: float = Config.LEVEL_CURVE_EXPONENT,
+                           max_level: int = Config.MAX_LEVEL) -> List[int]:
+    """Build cumulative XP thresholds (index 0 is level 1)"""
+    thresholds = [0]
+    for level in range(1, max_level):
+        thresholds.append(thresholds[-1] + max(1, round(base_xp * level ** exponent)))
+    return thresholds
+
+
+def hot_decay(since: float, now: float) -> float:
+    """Exponential decay factor for a hot score last updated at `since`"""
+    elapsed_hours = max(0.0, (now - (since or now)) / 3600)
+    return math.exp(-math.log(2) * elapsed_hours / Config.HOT_SCORE_HALF_LIFE_HOURS)
 
 
 class SuperDatabase:
-    def __init__(self, db_path=Config.DATABASE_PATH):
+    # Columns added after the original schema (CREATE TABLE IF NOT EXISTS won't add them)
+    MIGRATED_COLUMNS = [
+        ('threads', 'hot_score', 'REAL DEFAULT 0'),
+        ('threads', 'hot_updated_at', 'REAL DEFAULT 0')
+    ]
+    
+    INDEXES = [
+        "CREATE INDEX IF NOT EXISTS idx_threads_hot ON threads (hot_score DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_threads_forum_hot ON threads (forum_id, hot_score DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_threads_forum_created ON threads (forum_id, created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_threads_creator_created ON threads (creator_id, created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_threads_created ON threads (created_at DESC, id DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_activity_rollup_forum ON activity_rollup (forum_id, day)",
+        "CREATE INDEX IF NOT EXISTS idx_replies_thread ON replies (thread_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_replies_user ON replies (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_follows_followed ON user_follows (followed_id)",
+        "CREATE INDEX IF NOT EXISTS idx_participants_user ON tournament_participants (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_badges_user ON user_badges (user_id, awarded_at)",
+        "CREATE INDEX IF NOT EXISTS idx_threads_last_reply ON threads (last_reply_at)",
+        "CREATE INDEX IF NOT EXISTS idx_users_username_folded ON users (lower(username))",
+        "CREATE INDEX IF NOT EXISTS idx_content_fingerprints_created ON content_fingerprints (created_at)"
+    ]
+    
+    # Built on first attach from the live tables, so the columns always match
+    ARCHIVE_SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS archive.threads AS SELECT * FROM main.threads WHERE 0",
+        "CREATE TABLE IF NOT EXISTS archive.replies AS SELECT * FROM main.replies WHERE 0",
+        "CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_threads_id ON threads (id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_replies_id ON replies (id)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_archive_replies_thread ON replies (thread_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_archive_replies_user ON replies (user_id)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_archive_threads_forum ON threads (forum_id)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_archive_threads_creator ON threads (creator_id)"
+    ]
+    
+    # Denormalized counter -> (table, key, column, true value). {schema} counts run
+    # against main and, when attached, the archive, since archived content still counts.
+    COUNTERS = {
+        'threads.reply_count': (
+            'threads', 'id', 'reply_count', None,
+            "(SELECT COUNT(*) FROM main.replies r WHERE r.thread_id = threads.id)"
+        ),
+        'forums.thread_count': (
+            'forums', 'id', 'thread_count',
+            "(SELECT COUNT(*) FROM {schema}.threads t WHERE t.forum_id = forums.id)", None
+        ),
+        'forums.reply_count': (
+            'forums', 'id', 'reply_count',
+            "(SELECT COUNT(*) FROM {schema}.replies r JOIN {schema}.threads t ON r.thread_id = t.id "
+            "WHERE t.forum_id = forums.id)", None
+        ),
+        'tournaments.current_teams': (
+            'tournaments', 'id', 'current_teams', None,
+            "(SELECT COUNT(*) FROM tournament_participants p WHERE p.tournament_id = tournaments.id)"
+        ),
+        'users.threads_created': (
+            'users', 'telegram_id', 'threads_created',
+            "(SELECT COUNT(*) FROM {schema}.threads t WHERE t.creator_id = users.telegram_id)", None
+        ),
+        'users.replies_posted': (
+            'users', 'telegram_id', 'replies_posted',
+            "(SELECT COUNT(*) FROM {schema}.replies r WHERE r.user_id = users.telegram_id)", None
+        ),
+        'users.tournaments_joined': (
+            'users', 'telegram_id', 'tournaments_joined', None,
+            "(SELECT COUNT(*) FROM tournament_participants p WHERE p.user_id = users.telegram_id)"
+        ),
+        'user_stats.post_count': (
+            'user_stats', 'user_id', 'post_count',
+            "(SELECT COUNT(*) FROM {schema}.replies r WHERE r.user_id = user_stats.user_id)", None
+        ),
+        'user_stats.badge_count': (
+            'user_stats', 'user_id', 'badge_count', None,
+            "(SELECT COUNT(*) FROM user_badges b WHERE b.user_id = user_stats.user_id)"
+        ),
+        'user_stats.following_count': (
+            'user_stats', 'user_id', 'following_count', None,
+            "(SELECT COUNT(*) FROM user_follows f WHERE f.follower_id = user_stats.user_id)"
+        ),
+        'user_stats.follower_count': (
+            'user_stats', 'user_id', 'follower_count', None,
+            "(SELECT COUNT(*) FROM user_follows f WHERE f.followed_id = user_stats.user_id)"
+        )
+    }
+
+    # Every table, parents before children, as exported and imported by dataport.py
+    TABLES = [
+        'users', 'user_stats', 'forums', 'badges', 'level_thresholds', 'threads', 'replies',
+        'tournaments', 'tournament_participants', 'user_badges', 'user_follows', 'forum_follows',
+        'activity_rollup', 'content_fingerprints'
+    ]
+    # Tables of the archive database, dumped by dataport.py in sections of their own
+    ARCHIVE_TABLES = ['threads', 'replies']
+
+    # Level for the XP total being assigned, resolved against the threshold table
+    LEVEL_FOR_EXPERIENCE_SQL = (
+        "(SELECT lt.level FROM level_thresholds lt "
+        "WHERE lt.min_experience <= users.experience + ? "
+        "ORDER BY lt.min_experience DESC LIMIT 1)"
+    )
+
+    def __init__(self, db_path=Config.DATABASE_PATH, events: Optional[EventBus] = None,
+                 archive_path: str = Config.ARCHIVE_DATABASE_PATH):
         self.db_path = db_path
+        self.archive_path = archive_path
+        self.archive_ready = False  # schema and journal mode of the archive file are set up
+        self.events = events or EventBus()
+        self.level_thresholds = build_level_thresholds()
+        self.feed_cache: OrderedDict = OrderedDict()
+        # user_id -> frozenset of followed user ids, LRU order
+        self.follow_cache: OrderedDict = OrderedDict()
+        self.duplicates = DuplicateIndex()
+        # thread_id -> [views, their hot score as of, as_of] not yet written
+        self.view_buffer: Dict[int, list] = {}
         self.initialize_database()
 
-    def get_connection(self):
-        """Get database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
+    def get_connection(self, archive: bool = False):
+        """Get database connection with row factory, `archive` also attaches the archive database"""
+        conn = querylog.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        conn.create_function("hot_decay", 2, hot_decay, deterministic=True)
+        if archive:
+            self._attach_archive(conn)
         return conn
 
     def initialize_database(self):
@@ -105,6 +255,8 @@ class SuperDatabase:
                 is_locked BOOLEAN DEFAULT 0,
                 last_reply_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                hot_score REAL DEFAULT 0,
+                hot_updated_at REAL DEFAULT 0,
                 FOREIGN KEY (forum_id) REFERENCES forums (id),
                 FOREIGN KEY (creator_id) REFERENCES users (telegram_id)
             )
@@ -181,20 +333,113 @@ class SuperDatabase:
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users (telegram_id)
             )
+            """,
+            
+            # Level thresholds (rebuilt from Config on startup)
+            """
+            CREATE TABLE IF NOT EXISTS level_thresholds (
+                level INTEGER PRIMARY KEY,
+                min_experience INTEGER UNIQUE NOT NULL
+            )
+            """,
+            
+            # Daily activity rollup for windowed leaderboards (forum_id 0 = no forum)
+            """
+            CREATE TABLE IF NOT EXISTS activity_rollup (
+                day TEXT NOT NULL,
+                forum_id INTEGER NOT NULL DEFAULT 0,
+                user_id INTEGER NOT NULL,
+                threads INTEGER DEFAULT 0,
+                replies INTEGER DEFAULT 0,
+                tournaments INTEGER DEFAULT 0,
+                points INTEGER DEFAULT 0,
+                PRIMARY KEY (day, forum_id, user_id)
+            )
+            """,
+            
+            # MinHash signatures of recent posts, reloaded into the duplicate index on startup
+            """
+            CREATE TABLE IF NOT EXISTS content_fingerprints (
+                signature BLOB NOT NULL,
+                user_id INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
             """
         ]
         
         try:
             with self.get_connection() as conn:
+                # Readers (and the online backup) never block writers in WAL mode
+                conn.execute("PRAGMA journal_mode = WAL")
                 for table_sql in tables:
                     conn.execute(table_sql)
                 
+                self.migrate_columns(conn)
+                self.create_indexes(conn)
+                
                 # Insert default data
                 self.insert_default_data(conn)
+                self.load_level_thresholds(conn)
+                self.backfill_activity_rollup(conn)
+                self.load_fingerprints(conn)
                 
         except Exception as e:
             logging.error(f"Error initializing database: {e}")
 
+    def create_indexes(self, conn):
+        """Create secondary indexes (no-op for those that exist)"""
+        for index_sql in self.INDEXES:
+            conn.execute(index_sql)
+
+    def drop_indexes(self, conn):
+        """Drop secondary indexes so bulk loads skip per-row index maintenance"""
+        for index_sql in self.INDEXES:
+            name = index_sql.split(" IF NOT EXISTS ")[1].split()[0]
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def migrate_columns(self, conn):
+        """Add columns missing from databases created by older versions"""
+        added = set()
+        for table, column, column_def in self.MIGRATED_COLUMNS:
+            existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_def}")
+                added.add((table, column))
+        
+        if ('threads', 'hot_score') in added:
+            self.backfill_hot_scores(conn)
+
+    def backfill_hot_scores(self, conn):
+        """Seed hot scores for existing threads from their replies and views"""
+        weights = Config.HOT_SCORE_WEIGHTS
+        now = time.time()
+        conn.execute(
+            "UPDATE threads SET hot_score = (? + ? * reply_count + ? * views) * "
+            "hot_decay(CAST(strftime('%s', last_reply_at) AS REAL), ?), hot_updated_at = ?",
+            (weights['thread'], weights['reply'], weights['view'], now, now)
+        )
+
+    def backfill_activity_rollup(self, conn):
+        """Build the activity rollup from existing content on first run"""
+        if conn.execute("SELECT 1 FROM activity_rollup LIMIT 1").fetchone():
+            return
+        if not conn.execute("SELECT 1 FROM threads LIMIT 1").fetchone():
+            return
+        
+        points = Config.EXPERIENCE_PER_ACTION
+        conn.execute(
+            "INSERT INTO activity_rollup (day, forum_id, user_id, threads, replies, tournaments, points) "
+            "SELECT day, forum_id, user_id, SUM(threads), SUM(replies), SUM(tournaments), "
+            "SUM(threads) * ? + SUM(replies) * ? + SUM(tournaments) * ? FROM ("
+            "  SELECT date(created_at) AS day, forum_id, creator_id AS user_id, 1 AS threads, 0 AS replies, 0 AS tournaments FROM threads"
+            "  UNION ALL"
+            "  SELECT date(r.created_at), t.forum_id, r.user_id, 0, 1, 0 FROM replies r JOIN threads t ON r.thread_id = t.id"
+            "  UNION ALL"
+            "  SELECT date(joined_at), 0, user_id, 0, 0, 1 FROM tournament_participants"
+            ") GROUP BY day, forum_id, user_id",
+            (points['thread_created'], points['reply_posted'], points['tournament_joined'])
+        )
+
     def insert_default_data(self, conn):
         """Insert default forums and badges"""
         # Default forums
@@ -228,20 +473,42 @@ class SuperDatabase:
                 default_badges
             )
 
+    def load_fingerprints(self, conn):
+        """Warm the duplicate index with the newest signatures inside the window"""
+        rows = conn.execute(
+            "SELECT signature, user_id, created_at FROM content_fingerprints WHERE created_at >= ? "
+            "ORDER BY created_at DESC LIMIT ?",
+            (time.time() - Config.SPAM_WINDOW, Config.SPAM_INDEX_CAPACITY)
+        ).fetchall()
+        for signature, user_id, created_at in reversed(rows):
+            self.duplicates.add(unpack_signature(signature), user_id, created_at)
+
+    def load_level_thresholds(self, conn):
+        """Store the precomputed level curve and resync stored levels"""
+        rows = [(level, min_xp) for level, min_xp in enumerate(self.level_thresholds, 1)]
+        stored = conn.execute("SELECT level, min_experience FROM level_thresholds ORDER BY level").fetchall()
+        if [tuple(row) for row in stored] == rows:
+            return
+        
+        conn.execute("DELETE FROM level_thresholds")
+        conn.executemany("INSERT INTO level_thresholds (level, min_experience) VALUES (?, ?)", rows)
+        conn.execute(f"UPDATE users SET level = {self.LEVEL_FOR_EXPERIENCE_SQL}", (0,))
+
     # ==================== USER MANAGEMENT ====================
-    def get_user(self, user_id: int) -> Dict[str, Any]:
+    def get_user(self, user_id: int) -> User:
         """Get user with combined stats"""
         try:
             with self.get_connection() as conn:
-                user = conn.execute(
-                    "SELECT u.*, us.post_count, us.badge_count, us.following_count, us.follower_count "
+                user = fetch_one(
+                    conn, User,
+                    f"SELECT {User.PROFILE}, us.post_count, us.badge_count, us.following_count, us.follower_count "
                     "FROM users u LEFT JOIN user_stats us ON u.telegram_id = us.user_id "
                     "WHERE u.telegram_id = ?", 
                     (user_id,)
-                ).fetchone()
+                )
                 
                 if user:
-                    return dict(user)
+                    return user
                 
                 # Create new user
                 return self.create_default_user(user_id)
@@ -250,7 +517,7 @@ class SuperDatabase:
             logging.error(f"Error getting user {user_id}: {e}")
             return self.create_default_user(user_id)
 
-    def create_default_user(self, user_id: int) -> Dict[str, Any]:
+    def create_default_user(self, user_id: int) -> User:
         """Create default user structure"""
         default_user = {
             'telegram_id': user_id,
@@ -281,7 +548,7 @@ class SuperDatabase:
         except Exception as e:
             logging.error(f"Error creating default user: {e}")
             
-        return default_user
+        return User.from_dict(default_user)
 
     def save_user(self, user_id: int, user_data: Dict[str, Any]):
         """Save user data"""
@@ -310,12 +577,18 @@ class SuperDatabase:
 
     def update_user_stats(self, user_id: int, updates: Dict[str, Any]):
         """Update user statistics"""
+        old_level = new_level = None
         try:
             with self.get_connection() as conn:
                 # Update users table
                 user_fields = ['threads_created', 'replies_posted', 'tournaments_joined', 'reputation', 'experience', 'level']
                 user_updates = {k: v for k, v in updates.items() if k in user_fields}
                 
+                if 'experience' in user_updates:
+                    # Level always follows experience
+                    user_updates.pop('level', None)
+                    old_level, new_level = self._apply_experience(conn, user_id, user_updates.pop('experience'))
+                
                 if user_updates:
                     set_clause = ', '.join([f"{k} = {k} + ?" for k in user_updates.keys()])
                     values = list(user_updates.values())
@@ -332,13 +605,107 @@ class SuperDatabase:
                     
         except Exception as e:
             logging.error(f"Error updating user stats {user_id}: {e}")
+            return
+        
+        self._notify_level_up(user_id, old_level, new_level)
+
+    # ==================== EXPERIENCE & LEVELS ====================
+    def _apply_experience(self, conn, user_id: int, amount: int) -> Tuple[Optional[int], Optional[int]]:
+        """Add XP and recompute level in one UPDATE, returns (old_level, new_level)"""
+        row = conn.execute("SELECT level FROM users WHERE telegram_id = ?", (user_id,)).fetchone()
+        if not row:
+            return None, None
+        
+        conn.execute(
+            f"UPDATE users SET experience = experience + ?, level = {self.LEVEL_FOR_EXPERIENCE_SQL} WHERE telegram_id = ?",
+            (amount, amount, user_id)
+        )
+        new_level = conn.execute("SELECT level FROM users WHERE telegram_id = ?", (user_id,)).fetchone()[0]
+        return row[0], new_level
+
+    def _notify_level_up(self, user_id: int, old_level: Optional[int], new_level: Optional[int]):
+        """Publish LevelUp once the XP change is committed"""
+        if old_level is None or new_level is None or new_level <= old_level:
+            return
+        
+        self.events.publish(LevelUp(user_id, old_level, new_level))
+
+    def _reward(self, conn, user_id: int, action: Optional[str] = None,
+                achievements: bool = False) -> Tuple[List[str], Optional[int], Optional[int]]:
+        """Award an action's XP and any achievement badges now earned inside the write's transaction.
+
+        Returns (badges awarded, old_level, new_level) for _publish_rewards()
+        once the transaction has committed.
+        """
+        old_level = new_level = None
+        if action:
+            old_level, new_level = self._apply_experience(conn, user_id, Config.EXPERIENCE_PER_ACTION.get(action, 0))
+        
+        badges = []
+        if achievements:
+            stats = ', '.join(dict.fromkeys(stat for stat, _ in Config.ACHIEVEMENT_BADGES.values()))
+            row = conn.execute(
+                f"SELECT {stats} FROM users u LEFT JOIN user_stats us ON us.user_id = u.telegram_id WHERE u.telegram_id = ?",
+                (user_id,)
+            ).fetchone()
+            for badge_name, (stat, required) in Config.ACHIEVEMENT_BADGES.items():
+                if not row or (row[stat] or 0) < required:
+                    continue
+                awarded, badge_old_level, badge_new_level = self._award_badge(conn, user_id, badge_name)
+                if awarded:
+                    badges.append(badge_name)
+                    old_level = badge_old_level if old_level is None else old_level
+                    new_level = badge_new_level
+        return badges, old_level, new_level
+
+    def _publish_rewards(self, user_id: int, rewards: Tuple[List[str], Optional[int], Optional[int]]):
+        """Publish BadgeAwarded and LevelUp for a committed _reward()"""
+        badges, old_level, new_level = rewards
+        for badge_name in badges:
+            self.events.publish(BadgeAwarded(user_id, badge_name))
+        self._notify_level_up(user_id, old_level, new_level)
+
+    def award_experience(self, user_id: int, action: str) -> Optional[int]:
+        """Award XP for an action from Config.EXPERIENCE_PER_ACTION, returns new level"""
+        amount = Config.EXPERIENCE_PER_ACTION.get(action, 0)
+        try:
+            with self.get_connection() as conn:
+                old_level, new_level = self._apply_experience(conn, user_id, amount)
+        except Exception as e:
+            logging.error(f"Error awarding experience to {user_id}: {e}")
+            return None
+        
+        self._notify_level_up(user_id, old_level, new_level)
+        return new_level
+
+    def get_level_progress(self, experience: int) -> Dict[str, Any]:
+        """Get level and progress towards the next level for an XP total"""
+        level = max(1, bisect_right(self.level_thresholds, experience))
+        current_level_xp = self.level_thresholds[level - 1]
+        
+        if level >= len(self.level_thresholds):
+            return {
+                'level': level,
+                'current_level_xp': current_level_xp,
+                'next_level_xp': None,
+                'progress_percent': 100.0
+            }
+        
+        next_level_xp = self.level_thresholds[level]
+        progress_percent = (experience - current_level_xp) / (next_level_xp - current_level_xp) * 100
+        return {
+            'level': level,
+            'current_level_xp': current_level_xp,
+            'next_level_xp': next_level_xp,
+            'progress_percent': progress_percent
+        }
 
     # ==================== TOURNAMENT MANAGEMENT ====================
-    def get_tournaments(self, status: str = None, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_tournaments(self, status: str = None, limit: int = 10) -> List[Tournament]:
         """Get tournaments with filtering"""
         try:
             with self.get_connection() as conn:
-                query = "SELECT t.*, u.username as creator_name FROM tournaments t LEFT JOIN users u ON t.creator_id = u.telegram_id"
+                query = f"SELECT {Tournament.SUMMARY}, u.username as creator_name FROM tournaments t LEFT JOIN users u ON t.creator_id = u.telegram_id"
                 params = []
                 
                 if status:
@@ -348,21 +715,20 @@ class SuperDatabase:
                 query += " ORDER BY t.created_at DESC LIMIT ?"
                 params.append(limit)
                 
-                tournaments = conn.execute(query, params).fetchall()
-                return [dict(tournament) for tournament in tournaments]
+                return fetch_all(conn, Tournament, query, params)
         except Exception as e:
             logging.error(f"Error getting tournaments: {e}")
             return []
 
-    def get_tournament(self, tournament_id: int) -> Optional[Dict[str, Any]]:
+    def get_tournament(self, tournament_id: int) -> Optional[Tournament]:
         """Get specific tournament"""
         try:
             with self.get_connection() as conn:
-                tournament = conn.execute(
-                    "SELECT t.*, u.username as creator_name FROM tournaments t LEFT JOIN users u ON t.creator_id = u.telegram_id WHERE t.id = ?", 
+                return fetch_one(
+                    conn, Tournament,
+                    f"SELECT {Tournament.DETAIL}, u.username as creator_name FROM tournaments t LEFT JOIN users u ON t.creator_id = u.telegram_id WHERE t.id = ?", 
                     (tournament_id,)
-                ).fetchone()
-                return dict(tournament) if tournament else None
+                )
         except Exception as e:
             logging.error(f"Error getting tournament {tournament_id}: {e}")
             return None
@@ -384,10 +750,15 @@ class SuperDatabase:
                         tournament_data.get('prize_pool', 'Glory')
                     )
                 )
-                return cursor.lastrowid
+                tournament_id = cursor.lastrowid
+                rewards = self._reward(conn, tournament_data['creator_id'], 'thread_created')
         except Exception as e:
             logging.error(f"Error creating tournament: {e}")
             return 0
+        
+        self.events.publish(TournamentCreated(tournament_id, tournament_data['creator_id']))
+        self._publish_rewards(tournament_data['creator_id'], rewards)
+        return tournament_id
 
     def join_tournament(self, user_id: int, tournament_id: int) -> bool:
         """Join a tournament"""
@@ -419,11 +790,41 @@ class SuperDatabase:
                     "UPDATE users SET tournaments_joined = tournaments_joined + 1 WHERE telegram_id = ?",
                     (user_id,)
                 )
-                
-                return True
+                self._record_activity(conn, user_id, 0, 'tournaments', 'tournament_joined')
+                rewards = self._reward(conn, user_id, 'tournament_joined')
         except Exception as e:
             logging.error(f"Error joining tournament: {e}")
             return False
+        
+        self.events.publish(TournamentJoined(tournament_id, user_id))
+        self._publish_rewards(user_id, rewards)
+        return True
+
+    def complete_tournament(self, tournament_id: int, winner_id: int) -> bool:
+        """Mark tournament completed and reward the winner"""
+        try:
+            with self.get_connection() as conn:
+                result = conn.execute(
+                    "UPDATE tournaments SET status = 'completed' WHERE id = ? AND status != 'completed' "
+                    "AND EXISTS (SELECT 1 FROM tournament_participants WHERE tournament_id = ? AND user_id = ?)",
+                    (tournament_id, tournament_id, winner_id)
+                )
+                if result.rowcount == 0:
+                    return False
+                
+                old_level, new_level = self._apply_experience(conn, winner_id, Config.EXPERIENCE_PER_ACTION['tournament_won'])
+                awarded, _, badge_level = self._award_badge(conn, winner_id, 'Tournament Champion')
+                if awarded:
+                    new_level = badge_level
+        except Exception as e:
+            logging.error(f"Error completing tournament {tournament_id}: {e}")
+            return False
+        
+        self.events.publish(TournamentCompleted(tournament_id, winner_id))
+        if awarded:
+            self.events.publish(BadgeAwarded(winner_id, 'Tournament Champion'))
+        self._notify_level_up(winner_id, old_level, new_level)
+        return True
 
     def get_tournament_participants(self, tournament_id: int) -> List[int]:
         """Get tournament participants"""
@@ -438,81 +839,102 @@ class SuperDatabase:
             logging.error(f"Error getting tournament participants: {e}")
             return []
 
+    def get_tournament_players(self, tournament_id: int, limit: int = Config.TOURNAMENT_PLAYERS_PAGE_SIZE,
+                               offset: int = 0) -> List[User]:
+        """Page of tournament participants with their profiles, in joining order"""
+        try:
+            with self.get_connection() as conn:
+                return fetch_all(
+                    conn, User,
+                    f"SELECT {User.LISTING} FROM tournament_participants p "
+                    "JOIN users u ON p.user_id = u.telegram_id "
+                    "WHERE p.tournament_id = ? ORDER BY p.id LIMIT ? OFFSET ?",
+                    (tournament_id, limit, offset)
+                )
+        except Exception as e:
+            logging.error(f"Error getting tournament players for {tournament_id}: {e}")
+            return []
+
     # ==================== FORUM MANAGEMENT ====================
-    def get_forums(self, featured_only: bool = False) -> List[Dict[str, Any]]:
+    def get_forums(self, featured_only: bool = False) -> List[Forum]:
         """Get forums"""
         try:
             with self.get_connection() as conn:
-                query = "SELECT * FROM forums"
+                query = f"SELECT {Forum.SUMMARY} FROM forums f"
                 if featured_only:
-                    query += " WHERE is_featured = 1"
-                query += " ORDER BY thread_count DESC"
+                    query += " WHERE f.is_featured = 1"
+                query += " ORDER BY f.thread_count DESC"
                 
-                forums = conn.execute(query).fetchall()
-                return [dict(forum) for forum in forums]
+                return fetch_all(conn, Forum, query)
         except Exception as e:
             logging.error(f"Error getting forums: {e}")
             return []
 
-    def get_forum(self, forum_id: int) -> Optional[Dict[str, Any]]:
+    def get_forum(self, forum_id: int) -> Optional[Forum]:
         """Get specific forum"""
         try:
             with self.get_connection() as conn:
-                forum = conn.execute(
-                    "SELECT * FROM forums WHERE id = ?", 
+                return fetch_one(
+                    conn, Forum,
+                    f"SELECT {Forum.DETAIL} FROM forums f WHERE f.id = ?", 
                     (forum_id,)
-                ).fetchone()
-                return dict(forum) if forum else None
+                )
         except Exception as e:
             logging.error(f"Error getting forum {forum_id}: {e}")
             return None
 
-    def get_threads(self, forum_id: int = None, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_threads(self, forum_id: int = None, limit: int = 10) -> List[Thread]:
         """Get threads"""
         try:
             with self.get_connection() as conn:
                 if forum_id:
-                    threads = conn.execute(
-                        "SELECT t.*, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id WHERE t.forum_id = ? ORDER BY t.created_at DESC LIMIT ?",
+                    return fetch_all(
+                        conn, Thread,
+                        f"SELECT {Thread.SUMMARY}, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id WHERE t.forum_id = ? ORDER BY t.created_at DESC LIMIT ?",
                         (forum_id, limit)
-                    ).fetchall()
-                else:
-                    threads = conn.execute(
-                        "SELECT t.*, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id ORDER BY t.created_at DESC LIMIT ?",
-                        (limit,)
-                    ).fetchall()
-                
-                return [dict(thread) for thread in threads]
+                    )
+                return fetch_all(
+                    conn, Thread,
+                    f"SELECT {Thread.SUMMARY}, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id ORDER BY t.created_at DESC LIMIT ?",
+                    (limit,)
+                )
         except Exception as e:
             logging.error(f"Error getting threads: {e}")
             return []
 
-    def get_thread(self, thread_id: int) -> Optional[Dict[str, Any]]:
-        """Get specific thread"""
+    def get_thread(self, thread_id: int) -> Optional[Thread]:
+        """Get specific thread, from the archive if it has been moved there"""
         try:
             with self.get_connection() as conn:
-                thread = conn.execute(
-                    "SELECT t.*, u.username as creator_name, f.name as forum_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id JOIN forums f ON t.forum_id = f.id WHERE t.id = ?", 
-                    (thread_id,)
-                ).fetchone()
-                return dict(thread) if thread else None
+                query = (
+                    f"SELECT {Thread.DETAIL}, u.username as creator_name, f.name as forum_name "
+                    "FROM {schema}.threads t JOIN main.users u ON t.creator_id = u.telegram_id "
+                    "JOIN main.forums f ON t.forum_id = f.id WHERE t.id = ?"
+                )
+                thread = fetch_one(conn, Thread, query.format(schema='main'), (thread_id,))
+                if thread is None and self._attach_archive(conn, create=False):
+                    thread = fetch_one(conn, Thread, query.format(schema='archive'), (thread_id,))
+                return thread
         except Exception as e:
             logging.error(f"Error getting thread {thread_id}: {e}")
             return None
 
     def create_thread(self, thread_data: Dict[str, Any]) -> int:
         """Create new thread"""
+        signature = minhash(thread_data['content'] or '')
         try:
             with self.get_connection() as conn:
                 cursor = conn.execute(
-                    "INSERT INTO threads (title, content, forum_id, creator_id, reply_count, views) VALUES (?, ?, ?, ?, ?, ?)",
+                    "INSERT INTO threads (title, content, forum_id, creator_id, reply_count, views, hot_score, hot_updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
                     (
                         thread_data['title'],
                         thread_data['content'],
                         thread_data['forum_id'],
                         thread_data['creator_id'],
                         thread_data.get('reply_count', 0),
-                        thread_data.get('views', 0)
+                        thread_data.get('views', 0),
+                        Config.HOT_SCORE_WEIGHTS['thread'],
+                        time.time()
                     )
                 )
                 thread_id = cursor.lastrowid
@@ -528,30 +950,132 @@ class SuperDatabase:
                     "UPDATE users SET threads_created = threads_created + 1 WHERE telegram_id = ?",
                     (thread_data['creator_id'],)
                 )
-                
-                return thread_id
+                self._record_activity(conn, thread_data['creator_id'], thread_data['forum_id'], 'threads', 'thread_created')
+                created_at = self._save_fingerprint(conn, signature, thread_data['creator_id'])
+                rewards = self._reward(conn, thread_data['creator_id'], 'thread_created', achievements=True)
         except Exception as e:
             logging.error(f"Error creating thread: {e}")
             return 0
+        
+        if signature:
+            self.duplicates.add(signature, thread_data['creator_id'], created_at)
+        
+        self.events.publish(ThreadCreated(thread_id, thread_data['forum_id'], thread_data['creator_id']))
+        self._publish_rewards(thread_data['creator_id'], rewards)
+        return thread_id
+
+    def record_thread_view(self, thread_id: int):
+        """Count a thread view and bump its hot score, buffered until flush_thread_views()"""
+        self._buffer_views(thread_id, 1, Config.HOT_SCORE_WEIGHTS['view'], time.time())
+        if len(self.view_buffer) >= Config.VIEW_BUFFER_MAX_THREADS:
+            self.flush_thread_views()
+
+    def _buffer_views(self, thread_id: int, views: int, score: float, as_of: float):
+        """Add views to the buffer, keeping their hot score decayed to the latest view"""
+        pending = self.view_buffer.get(thread_id)
+        if pending is None:
+            self.view_buffer[thread_id] = [views, score, as_of]
+            return
+        
+        latest = max(pending[2], as_of)
+        pending[0] += views
+        pending[1] = pending[1] * hot_decay(pending[2], latest) + score * hot_decay(as_of, latest)
+        pending[2] = latest
+
+    def flush_thread_views(self) -> int:
+        """Write buffered views and their hot score in one transaction, returns threads updated"""
+        if not self.view_buffer:
+            return 0
+        
+        pending, self.view_buffer = self.view_buffer, {}
+        now = time.time()
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    "UPDATE threads SET views = views + ?, "
+                    "hot_score = hot_score * hot_decay(hot_updated_at, ?) + ?, hot_updated_at = ? WHERE id = ?",
+                    [
+                        (views, now, score * hot_decay(as_of, now), now, thread_id)
+                        for thread_id, (views, score, as_of) in pending.items()
+                    ]
+                )
+            return len(pending)
+        except Exception as e:
+            logging.error(f"Error flushing views of {len(pending)} threads: {e}")
+            # Keep them for the next flush
+            for thread_id, (views, score, as_of) in pending.items():
+                self._buffer_views(thread_id, views, score, as_of)
+            return 0
+
+    def get_popular_threads(self, forum_id: int = None, limit: int = 10) -> List[Thread]:
+        """Get threads ordered by hot score"""
+        try:
+            with self.get_connection() as conn:
+                if forum_id:
+                    return fetch_all(
+                        conn, Thread,
+                        f"SELECT {Thread.SUMMARY}, t.hot_score, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id "
+                        "WHERE t.forum_id = ? AND t.hot_score > 0 ORDER BY t.hot_score DESC LIMIT ?",
+                        (forum_id, limit)
+                    )
+                return fetch_all(
+                    conn, Thread,
+                    f"SELECT {Thread.SUMMARY}, t.hot_score, u.username as creator_name FROM threads t JOIN users u ON t.creator_id = u.telegram_id "
+                    "WHERE t.hot_score > 0 ORDER BY t.hot_score DESC LIMIT ?",
+                    (limit,)
+                )
+        except Exception as e:
+            logging.error(f"Error getting popular threads: {e}")
+            return []
+
+    def decay_hot_scores(self) -> int:
+        """Re-decay all live hot scores to now, zeroing those below the floor"""
+        self.flush_thread_views()
+        now = time.time()
+        try:
+            with self.get_connection() as conn:
+                # Only rows with a live score are touched (range scan on idx_threads_hot)
+                result = conn.execute(
+                    "UPDATE threads SET hot_score = CASE "
+                    "WHEN hot_score * hot_decay(hot_updated_at, ?) < ? THEN 0 "
+                    "ELSE hot_score * hot_decay(hot_updated_at, ?) END, hot_updated_at = ? "
+                    "WHERE hot_score > 0",
+                    (now, Config.HOT_SCORE_FLOOR, now, now)
+                )
+                return result.rowcount
+        except Exception as e:
+            logging.error(f"Error decaying hot scores: {e}")
+            return 0
 
     # ==================== REPLY MANAGEMENT ====================
-    def get_replies(self, thread_id: int) -> List[Dict[str, Any]]:
-        """Get thread replies"""
+    def get_replies(self, thread_id: int, limit: int = -1, offset: int = 0) -> List[Reply]:
+        """Get thread replies oldest first, from the archive for archived threads"""
         try:
             with self.get_connection() as conn:
-                replies = conn.execute(
-                    "SELECT r.*, u.username FROM replies r JOIN users u ON r.user_id = u.telegram_id WHERE r.thread_id = ? ORDER BY r.created_at ASC",
-                    (thread_id,)
-                ).fetchall()
-                return [dict(reply) for reply in replies]
+                query = (
+                    f"SELECT {Reply.DETAIL}, u.username FROM {{schema}}.replies r JOIN main.users u ON r.user_id = u.telegram_id "
+                    "WHERE r.thread_id = ? ORDER BY r.created_at ASC, r.id ASC LIMIT ? OFFSET ?"
+                )
+                params = (thread_id, limit, offset)
+                replies = fetch_all(conn, Reply, query.format(schema='main'), params)
+                # Threads move with all their replies, so only a missing thread can have archived replies
+                if (not replies and not conn.execute("SELECT 1 FROM threads WHERE id = ?", (thread_id,)).fetchone()
+                        and self._attach_archive(conn, create=False)):
+                    replies = fetch_all(conn, Reply, query.format(schema='archive'), params)
+                return replies
         except Exception as e:
             logging.error(f"Error getting replies: {e}")
             return []
 
     def create_reply(self, reply_data: Dict[str, Any]) -> int:
         """Create new reply"""
+        signature = minhash(reply_data['content'] or '')
         try:
             with self.get_connection() as conn:
+                # A reply revives an archived thread
+                if not conn.execute("SELECT 1 FROM threads WHERE id = ?", (reply_data['thread_id'],)).fetchone():
+                    self._restore_archived_thread(conn, reply_data['thread_id'])
+                
                 cursor = conn.execute(
                     "INSERT INTO replies (content, thread_id, user_id) VALUES (?, ?, ?)",
                     (
@@ -562,10 +1086,12 @@ class SuperDatabase:
                 )
                 reply_id = cursor.lastrowid
                 
-                # Update thread reply count
+                # Update thread reply count and hot score
+                now = time.time()
                 conn.execute(
-                    "UPDATE threads SET reply_count = reply_count + 1, last_reply_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (reply_data['thread_id'],)
+                    "UPDATE threads SET reply_count = reply_count + 1, last_reply_at = CURRENT_TIMESTAMP, "
+                    "hot_score = hot_score * hot_decay(hot_updated_at, ?) + ?, hot_updated_at = ? WHERE id = ?",
+                    (now, Config.HOT_SCORE_WEIGHTS['reply'], now, reply_data['thread_id'])
                 )
                 
                 # Update forum reply count
@@ -584,11 +1110,63 @@ class SuperDatabase:
                     "UPDATE users SET replies_posted = replies_posted + 1 WHERE telegram_id = ?",
                     (reply_data['user_id'],)
                 )
-                
-                return reply_id
+                conn.execute(
+                    "UPDATE user_stats SET post_count = post_count + 1 WHERE user_id = ?",
+                    (reply_data['user_id'],)
+                )
+                self._record_activity(conn, reply_data['user_id'], thread[0] if thread else 0, 'replies', 'reply_posted')
+                created_at = self._save_fingerprint(conn, signature, reply_data['user_id'])
+                rewards = self._reward(conn, reply_data['user_id'], 'reply_posted', achievements=True)
         except Exception as e:
             logging.error(f"Error creating reply: {e}")
             return 0
+        
+        if signature:
+            self.duplicates.add(signature, reply_data['user_id'], created_at)
+        
+        self.events.publish(ReplyPosted(reply_id, reply_data['thread_id'], thread[0] if thread else 0, reply_data['user_id']))
+        self._publish_rewards(reply_data['user_id'], rewards)
+        return reply_id
+
+    # ==================== DUPLICATE DETECTION ====================
+    def check_duplicate(self, user_id: int, content: str) -> str:
+        """'reject' when the user keeps reposting near-copies, 'flag' when many
+        users post them, otherwise 'ok'. Call before create_reply/create_thread"""
+        signature = minhash(content or '')
+        if signature is None:
+            return 'ok'
+        
+        matches = self.duplicates.matches(signature)
+        own = sum(1 for _, author_id, _ in matches if author_id == user_id)
+        if own >= Config.SPAM_MAX_REPEATS:
+            logging.warning(f"Rejected near-duplicate post from user {user_id} ({own} earlier copies)")
+            return 'reject'
+        if len(matches) >= Config.SPAM_FLAG_MATCHES:
+            logging.warning(f"Flagged near-duplicate post from user {user_id} ({len(matches)} copies by "
+                            f"{len({author_id for _, author_id, _ in matches})} users)")
+            return 'flag'
+        return 'ok'
+
+    def _save_fingerprint(self, conn, signature: Optional[Tuple[int, ...]], user_id: int) -> float:
+        created_at = time.time()
+        if signature:
+            conn.execute(
+                "INSERT INTO content_fingerprints (signature, user_id, created_at) VALUES (?, ?, ?)",
+                (pack_signature(signature), user_id, created_at)
+            )
+        return created_at
+
+    def prune_fingerprints(self) -> int:
+        """Delete stored signatures that fell out of the duplicate window"""
+        try:
+            with self.get_connection() as conn:
+                return conn.execute(
+                    "DELETE FROM content_fingerprints WHERE created_at < ?",
+                    (time.time() - Config.SPAM_WINDOW,)
+                ).rowcount
+        except Exception as e:
+            logging.error(f"Error pruning fingerprints: {e}")
+            return 0
 
     # ==================== SOCIAL MANAGEMENT ====================
     def follow_user(self, follower_id: int, followed_id: int) -> bool:
@@ -619,11 +1197,16 @@ class SuperDatabase:
                     "UPDATE user_stats SET follower_count = follower_count + 1 WHERE user_id = ?",
                     (followed_id,)
                 )
-                
-                return True
+                rewards = self._reward(conn, follower_id, achievements=True)
         except Exception as e:
             logging.error(f"Error following user: {e}")
             return False
+        
+        self.invalidate_follows(follower_id)
+        self.invalidate_feed(follower_id)
+        self.events.publish(UserFollowed(follower_id, followed_id))
+        self._publish_rewards(follower_id, rewards)
+        return True
 
     def unfollow_user(self, follower_id: int, followed_id: int) -> bool:
         """Unfollow a user"""
@@ -634,21 +1217,26 @@ class SuperDatabase:
                     (follower_id, followed_id)
                 )
                 
-                if result.rowcount > 0:
-                    # Update stats
-                    conn.execute(
-                        "UPDATE user_stats SET following_count = following_count - 1 WHERE user_id = ?",
-                        (follower_id,)
-                    )
-                    conn.execute(
-                        "UPDATE user_stats SET follower_count = follower_count - 1 WHERE user_id = ?",
-                        (followed_id,)
-                    )
-                    return True
-                return False
+                if result.rowcount == 0:
+                    return False
+                
+                # Update stats
+                conn.execute(
+                    "UPDATE user_stats SET following_count = following_count - 1 WHERE user_id = ?",
+                    (follower_id,)
+                )
+                conn.execute(
+                    "UPDATE user_stats SET follower_count = follower_count - 1 WHERE user_id = ?",
+                    (followed_id,)
+                )
         except Exception as e:
             logging.error(f"Error unfollowing user: {e}")
             return False
+        
+        self.invalidate_follows(follower_id)
+        self.invalidate_feed(follower_id)
+        self.events.publish(UserUnfollowed(follower_id, followed_id))
+        return True
 
     def get_user_followers(self, user_id: int) -> List[int]:
         """Get user followers"""
@@ -693,10 +1281,13 @@ class SuperDatabase:
                     "INSERT INTO forum_follows (user_id, forum_id) VALUES (?, ?)",
                     (user_id, forum_id)
                 )
-                return True
         except Exception as e:
             logging.error(f"Error following forum: {e}")
             return False
+        
+        self.invalidate_feed(user_id)
+        self.events.publish(ForumFollowed(user_id, forum_id))
+        return True
 
     def unfollow_forum(self, user_id: int, forum_id: int) -> bool:
         """Unfollow a forum"""
@@ -706,10 +1297,15 @@ class SuperDatabase:
                     "DELETE FROM forum_follows WHERE user_id = ? AND forum_id = ?",
                     (user_id, forum_id)
                 )
-                return result.rowcount > 0
+                if result.rowcount == 0:
+                    return False
         except Exception as e:
             logging.error(f"Error unfollowing forum: {e}")
             return False
+        
+        self.invalidate_feed(user_id)
+        self.events.publish(ForumUnfollowed(user_id, forum_id))
+        return True
 
     def get_user_forum_follows(self, user_id: int) -> List[int]:
         """Get forums followed by user"""
@@ -724,6 +1320,194 @@ class SuperDatabase:
             logging.error(f"Error getting user forum follows: {e}")
             return []
 
+    def get_following_set(self, user_id: int) -> FrozenSet[int]:
+        """Cached ids of users followed by user"""
+        cached = self.follow_cache.get(user_id)
+        if cached is not None:
+            self.follow_cache.move_to_end(user_id)
+            return cached
+        
+        try:
+            with self.get_connection() as conn:
+                ids = frozenset(row[0] for row in conn.execute(
+                    "SELECT followed_id FROM user_follows WHERE follower_id = ?", (user_id,)
+                ))
+        except Exception as e:
+            logging.error(f"Error getting users followed by {user_id}: {e}")
+            return frozenset()
+        
+        self.follow_cache[user_id] = ids
+        while len(self.follow_cache) > Config.FOLLOW_CACHE_SIZE:
+            self.follow_cache.popitem(last=False)
+        return ids
+
+    def is_following(self, follower_id: int, followed_id: int) -> bool:
+        """Whether follower follows followed, without loading their whole follow list"""
+        cached = self.follow_cache.get(follower_id)
+        if cached is not None:
+            return followed_id in cached
+        
+        try:
+            with self.get_connection() as conn:
+                return conn.execute(
+                    "SELECT EXISTS (SELECT 1 FROM user_follows WHERE follower_id = ? AND followed_id = ?)",
+                    (follower_id, followed_id)
+                ).fetchone()[0] == 1
+        except Exception as e:
+            logging.error(f"Error checking follow {follower_id} -> {followed_id}: {e}")
+            return False
+
+    def invalidate_follows(self, user_id: int):
+        """Drop the cached follow set after the user follows or unfollows someone"""
+        self.follow_cache.pop(user_id, None)
+
+    def get_user_followed_forums(self, user_id: int) -> List[Forum]:
+        """Get forums followed by user with details"""
+        try:
+            with self.get_connection() as conn:
+                return fetch_all(
+                    conn, Forum,
+                    f"SELECT {Forum.SUMMARY} FROM forum_follows ff JOIN forums f ON ff.forum_id = f.id "
+                    "WHERE ff.user_id = ? ORDER BY f.name",
+                    (user_id,)
+                )
+        except Exception as e:
+            logging.error(f"Error getting user followed forums: {e}")
+            return []
+
+    def get_user_following_profiles(self, user_id: int, limit: int = 20) -> List[User]:
+        """Get most recently followed users with basic details"""
+        try:
+            with self.get_connection() as conn:
+                return fetch_all(
+                    conn, User,
+                    f"SELECT {User.LISTING} FROM user_follows uf "
+                    "JOIN users u ON uf.followed_id = u.telegram_id "
+                    "WHERE uf.follower_id = ? ORDER BY uf.created_at DESC LIMIT ?",
+                    (user_id, limit)
+                )
+        except Exception as e:
+            logging.error(f"Error getting user following profiles: {e}")
+            return []
+
+    # ==================== HOME FEED ====================
+    def _feed_cursor(self, conn, column: str, source_id: int, before: Optional[Tuple[str, int]], limit: int):
+        """Newest-first thread cursor for one followed forum or author"""
+        query = (
+            f"SELECT {Thread.SUMMARY}, u.username as creator_name "
+            f"FROM threads t JOIN users u ON t.creator_id = u.telegram_id WHERE t.{column} = ?"
+        )
+        params = [source_id]
+        if before:
+            query += " AND (t.created_at, t.id) < (?, ?)"
+            params.extend(before)
+        query += " ORDER BY t.created_at DESC, t.id DESC LIMIT ?"
+        params.append(limit)
+        cursor = conn.cursor()
+        cursor.row_factory = Thread.row_factory
+        return cursor.execute(query, params)
+
+    def _merge_feed(self, conn, forum_ids: List[int], author_ids: List[int],
+                    before: Optional[Tuple[str, int]], limit: int) -> List[Thread]:
+        """k-way merge of the per-source index scans"""
+        cursors = [self._feed_cursor(conn, 'forum_id', forum_id, before, limit) for forum_id in forum_ids]
+        cursors += [self._feed_cursor(conn, 'creator_id', author_id, before, limit) for author_id in author_ids]
+        
+        feed = []
+        seen = set()
+        for thread in heapq.merge(*cursors, key=lambda row: (row.created_at, row.id), reverse=True):
+            if thread.id in seen:
+                continue
+            seen.add(thread.id)
+            feed.append(thread)
+            if len(feed) >= limit:
+                break
+        return feed
+
+    def _scan_feed(self, conn, user_id: int, before: Optional[Tuple[str, int]], limit: int):
+        """Match the newest FEED_SCAN_ROWS threads against the user's follows.
+
+        Returns the matches and, when the scan stopped at its cap rather than the
+        end of the table, the (created_at, id) of the last thread it looked at.
+        """
+        window = "SELECT t.id FROM threads t"
+        params = []
+        if before:
+            window += " WHERE (t.created_at, t.id) < (?, ?)"
+            params.extend(before)
+        window += " ORDER BY t.created_at DESC, t.id DESC"
+        
+        feed = fetch_all(
+            conn, Thread,
+            f"SELECT {Thread.SUMMARY}, u.username as creator_name "
+            "FROM threads t JOIN users u ON t.creator_id = u.telegram_id "
+            f"WHERE t.id IN ({window} LIMIT ?) AND ("
+            "EXISTS (SELECT 1 FROM user_follows f WHERE f.follower_id = ? AND f.followed_id = t.creator_id) "
+            "OR EXISTS (SELECT 1 FROM forum_follows ff WHERE ff.user_id = ? AND ff.forum_id = t.forum_id)"
+            ") ORDER BY t.created_at DESC, t.id DESC LIMIT ?",
+            (*params, Config.FEED_SCAN_ROWS, user_id, user_id, limit)
+        )
+        if len(feed) >= limit:
+            return feed, None
+        
+        row = conn.execute(
+            window.replace("SELECT t.id", "SELECT t.created_at, t.id", 1) + " LIMIT 1 OFFSET ?",
+            (*params, Config.FEED_SCAN_ROWS - 1)
+        ).fetchone()
+        return feed, (row[0], row[1]) if row else None
+
+    def get_feed(self, user_id: int, limit: int = Config.FEED_PAGE_SIZE, before_id: int = None) -> List[Thread]:
+        """Get recent threads from followed forums and users, newest first"""
+        use_cache = before_id is None and limit == Config.FEED_PAGE_SIZE
+        if use_cache:
+            cached = self.feed_cache.get(user_id)
+            if cached and cached[0] > time.monotonic():
+                self.feed_cache.move_to_end(user_id)
+                return list(cached[1])
+        
+        try:
+            with self.get_connection() as conn:
+                before = None
+                if before_id is not None:
+                    row = conn.execute("SELECT created_at, id FROM threads WHERE id = ?", (before_id,)).fetchone()
+                    if not row:
+                        return []
+                    before = (row[0], row[1])
+                
+                forum_ids = [row[0] for row in conn.execute(
+                    "SELECT forum_id FROM forum_follows WHERE user_id = ?", (user_id,)
+                )]
+                author_ids = [row[0] for row in conn.execute(
+                    "SELECT followed_id FROM user_follows WHERE follower_id = ? LIMIT ?",
+                    (user_id, Config.FEED_MERGE_SOURCES + 1)
+                )]
+                
+                if len(forum_ids) + len(author_ids) <= Config.FEED_MERGE_SOURCES:
+                    feed = self._merge_feed(conn, forum_ids, author_ids, before, limit)
+                else:
+                    feed, boundary = self._scan_feed(conn, user_id, before, limit)
+                    if len(feed) < limit and boundary:
+                        # The newest threads were too quiet for this user's follows; carry on
+                        # below what the scan covered with a bounded cursor per source
+                        author_ids = [row[0] for row in conn.execute(
+                            "SELECT followed_id FROM user_follows WHERE follower_id = ?", (user_id,)
+                        )]
+                        feed += self._merge_feed(conn, forum_ids, author_ids, boundary, limit - len(feed))
+        except Exception as e:
+            logging.error(f"Error getting feed for {user_id}: {e}")
+            return []
+        
+        if use_cache:
+            self.feed_cache[user_id] = (time.monotonic() + Config.FEED_CACHE_TTL, feed)
+            self.feed_cache.move_to_end(user_id)
+            while len(self.feed_cache) > Config.FEED_CACHE_SIZE:
+                self.feed_cache.popitem(last=False)
+        return list(feed)
+
+    def invalidate_feed(self, user_id: int):
+        """Drop cached first feed page after the user's follows change"""
+        self.feed_cache.pop(user_id, None)
+
     # ==================== BADGE MANAGEMENT ====================
     def get_badges(self) -> List[Dict[str, Any]]:
         """Get all badges"""
@@ -735,29 +1519,44 @@ class SuperDatabase:
             logging.error(f"Error getting badges: {e}")
             return []
 
-    def award_badge(self, user_id: int, badge_name: str):
+    def award_badge(self, user_id: int, badge_name: str) -> bool:
         """Award badge to user"""
         try:
             with self.get_connection() as conn:
-                # Check if already has badge
-                existing = conn.execute(
-                    "SELECT id FROM user_badges WHERE user_id = ? AND badge_name = ?",
-                    (user_id, badge_name)
-                ).fetchone()
-                
-                if not existing:
-                    conn.execute(
-                        "INSERT INTO user_badges (user_id, badge_name) VALUES (?, ?)",
-                        (user_id, badge_name)
-                    )
-                    
-                    # Update badge count
-                    conn.execute(
-                        "UPDATE user_stats SET badge_count = badge_count + 1 WHERE user_id = ?",
-                        (user_id,)
-                    )
+                awarded, old_level, new_level = self._award_badge(conn, user_id, badge_name)
         except Exception as e:
             logging.error(f"Error awarding badge: {e}")
+            return False
+        
+        if awarded:
+            self.events.publish(BadgeAwarded(user_id, badge_name))
+        self._notify_level_up(user_id, old_level, new_level)
+        return awarded
+
+    def _award_badge(self, conn, user_id: int, badge_name: str) -> Tuple[bool, Optional[int], Optional[int]]:
+        """Award badge and its XP inside an open transaction"""
+        # Check if already has badge
+        existing = conn.execute(
+            "SELECT id FROM user_badges WHERE user_id = ? AND badge_name = ?",
+            (user_id, badge_name)
+        ).fetchone()
+        
+        if existing:
+            return False, None, None
+        
+        conn.execute(
+            "INSERT INTO user_badges (user_id, badge_name) VALUES (?, ?)",
+            (user_id, badge_name)
+        )
+        
+        # Update badge count
+        conn.execute(
+            "UPDATE user_stats SET badge_count = badge_count + 1 WHERE user_id = ?",
+            (user_id,)
+        )
+        
+        old_level, new_level = self._apply_experience(conn, user_id, Config.EXPERIENCE_PER_ACTION['badge_earned'])
+        return True, old_level, new_level
 
     def get_user_badges(self, user_id: int) -> List[Dict[str, Any]]:
         """Get user badges"""
@@ -781,8 +1580,8 @@ class SuperDatabase:
                 
                 queries = {
                     'total_users': "SELECT COUNT(*) FROM users",
-                    'total_threads': "SELECT COUNT(*) FROM threads",
-                    'total_replies': "SELECT COUNT(*) FROM replies",
+                    'total_threads': "SELECT COALESCE(SUM(thread_count), 0) FROM forums",
+                    'total_replies': "SELECT COALESCE(SUM(reply_count), 0) FROM forums",
                     'total_tournaments': "SELECT COUNT(*) FROM tournaments",
                     'active_tournaments': "SELECT COUNT(*) FROM tournaments WHERE status = 'active'"
                 }
@@ -795,7 +1594,47 @@ class SuperDatabase:
             logging.error(f"Error getting quick stats: {e}")
             return {}
 
-    def get_user_rankings(self, limit: int = 10, criteria: str = 'reputation') -> List[Dict[str, Any]]:
+    def _record_activity(self, conn, user_id: int, forum_id: int, column: str, action: str):
+        """Bump today's rollup bucket inside the write transaction"""
+        conn.execute(
+            f"INSERT INTO activity_rollup (day, forum_id, user_id, {column}, points) VALUES (date('now'), ?, ?, 1, ?) "
+            f"ON CONFLICT (day, forum_id, user_id) DO UPDATE SET {column} = {column} + 1, points = points + excluded.points",
+            (forum_id or 0, user_id, Config.EXPERIENCE_PER_ACTION[action])
+        )
+
+    def get_window_start(self, window: str) -> str:
+        """First day (UTC) of a leaderboard window: 'week', 'month' or 'all'"""
+        today = datetime.utcnow().date()
+        if window == 'week':
+            return (today - timedelta(days=today.weekday())).isoformat()
+        if window == 'month':
+            return today.replace(day=1).isoformat()
+        return '0000-00-00'
+
+    def get_windowed_rankings(self, window: str = 'week', forum_id: int = None, limit: int = 10) -> List[User]:
+        """Get user rankings by activity points within a time window"""
+        try:
+            with self.get_connection() as conn:
+                query = (
+                    "SELECT r.user_id AS telegram_id, u.username, u.level, "
+                    "SUM(r.points) AS points, SUM(r.threads) AS threads, SUM(r.replies) AS replies "
+                    "FROM activity_rollup r JOIN users u ON r.user_id = u.telegram_id WHERE r.day >= ?"
+                )
+                params = [self.get_window_start(window)]
+                
+                if forum_id:
+                    query += " AND r.forum_id = ?"
+                    params.append(forum_id)
+                
+                query += " GROUP BY r.user_id ORDER BY points DESC LIMIT ?"
+                params.append(limit)
+                
+                return fetch_all(conn, User, query, params)
+        except Exception as e:
+            logging.error(f"Error getting windowed rankings: {e}")
+            return []
+
+    def get_user_rankings(self, limit: int = 10, criteria: str = 'reputation') -> List[User]:
         """Get user rankings"""
         valid_criteria = ['reputation', 'level', 'threads_created', 'replies_posted']
         if criteria not in valid_criteria:
@@ -803,24 +1642,545 @@ class SuperDatabase:
             
         try:
             with self.get_connection() as conn:
-                rankings = conn.execute(
-                    f"SELECT telegram_id, username, level, reputation, threads_created, replies_posted FROM users ORDER BY {criteria} DESC LIMIT ?",
+                return fetch_all(
+                    conn, User,
+                    f"SELECT {User.LISTING}, u.threads_created, u.replies_posted FROM users u ORDER BY u.{criteria} DESC LIMIT ?",
                     (limit,)
-                ).fetchall()
-                return [dict(rank) for rank in rankings]
+                )
         except Exception as e:
             logging.error(f"Error getting user rankings: {e}")
             return []
 
-    def get_all_users(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_all_users(self, limit: int = 50) -> List[User]:
         """Get all users"""
         try:
             with self.get_connection() as conn:
-                users = conn.execute(
-                    "SELECT telegram_id, username, level, reputation FROM users ORDER BY reputation DESC LIMIT ?",
+                return fetch_all(
+                    conn, User,
+                    f"SELECT {User.LISTING} FROM users u ORDER BY u.reputation DESC LIMIT ?",
                     (limit,)
-                ).fetchall()
-                return [dict(user) for user in users]
+                )
         except Exception as e:
             logging.error(f"Error getting all users: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def search_users(self, prefix: str, limit: int = Config.PLAYER_SEARCH_PAGE_SIZE, offset: int = 0) -> List[User]:
+        """Users whose username starts with prefix, case-insensitive, alphabetical"""
+        folded = prefix.translate(ASCII_LOWERCASE)
+        if not folded:
+            return []
+        
+        try:
+            with self.get_connection() as conn:
+                # Range scan on idx_users_username_folded: [prefix, prefix with its last char bumped)
+                return fetch_all(
+                    conn, User,
+                    f"SELECT {User.LISTING} FROM users u WHERE lower(u.username) >= ? AND lower(u.username) < ? "
+                    "ORDER BY lower(u.username), u.telegram_id LIMIT ? OFFSET ?",
+                    (folded, folded[:-1] + chr(ord(folded[-1]) + 1), limit, offset)
+                )
+        except Exception as e:
+            logging.error(f"Error searching users for {prefix!r}: {e}")
+            return []
+
+    # ==================== CARD QUERIES ====================
+    # Each fetches everything one card shows in a single statement: the card's
+    # list is LEFT JOINed onto its header row and follow state comes from EXISTS
+    def get_forums_menu(self, user_id: int) -> Dict[str, Any]:
+        """Featured forums flagged with the user's follows, plus community totals"""
+        try:
+            with self.get_connection() as conn:
+                # totals always yields one row, so the totals survive having no featured forums
+                rows = conn.execute(
+                    "WITH totals AS (SELECT COALESCE(SUM(thread_count), 0) AS total_threads, "
+                    "COALESCE(SUM(reply_count), 0) AS total_replies FROM forums) "
+                    f"SELECT totals.total_threads, totals.total_replies, {Forum.SUMMARY}, "
+                    "EXISTS (SELECT 1 FROM forum_follows ff WHERE ff.user_id = ? AND ff.forum_id = f.id) AS is_following "
+                    "FROM totals LEFT JOIN forums f ON f.is_featured = 1 ORDER BY f.thread_count DESC",
+                    (user_id,)
+                ).fetchall()
+        except Exception as e:
+            logging.error(f"Error getting forums menu for {user_id}: {e}")
+            return {'forums': [], 'total_threads': 0, 'total_replies': 0}
+        
+        columns = column_names(Forum.SUMMARY) + ('is_following',)
+        return {
+            'forums': [Forum.from_row(row, columns) for row in rows if row['id'] is not None],
+            'total_threads': rows[0]['total_threads'],
+            'total_replies': rows[0]['total_replies']
+        }
+
+    def get_forum_card(self, user_id: int, forum_id: int, thread_limit: int = 3) -> Optional[Dict[str, Any]]:
+        """Forum with the user's follow flag and its latest threads, None if it doesn't exist"""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {Forum.DETAIL}, "
+                    "EXISTS (SELECT 1 FROM forum_follows ff WHERE ff.user_id = ? AND ff.forum_id = f.id) AS is_following, "
+                    f"{prefixed(Thread.SUMMARY, 'thread_')}, t.creator_name AS thread_creator_name "
+                    f"FROM forums f LEFT JOIN (SELECT {Thread.SUMMARY}, u.username AS creator_name "
+                    "FROM threads t JOIN users u ON t.creator_id = u.telegram_id "
+                    "WHERE t.forum_id = ? ORDER BY t.created_at DESC LIMIT ?) t ON 1 "
+                    "WHERE f.id = ? ORDER BY t.created_at DESC",
+                    (user_id, forum_id, thread_limit, forum_id)
+                ).fetchall()
+        except Exception as e:
+            logging.error(f"Error getting forum card {forum_id}: {e}")
+            return None
+        
+        if not rows:
+            return None
+        thread_columns = column_names(Thread.SUMMARY) + ('creator_name',)
+        return {
+            'forum': Forum.from_row(rows[0], column_names(Forum.DETAIL) + ('is_following',)),
+            'threads': [Thread.from_row(row, thread_columns, 'thread_') for row in rows if row['thread_id'] is not None]
+        }
+
+    def get_thread_card(self, thread_id: int, reply_limit: int = 3) -> Optional[Dict[str, Any]]:
+        """Thread with its first replies, from the archive if it has been moved there"""
+        try:
+            with self.get_connection() as conn:
+                query = (
+                    f"SELECT {Thread.DETAIL}, u.username AS creator_name, f.name AS forum_name, "
+                    f"{prefixed(Reply.DETAIL, 'reply_')}, r.username AS reply_username "
+                    "FROM {schema}.threads t JOIN main.users u ON t.creator_id = u.telegram_id "
+                    "JOIN main.forums f ON t.forum_id = f.id "
+                    f"LEFT JOIN (SELECT {Reply.DETAIL}, ru.username FROM {{schema}}.replies r "
+                    "JOIN main.users ru ON r.user_id = ru.telegram_id "
+                    "WHERE r.thread_id = ? ORDER BY r.created_at ASC, r.id ASC LIMIT ?) r ON 1 "
+                    "WHERE t.id = ? ORDER BY r.created_at ASC, r.id ASC"
+                )
+                params = (thread_id, reply_limit, thread_id)
+                rows = conn.execute(query.format(schema='main'), params).fetchall()
+                if not rows and self._attach_archive(conn, create=False):
+                    rows = conn.execute(query.format(schema='archive'), params).fetchall()
+        except Exception as e:
+            logging.error(f"Error getting thread card {thread_id}: {e}")
+            return None
+        
+        if not rows:
+            return None
+        reply_columns = column_names(Reply.DETAIL) + ('username',)
+        return {
+            'thread': Thread.from_row(rows[0], column_names(Thread.DETAIL) + ('creator_name', 'forum_name')),
+            'replies': [Reply.from_row(row, reply_columns, 'reply_') for row in rows if row['reply_id'] is not None]
+        }
+
+    def get_profile_card(self, viewer_id: int, user_id: int, badge_limit: int = 3) -> Dict[str, Any]:
+        """User with stats, whether viewer follows them and their latest badge names"""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    f"SELECT {User.PROFILE}, us.post_count, us.badge_count, us.following_count, us.follower_count, "
+                    "EXISTS (SELECT 1 FROM user_follows uf WHERE uf.follower_id = ? AND uf.followed_id = u.telegram_id) "
+                    "AS is_following, b.id AS badge_id, b.badge_name "
+                    "FROM users u LEFT JOIN user_stats us ON u.telegram_id = us.user_id "
+                    "LEFT JOIN (SELECT id, badge_name, awarded_at FROM user_badges WHERE user_id = ? "
+                    "ORDER BY awarded_at DESC LIMIT ?) b ON 1 "
+                    "WHERE u.telegram_id = ? ORDER BY b.awarded_at DESC",
+                    (viewer_id, user_id, badge_limit, user_id)
+                ).fetchall()
+        except Exception as e:
+            logging.error(f"Error getting profile card {user_id}: {e}")
+            rows = []
+        
+        if not rows:
+            user = self.get_user(user_id)
+            user.is_following = self.is_following(viewer_id, user_id)
+            return {'user': user, 'badges': []}
+        
+        columns = column_names(User.PROFILE) + (
+            'post_count', 'badge_count', 'following_count', 'follower_count', 'is_following'
+        )
+        return {
+            'user': User.from_row(rows[0], columns),
+            'badges': [row['badge_name'] for row in rows if row['badge_id'] is not None]
+        }
+
+    # ==================== STREAMING ====================
+    def _iter_query(self, sql: str, params=(), row_factory=None, batch_size: int = Config.EXPORT_BATCH_SIZE,
+                    archive: bool = False) -> Iterator[Any]:
+        """Stream a query in fetchmany batches on its own connection.
+
+        Unlike the getters, errors propagate: a dump must fail rather than
+        silently stop early.
+        """
+        conn = self.get_connection(archive)
+        try:
+            cursor = conn.cursor()
+            if row_factory:
+                cursor.row_factory = row_factory
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_table(self, table: str, batch_size: int = Config.EXPORT_BATCH_SIZE, archive: bool = False) -> Iterator[tuple]:
+        """Stream every row of a table (of the archive database with `archive`) as plain tuples in rowid order"""
+        if table not in (self.ARCHIVE_TABLES if archive else self.TABLES):
+            raise ValueError(f"Unknown {'archive ' if archive else ''}table {table}")
+        schema = 'archive' if archive else 'main'
+        return self._iter_query(
+            f"SELECT * FROM {schema}.{table} ORDER BY rowid", row_factory=lambda cursor, row: row,
+            batch_size=batch_size, archive=archive
+        )
+
+    def iter_users(self, batch_size: int = Config.EXPORT_BATCH_SIZE) -> Iterator[User]:
+        """Stream all users"""
+        return self._iter_query(
+            f"SELECT {User.PROFILE} FROM users u ORDER BY u.telegram_id",
+            row_factory=User.row_factory, batch_size=batch_size
+        )
+
+    def iter_forums(self, batch_size: int = Config.EXPORT_BATCH_SIZE) -> Iterator[Forum]:
+        """Stream all forums"""
+        return self._iter_query(
+            f"SELECT {Forum.DETAIL} FROM forums f ORDER BY f.id",
+            row_factory=Forum.row_factory, batch_size=batch_size
+        )
+
+    def iter_threads(self, forum_id: int = None, batch_size: int = Config.EXPORT_BATCH_SIZE) -> Iterator[Thread]:
+        """Stream threads, optionally for one forum"""
+        if forum_id:
+            return self._iter_query(
+                f"SELECT {Thread.DETAIL} FROM threads t WHERE t.forum_id = ? ORDER BY t.id",
+                (forum_id,), row_factory=Thread.row_factory, batch_size=batch_size
+            )
+        return self._iter_query(
+            f"SELECT {Thread.DETAIL} FROM threads t ORDER BY t.id",
+            row_factory=Thread.row_factory, batch_size=batch_size
+        )
+
+    def iter_replies(self, thread_id: int = None, batch_size: int = Config.EXPORT_BATCH_SIZE) -> Iterator[Reply]:
+        """Stream replies, optionally for one thread in posting order"""
+        if thread_id:
+            return self._iter_query(
+                f"SELECT {Reply.DETAIL} FROM replies r WHERE r.thread_id = ? ORDER BY r.created_at",
+                (thread_id,), row_factory=Reply.row_factory, batch_size=batch_size
+            )
+        return self._iter_query(
+            f"SELECT {Reply.DETAIL} FROM replies r ORDER BY r.id",
+            row_factory=Reply.row_factory, batch_size=batch_size
+        )
+
+    def iter_tournaments(self, batch_size: int = Config.EXPORT_BATCH_SIZE) -> Iterator[Tournament]:
+        """Stream all tournaments"""
+        return self._iter_query(
+            f"SELECT {Tournament.DETAIL} FROM tournaments t ORDER BY t.id",
+            row_factory=Tournament.row_factory, batch_size=batch_size
+        )
+
+    # ==================== ARCHIVE ====================
+    def _attach_archive(self, conn, create: bool = True) -> bool:
+        """Attach the archive database as `archive`, False when there is none to read"""
+        if not create and not os.path.exists(self.archive_path):
+            return False
+        if not any(row[1] == 'archive' for row in conn.execute("PRAGMA database_list")):
+            # Both persist in the file, so only a new (or recreated) archive needs them
+            ready = self.archive_ready and os.path.exists(self.archive_path)
+            conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
+            if not ready:
+                conn.execute("PRAGMA archive.journal_mode = WAL")
+                for statement in self.ARCHIVE_SCHEMA:
+                    conn.execute(statement)
+                self.archive_ready = True
+        return True
+
+    def _archive_columns(self, conn, table: str) -> str:
+        """Columns present in both the live and archive table"""
+        archived = {row[1] for row in conn.execute(f"PRAGMA archive.table_info({table})")}
+        return ", ".join(row[1] for row in conn.execute(f"PRAGMA main.table_info({table})") if row[1] in archived)
+
+    def _move_threads(self, conn, source: str, target: str, thread_ids: List[int]) -> int:
+        """Move threads and all their replies between schemas, returns replies moved"""
+        placeholders = ", ".join("?" for _ in thread_ids)
+        thread_columns = self._archive_columns(conn, 'threads')
+        reply_columns = self._archive_columns(conn, 'replies')
+        conn.execute(
+            f"INSERT OR REPLACE INTO {target}.threads ({thread_columns}) "
+            f"SELECT {thread_columns} FROM {source}.threads WHERE id IN ({placeholders})",
+            thread_ids
+        )
+        moved = conn.execute(
+            f"INSERT OR REPLACE INTO {target}.replies ({reply_columns}) "
+            f"SELECT {reply_columns} FROM {source}.replies WHERE thread_id IN ({placeholders})",
+            thread_ids
+        ).rowcount
+        conn.execute(f"DELETE FROM {source}.replies WHERE thread_id IN ({placeholders})", thread_ids)
+        conn.execute(f"DELETE FROM {source}.threads WHERE id IN ({placeholders})", thread_ids)
+        return moved
+
+    def _restore_archived_thread(self, conn, thread_id: int) -> bool:
+        """Move an archived thread back into the live tables inside the caller's transaction"""
+        if not self._attach_archive(conn, create=False):
+            return False
+        if not conn.execute("SELECT 1 FROM archive.threads WHERE id = ?", (thread_id,)).fetchone():
+            return False
+        self._move_threads(conn, 'archive', 'main', [thread_id])
+        return True
+
+    def archive_old_threads(self, older_than_days: int = Config.ARCHIVE_AFTER_DAYS,
+                            chunk_size: int = Config.ARCHIVE_CHUNK_SIZE) -> Dict[str, int]:
+        """Move threads with no replies since the cutoff, and their replies, to the archive.
+
+        Each chunk is its own transaction across both files, so the bot is
+        only locked out for one chunk at a time. Pinned threads stay live.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+        totals = {'threads': 0, 'replies': 0}
+        try:
+            conn = self.get_connection()
+            try:
+                self._attach_archive(conn)
+                conn.commit()
+                while True:
+                    with conn:
+                        thread_ids = [row[0] for row in conn.execute(
+                            "SELECT id FROM threads WHERE last_reply_at < ? AND NOT is_pinned LIMIT ?",
+                            (cutoff, chunk_size)
+                        )]
+                        if not thread_ids:
+                            break
+                        totals['replies'] += self._move_threads(conn, 'main', 'archive', thread_ids)
+                        totals['threads'] += len(thread_ids)
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Error archiving threads: {e}")
+        
+        if totals['threads']:
+            self.feed_cache.clear()
+        return totals
+
+    # ==================== COUNTER RECONCILIATION ====================
+    def _counter_expression(self, per_schema: Optional[str], live_only: Optional[str], archived: bool) -> str:
+        if live_only:
+            return live_only
+        schemas = ['main', 'archive'] if archived else ['main']
+        return " + ".join(per_schema.format(schema=schema) for schema in schemas)
+
+    def reconcile_counters(self, chunk_size: int = Config.RECONCILE_CHUNK_SIZE,
+                           counters: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Recompute denormalized counters and fix the ones that drifted.
+
+        Walks each table in key order, chunk_size rows per short IMMEDIATE
+        transaction, so writers are never blocked for long and no concurrent
+        +1 can slip between reading the true value and writing it. Returns
+        drift per counter: rows fixed, net delta and a few examples.
+        """
+        report = {}
+        try:
+            conn = self.get_connection()
+            conn.isolation_level = None  # explicit transactions below
+            try:
+                archived = self._attach_archive(conn, create=False)
+                for name, (table, key, column, per_schema, live_only) in self.COUNTERS.items():
+                    if counters and name not in counters:
+                        continue
+                    actual = self._counter_expression(per_schema, live_only, archived)
+                    drift = {'rows': 0, 'delta': 0, 'examples': []}
+                    last_key = None
+                    
+                    while True:
+                        conn.execute("BEGIN IMMEDIATE")
+                        try:
+                            bounds = f"{key} > ?" if last_key is not None else "1"
+                            params = (last_key,) if last_key is not None else ()
+                            upper = conn.execute(
+                                f"SELECT MAX({key}) FROM (SELECT {key} FROM main.{table} WHERE {bounds} ORDER BY {key} LIMIT ?)",
+                                params + (chunk_size,)
+                            ).fetchone()[0]
+                            if upper is None:
+                                conn.execute("COMMIT")
+                                break
+                            
+                            rows = conn.execute(
+                                f"SELECT {key}, {column}, {actual} AS actual FROM main.{table} "
+                                f"WHERE {bounds} AND {key} <= ? AND {column} IS NOT actual",
+                                params + (upper,)
+                            ).fetchall()
+                            if rows:
+                                conn.executemany(
+                                    f"UPDATE main.{table} SET {column} = ? WHERE {key} = ?",
+                                    [(row[2], row[0]) for row in rows]
+                                )
+                            conn.execute("COMMIT")
+                        except Exception:
+                            conn.execute("ROLLBACK")
+                            raise
+                        
+                        drift['rows'] += len(rows)
+                        drift['delta'] += sum(row[2] - (row[1] or 0) for row in rows)
+                        drift['examples'].extend((row[0], row[1], row[2]) for row in rows[:5 - len(drift['examples'])])
+                        last_key = upper
+                    
+                    report[name] = drift
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Error reconciling counters: {e}")
+        
+        return report
+
+    # ==================== MODERATION ====================
+    def _purge_deleted(self, conn, schemas: List[str], table: str, staged: str, chunk_size: int) -> int:
+        """Delete the rows staged in a temp table, chunk_size ids per statement"""
+        deleted = 0
+        last_id = 0
+        while True:
+            upper = conn.execute(
+                f"SELECT MAX(id) FROM (SELECT id FROM {staged} WHERE id > ? ORDER BY id LIMIT ?)",
+                (last_id, chunk_size)
+            ).fetchone()[0]
+            if upper is None:
+                return deleted
+            for schema in schemas:
+                deleted += conn.execute(
+                    f"DELETE FROM {schema}.{table} WHERE id IN (SELECT id FROM {staged} WHERE id > ? AND id <= ?)",
+                    (last_id, upper)
+                ).rowcount
+            last_id = upper
+
+    def purge_user(self, user_id: int, dry_run: bool = False,
+                   chunk_size: int = Config.PURGE_CHUNK_SIZE) -> Dict[str, int]:
+        """Remove a user's threads (with every reply under them), replies, follows and participations.
+
+        Everything runs in one IMMEDIATE transaction: the doomed rows are
+        staged in temp tables, every counter they fed (other users' activity
+        rollup included) is decremented with one grouped UPDATE per table,
+        then the rows are deleted in id chunks from the live and archive
+        databases. dry_run only reports what would go, from a deferred read
+        transaction that never blocks writers.
+        """
+        result = {'threads': 0, 'replies': 0, 'follows': 0, 'participations': 0}
+        try:
+            conn = self.get_connection()
+            conn.isolation_level = None  # explicit transaction below
+            try:
+                schemas = ['main', 'archive'] if self._attach_archive(conn, create=False) else ['main']
+                conn.execute("BEGIN" if dry_run else "BEGIN IMMEDIATE")
+                try:
+                    conn.execute("CREATE TEMP TABLE purge_threads (id INTEGER PRIMARY KEY, forum_id INTEGER, creator_id INTEGER)")
+                    conn.execute(
+                        "CREATE TEMP TABLE purge_replies (id INTEGER PRIMARY KEY, thread_id INTEGER, forum_id INTEGER, user_id INTEGER, day TEXT)"
+                    )
+                    for schema in schemas:
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO purge_threads SELECT id, forum_id, creator_id FROM {schema}.threads WHERE creator_id = ?",
+                            (user_id,)
+                        )
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO purge_replies SELECT r.id, r.thread_id, COALESCE(t.forum_id, 0), r.user_id, date(r.created_at) "
+                            f"FROM {schema}.replies r LEFT JOIN {schema}.threads t ON r.thread_id = t.id WHERE r.user_id = ?",
+                            (user_id,)
+                        )
+                    for schema in schemas:
+                        # Other users' replies go down with the threads they answered
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO purge_replies SELECT r.id, r.thread_id, p.forum_id, r.user_id, date(r.created_at) "
+                            f"FROM purge_threads p JOIN {schema}.replies r ON r.thread_id = p.id"
+                        )
+                    conn.execute("CREATE INDEX temp.idx_purge_threads_forum ON purge_threads (forum_id)")
+                    conn.execute("CREATE INDEX temp.idx_purge_replies_thread ON purge_replies (thread_id)")
+                    conn.execute("CREATE INDEX temp.idx_purge_replies_forum ON purge_replies (forum_id)")
+                    conn.execute("CREATE INDEX temp.idx_purge_replies_user ON purge_replies (user_id)")
+                    
+                    result['threads'] = conn.execute("SELECT COUNT(*) FROM purge_threads").fetchone()[0]
+                    result['replies'] = conn.execute("SELECT COUNT(*) FROM purge_replies").fetchone()[0]
+                    result['follows'] = conn.execute(
+                        "SELECT COUNT(*) FROM user_follows WHERE follower_id = ? OR followed_id = ?", (user_id, user_id)
+                    ).fetchone()[0]
+                    result['participations'] = conn.execute(
+                        "SELECT COUNT(*) FROM tournament_participants WHERE user_id = ?", (user_id,)
+                    ).fetchone()[0]
+                    if dry_run:
+                        conn.execute("ROLLBACK")
+                        return result
+                    
+                    # Counters first, while the staged rows still describe what they fed
+                    conn.execute(
+                        "UPDATE forums SET "
+                        "thread_count = MAX(0, thread_count - (SELECT COUNT(*) FROM purge_threads p WHERE p.forum_id = forums.id)), "
+                        "reply_count = MAX(0, reply_count - (SELECT COUNT(*) FROM purge_replies p WHERE p.forum_id = forums.id)) "
+                        "WHERE id IN (SELECT forum_id FROM purge_threads UNION SELECT forum_id FROM purge_replies)"
+                    )
+                    for schema in schemas:
+                        conn.execute(
+                            f"UPDATE {schema}.threads SET "
+                            f"reply_count = MAX(0, reply_count - (SELECT COUNT(*) FROM purge_replies p WHERE p.thread_id = threads.id)) "
+                            f"WHERE id IN (SELECT thread_id FROM purge_replies) AND id NOT IN (SELECT id FROM purge_threads)"
+                        )
+                    conn.execute(
+                        "UPDATE users SET "
+                        "threads_created = MAX(0, threads_created - (SELECT COUNT(*) FROM purge_threads p WHERE p.creator_id = users.telegram_id)), "
+                        "replies_posted = MAX(0, replies_posted - (SELECT COUNT(*) FROM purge_replies p WHERE p.user_id = users.telegram_id)) "
+                        "WHERE telegram_id IN (SELECT user_id FROM purge_replies UNION SELECT creator_id FROM purge_threads)"
+                    )
+                    conn.execute(
+                        "UPDATE user_stats SET "
+                        "post_count = MAX(0, post_count - (SELECT COUNT(*) FROM purge_replies p WHERE p.user_id = user_stats.user_id)) "
+                        "WHERE user_id IN (SELECT user_id FROM purge_replies)"
+                    )
+                    conn.execute(
+                        "UPDATE user_stats SET follower_count = MAX(0, follower_count - 1) "
+                        "WHERE user_id IN (SELECT followed_id FROM user_follows WHERE follower_id = ?)",
+                        (user_id,)
+                    )
+                    conn.execute(
+                        "UPDATE user_stats SET following_count = MAX(0, following_count - 1) "
+                        "WHERE user_id IN (SELECT follower_id FROM user_follows WHERE followed_id = ?)",
+                        (user_id,)
+                    )
+                    conn.execute(
+                        "UPDATE tournaments SET current_teams = MAX(0, current_teams - 1) "
+                        "WHERE id IN (SELECT tournament_id FROM tournament_participants WHERE user_id = ?)",
+                        (user_id,)
+                    )
+                    # Rollup buckets (see _record_activity) of other users' replies going down with the threads
+                    conn.execute(
+                        "CREATE TEMP TABLE purge_rollup (day TEXT, forum_id INTEGER, user_id INTEGER, replies INTEGER, "
+                        "PRIMARY KEY (day, forum_id, user_id))"
+                    )
+                    conn.execute(
+                        "INSERT INTO purge_rollup SELECT day, forum_id, user_id, COUNT(*) FROM purge_replies "
+                        "WHERE user_id != ? GROUP BY day, forum_id, user_id",
+                        (user_id,)
+                    )
+                    lost = (
+                        "(SELECT p.replies FROM purge_rollup p WHERE p.day = activity_rollup.day "
+                        "AND p.forum_id = activity_rollup.forum_id AND p.user_id = activity_rollup.user_id)"
+                    )
+                    conn.execute(
+                        f"UPDATE activity_rollup SET replies = MAX(0, replies - {lost}), points = MAX(0, points - ? * {lost}) "
+                        "WHERE (day, forum_id, user_id) IN (SELECT day, forum_id, user_id FROM purge_rollup)",
+                        (Config.EXPERIENCE_PER_ACTION['reply_posted'],)
+                    )
+                    conn.execute("UPDATE users SET tournaments_joined = 0 WHERE telegram_id = ?", (user_id,))
+                    conn.execute("UPDATE user_stats SET following_count = 0, follower_count = 0 WHERE user_id = ?", (user_id,))
+                    
+                    self._purge_deleted(conn, schemas, 'replies', 'purge_replies', chunk_size)
+                    self._purge_deleted(conn, schemas, 'threads', 'purge_threads', chunk_size)
+                    conn.execute("DELETE FROM user_follows WHERE follower_id = ? OR followed_id = ?", (user_id, user_id))
+                    conn.execute("DELETE FROM tournament_participants WHERE user_id = ?", (user_id,))
+                    conn.execute("DELETE FROM forum_follows WHERE user_id = ?", (user_id,))
+                    # Their activity must not keep them on the windowed leaderboards
+                    conn.execute("DELETE FROM activity_rollup WHERE user_id = ?", (user_id,))
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.close()
+            
+            # Feeds may hold the purged threads, anyone's follow set the purged user
+            self.feed_cache.clear()
+            self.follow_cache.clear()
+        except Exception as e:
+            logging.error(f"Error purging user {user_id}: {e}")
+            return {}
+        
+        return result
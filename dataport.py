@@ -0,0 +1,226 @@
+# dataport.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Bulk Export/Import
+Streams every table, archive included, to and from gzip-compressed NDJSON
+with flat memory use
+
+Usage:
+    python dataport.py export --db soccer_forum.db --archive soccer_forum_archive.db --out dump.ndjson.gz
+    python dataport.py import --db restored.db --archive restored_archive.db --in dump.ndjson.gz
+
+Dump layout, one JSON value per line:
+    {"format": "soccerforum-ndjson", "version": 2, "tables": [...], "archive_tables": [...]}
+    {"table": "users", "columns": ["telegram_id", ...]}
+    [1, "player_1", ...]                      <- one array per row
+    {"end": "users", "rows": 1000}
+    {"table": "threads", "database": "archive", "columns": [...]}
+    ...
+    {"end": "threads", "database": "archive", "rows": 500}
+
+Sections without "database" belong to the main database (all of version 1).
+BLOB values are written as {"blob": "<base64>"}.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Any
+
+from config import Config
+from datamanager import SuperDatabase
+
+
+DUMP_FORMAT = 'soccerforum-ndjson'
+DUMP_VERSION = 2
+
+
+def table_columns(conn, table: str, schema: str = 'main') -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def encode_value(value: Any) -> Dict[str, str]:
+    """json.dumps default= hook for the values JSON has no type for"""
+    if isinstance(value, bytes):
+        return {'blob': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot dump {type(value).__name__}")
+
+
+def decode_object(obj: Dict[str, Any]) -> Any:
+    """json.loads object_hook turning encode_value() output back into bytes"""
+    if len(obj) == 1 and 'blob' in obj:
+        return base64.b64decode(obj['blob'])
+    return obj
+
+
+def section_name(table: str, schema: str) -> str:
+    return table if schema == 'main' else f"{schema}.{table}"
+
+
+def export_dump(db_path: str, out_path: str, compresslevel: int = 6,
+                archive_path: str = Config.ARCHIVE_DATABASE_PATH) -> Dict[str, int]:
+    """Write every table of the database and its archive to out_path, returns rows per table"""
+    db = SuperDatabase(db_path, archive_path=archive_path)
+    # Never create an empty archive just to export nothing from it
+    archive_tables = db.ARCHIVE_TABLES if os.path.exists(archive_path) else []
+    counts = {}
+
+    with gzip.open(out_path, 'wt', encoding='utf-8', compresslevel=compresslevel) as f:
+        f.write(json.dumps({
+            'format': DUMP_FORMAT, 'version': DUMP_VERSION,
+            'exported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'tables': db.TABLES,
+            'archive_tables': archive_tables
+        }) + "\n")
+
+        sections = [(table, 'main') for table in db.TABLES] + [(table, 'archive') for table in archive_tables]
+        for table, schema in sections:
+            archive = schema == 'archive'
+            conn = db.get_connection(archive)
+            columns = table_columns(conn, table, schema)
+            conn.close()
+
+            database = {'database': schema} if archive else {}
+            f.write(json.dumps({'table': table, **database, 'columns': columns}) + "\n")
+            rows = 0
+            for row in db.iter_table(table, archive=archive):
+                f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=encode_value) + "\n")
+                rows += 1
+            f.write(json.dumps({'end': table, **database, 'rows': rows}) + "\n")
+            counts[section_name(table, schema)] = rows
+            print(f"   📤 {section_name(table, schema)}: {rows}")
+
+    return counts
+
+
+class TableLoader:
+    """Batches rows of one dump section into executemany calls"""
+
+    def __init__(self, conn, table: str, dump_columns: List[str], batch_size: int, schema: str = 'main'):
+        target = set(table_columns(conn, table, schema))
+        # Columns dropped since the dump was made are skipped, new ones take their defaults
+        self.positions = [i for i, column in enumerate(dump_columns) if column in target]
+        columns = [dump_columns[i] for i in self.positions]
+        self.sql = (
+            f"INSERT OR REPLACE INTO {schema}.{table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        self.conn = conn
+        self.batch_size = batch_size
+        self.batch = []
+        self.rows = 0
+
+    def add(self, row: List[Any]) -> bool:
+        """Queue a row, returns True when a batch was written"""
+        self.batch.append([row[i] for i in self.positions])
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        if self.batch:
+            self.conn.executemany(self.sql, self.batch)
+            self.rows += len(self.batch)
+            self.batch.clear()
+
+
+def import_dump(db_path: str, in_path: str, batch_size: int = Config.IMPORT_BATCH_SIZE,
+                commit_rows: int = Config.IMPORT_COMMIT_ROWS,
+                archive_path: str = Config.ARCHIVE_DATABASE_PATH) -> Dict[str, int]:
+    """Load a dump into db_path and its archive (ideally fresh files), returns rows per table"""
+    db = SuperDatabase(db_path, archive_path=archive_path)
+    conn = db.get_connection(archive=True)
+    counts = {}
+    loader = None
+    uncommitted = 0
+
+    # Durability is pointless mid-import: a failed import is simply rerun
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA archive.synchronous = OFF")
+    db.drop_indexes(conn)
+    conn.commit()
+
+    try:
+        with gzip.open(in_path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('format') != DUMP_FORMAT or header.get('version', 0) > DUMP_VERSION:
+                raise ValueError(f"{in_path} is not a {DUMP_FORMAT} v{DUMP_VERSION} dump")
+
+            for line in f:
+                record = json.loads(line, object_hook=decode_object)
+
+                if isinstance(record, list):
+                    if loader and loader.add(record):
+                        uncommitted += batch_size
+                        if uncommitted >= commit_rows:
+                            conn.commit()
+                            uncommitted = 0
+                elif 'columns' in record:
+                    table, schema = record['table'], record.get('database', 'main')
+                    if table in {'main': db.TABLES, 'archive': db.ARCHIVE_TABLES}.get(schema, []):
+                        loader = TableLoader(conn, table, record['columns'], batch_size, schema)
+                    else:
+                        logging.warning(f"Skipping unknown table {section_name(table, schema)}")
+                        loader = None
+                elif 'end' in record:
+                    if loader:
+                        loader.flush()
+                        name = section_name(record['end'], record.get('database', 'main'))
+                        counts[name] = loader.rows
+                        if loader.rows != record['rows']:
+                            logging.warning(f"{name}: dump says {record['rows']} rows, loaded {loader.rows}")
+                        print(f"   📥 {name}: {loader.rows}")
+                    loader = None
+
+        conn.commit()
+    finally:
+        print("   🔨 Building indexes...")
+        db.create_indexes(conn)
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import SoccerForum data as compressed NDJSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="Dump every table")
+    export_parser.add_argument('--db', default=Config.DATABASE_PATH)
+    export_parser.add_argument('--archive', default=Config.ARCHIVE_DATABASE_PATH, help="Archive database to dump alongside")
+    export_parser.add_argument('--out', required=True, help="Output file, e.g. dump.ndjson.gz")
+    export_parser.add_argument('--level', type=int, default=6, help="gzip compression level (1-9)")
+
+    import_parser = commands.add_parser('import', help="Load a dump")
+    import_parser.add_argument('--db', required=True, help="Target database (created if missing)")
+    import_parser.add_argument('--archive', required=True, help="Target archive database (created if missing)")
+    import_parser.add_argument('--in', dest='in_path', required=True, help="Dump file to load")
+    import_parser.add_argument('--batch-size', type=int, default=Config.IMPORT_BATCH_SIZE)
+    import_parser.add_argument('--commit-rows', type=int, default=Config.IMPORT_COMMIT_ROWS)
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    try:
+        if args.command == 'export':
+            print(f"📦 Exporting {args.db} -> {args.out}")
+            counts = export_dump(args.db, args.out, args.level, args.archive)
+        else:
+            print(f"📦 Importing {args.in_path} -> {args.db}")
+            counts = import_dump(args.db, args.in_path, args.batch_size, args.commit_rows, args.archive)
+    except Exception as e:
+        print(f"❌ {args.command.title()} failed: {e}")
+        sys.exit(1)
+
+    print(f"✅ {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
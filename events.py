@@ -0,0 +1,257 @@
+# events.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Event Bus
+Domain events emitted after database writes commit
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Type
+
+from config import Config
+
+
+# ==================== DOMAIN EVENTS ====================
+@dataclass(frozen=True)
+class DomainEvent:
+    """Base class for all domain events"""
+
+
+@dataclass(frozen=True)
+class ThreadCreated(DomainEvent):
+    thread_id: int
+    forum_id: int
+    creator_id: int
+
+
+@dataclass(frozen=True)
+class ReplyPosted(DomainEvent):
+    reply_id: int
+    thread_id: int
+    forum_id: int
+    user_id: int
+
+
+@dataclass(frozen=True)
+class TournamentCreated(DomainEvent):
+    tournament_id: int
+    creator_id: int
+
+
+@dataclass(frozen=True)
+class TournamentJoined(DomainEvent):
+    tournament_id: int
+    user_id: int
+
+
+@dataclass(frozen=True)
+class TournamentCompleted(DomainEvent):
+    tournament_id: int
+    winner_id: int
+
+
+@dataclass(frozen=True)
+class UserFollowed(DomainEvent):
+    follower_id: int
+    followed_id: int
+
+
+@dataclass(frozen=True)
+class UserUnfollowed(DomainEvent):
+    follower_id: int
+    followed_id: int
+
+
+@dataclass(frozen=True)
+class ForumFollowed(DomainEvent):
+    user_id: int
+    forum_id: int
+
+
+@dataclass(frozen=True)
+class ForumUnfollowed(DomainEvent):
+    user_id: int
+    forum_id: int
+
+
+@dataclass(frozen=True)
+class BadgeAwarded(DomainEvent):
+    user_id: int
+    badge_name: str
+
+
+@dataclass(frozen=True)
+class LevelUp(DomainEvent):
+    user_id: int
+    old_level: int
+    new_level: int
+
+
+# ==================== EVENT BUS ====================
+class EventBus:
+    """In-process event bus with a bounded queue.
+
+    Events published while the worker is running are queued and handled in
+    the background, so subscribers never delay the caller. Nothing is dropped
+    or reordered: once the queue is full, events line up in an overflow that
+    the worker moves into the queue in order as it makes room. Producers on
+    the loop call wait_for_room() before starting new work; publishers on
+    other threads are held until there is room, so they never overflow.
+    In synchronous mode, or before start(), events are dispatched inline.
+    """
+
+    def __init__(self, max_queue_size: int = Config.EVENT_QUEUE_SIZE, synchronous: bool = Config.EVENT_BUS_SYNCHRONOUS):
+        self.max_queue_size = max_queue_size
+        self.synchronous = synchronous
+        self.subscribers: Dict[Type[DomainEvent], List[Callable]] = defaultdict(list)
+        self.metrics = {
+            'published': 0,
+            'queued': 0,
+            'dispatched': 0,
+            'backpressured': 0,
+            'handler_errors': 0,
+            'queue_high_water': 0,
+            'overflow_high_water': 0,
+            'queue_lag_total': 0.0,
+            'queue_lag_max': 0.0
+        }
+        self._queue = None
+        self._worker = None
+        self._room = None
+        self._overflow = deque()
+        self._loop = None
+        self._loop_thread = None
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: Callable):
+        """Register handler(event) for an event type, handler may be async"""
+        self.subscribers[event_type].append(handler)
+
+    def publish(self, event: DomainEvent):
+        """Publish event, called after the write it describes has committed"""
+        self.metrics['published'] += 1
+
+        if self.synchronous or self._worker is None:
+            self._dispatch_inline(event)
+        elif threading.get_ident() == self._loop_thread:
+            self._enqueue(event)
+        else:
+            asyncio.run_coroutine_threadsafe(self._enqueue_when_room(event), self._loop).result()
+
+    def _enqueue(self, event: DomainEvent):
+        """Put event on the queue, or behind earlier events in the overflow"""
+        item = (time.monotonic(), event)
+        if self._overflow or self._queue.full():
+            self.metrics['backpressured'] += 1
+            self._overflow.append(item)
+            self.metrics['overflow_high_water'] = max(self.metrics['overflow_high_water'], len(self._overflow))
+            return
+
+        self._queue.put_nowait(item)
+        self._count_queued()
+
+    async def _enqueue_when_room(self, event: DomainEvent):
+        """Enqueue for a publisher on another thread, which is held until there is room"""
+        await self.wait_for_room()
+        if self._worker is None:
+            self._dispatch_inline(event)
+        else:
+            self._enqueue(event)
+
+    def _refill(self):
+        """Move overflowed events into the queue in order, as far as it has room"""
+        while self._overflow and not self._queue.full():
+            self._queue.put_nowait(self._overflow.popleft())
+            self._count_queued()
+        if not self._overflow:
+            self._room.set()
+
+    def _count_queued(self):
+        self.metrics['queued'] += 1
+        self.metrics['queue_high_water'] = max(self.metrics['queue_high_water'], self._queue.qsize())
+
+    def _dispatch_inline(self, event: DomainEvent):
+        """Run handlers immediately in the caller"""
+        for handler in self.subscribers.get(type(event), []):
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    try:
+                        asyncio.get_running_loop().create_task(result)
+                    except RuntimeError:
+                        asyncio.run(result)
+            except Exception as e:
+                self.metrics['handler_errors'] += 1
+                logging.error(f"Error in {type(event).__name__} handler: {e}")
+        self.metrics['dispatched'] += 1
+
+    async def _dispatch(self, event: DomainEvent):
+        """Run handlers for one event on the worker"""
+        for handler in self.subscribers.get(type(event), []):
+            try:
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.metrics['handler_errors'] += 1
+                logging.error(f"Error in {type(event).__name__} handler: {e}")
+        self.metrics['dispatched'] += 1
+
+    async def _run(self):
+        """Worker loop draining the queue"""
+        while True:
+            enqueued_at, event = await self._queue.get()
+            self._refill()
+            lag = time.monotonic() - enqueued_at
+            self.metrics['queue_lag_total'] += lag
+            self.metrics['queue_lag_max'] = max(self.metrics['queue_lag_max'], lag)
+            try:
+                await self._dispatch(event)
+            finally:
+                self._queue.task_done()
+
+    async def start(self):
+        """Start background dispatching on the running loop"""
+        if self.synchronous or self._worker is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._room = asyncio.Event()
+        self._worker = self._loop.create_task(self._run(), name='event-bus')
+
+    async def stop(self):
+        """Drain pending events and stop the worker"""
+        if self._worker is None:
+            return
+
+        # Every get refills from the overflow, so an empty queue means an empty overflow
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+
+    async def wait_for_room(self):
+        """Backpressure for producers: wait until the queue has room and the overflow is empty"""
+        while self._queue is not None and (self._queue.full() or self._overflow):
+            self._room.clear()
+            await self._room.wait()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get bus counters and backpressure stats"""
+        metrics = dict(self.metrics)
+        metrics['queue_depth'] = self._queue.qsize() if self._queue else 0
+        metrics['queue_capacity'] = self.max_queue_size
+        metrics['overflow_depth'] = len(self._overflow)
+        dequeued = metrics['queued'] - metrics['queue_depth']
+        metrics['queue_lag_avg'] = metrics['queue_lag_total'] / dequeued if dequeued else 0.0
+        return metrics
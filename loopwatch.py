@@ -0,0 +1,136 @@
+# loopwatch.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Event Loop Watchdog
+Measures event loop lag and captures the stack of code that blocks it
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import List, Optional, Tuple
+
+from config import Config
+from metrics import registry, active_handlers
+
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Wrappers that sit on every handler stack and never block by themselves
+INSTRUMENTATION_FILES = {'metrics.py', 'loopwatch.py'}
+
+loop_lag_seconds = registry.histogram(
+    'soccerforum_loop_lag_seconds', "Delay between a scheduled heartbeat and when it ran")
+loop_stalls = registry.counter(
+    'soccerforum_loop_stalls_total', "Heartbeats overdue past the threshold", ('handler', 'location'))
+loop_stall_seconds = registry.histogram(
+    'soccerforum_loop_stall_seconds', "How long the loop stayed blocked per stall", ('handler',))
+
+
+class LoopWatchdog:
+    """Heartbeat task on the loop plus a thread that notices when it stops beating.
+
+    When the heartbeat is overdue by more than the threshold, the watcher
+    thread snapshots the loop thread's stack, attributes it to the handler
+    running in the current task and reports it once per stall.
+    """
+
+    def __init__(self, interval: float = Config.LOOP_LAG_INTERVAL, threshold_ms: float = Config.LOOP_LAG_THRESHOLD_MS,
+                 stack_depth: int = Config.LOOP_LAG_STACK_DEPTH):
+        self.interval = interval
+        self.threshold = threshold_ms / 1000
+        self.stack_depth = stack_depth
+        self._loop = None
+        self._loop_thread = None
+        self._heartbeat = None
+        self._watcher = None
+        self._stopping = threading.Event()
+        self._last_beat = 0.0
+        self._stall: Optional[Tuple[str, str]] = None
+
+    async def start(self):
+        """Start measuring lag on the running loop"""
+        if self._heartbeat is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self._heartbeat = self._loop.create_task(self._beat(), name='loop-watchdog')
+        self._watcher = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watcher.start()
+
+    async def stop(self):
+        if self._heartbeat is None:
+            return
+
+        self._stopping.set()
+        self._heartbeat.cancel()
+        try:
+            await self._heartbeat
+        except asyncio.CancelledError:
+            pass
+        self._watcher.join(timeout=self.interval * 2)
+        self._heartbeat = None
+        self._watcher = None
+
+    async def _beat(self):
+        """Sleep for one interval and record how late the wakeup was"""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            loop_lag_seconds.observe(lag)
+            self._last_beat = now
+
+            stall, self._stall = self._stall, None
+            if stall:
+                handler, location = stall
+                loop_stall_seconds.observe(lag, handler)
+                logging.warning(f"Event loop unblocked after {lag * 1000:.0f} ms ({handler} at {location})")
+
+    def _watch(self):
+        """Runs on its own thread so it keeps going while the loop is stuck"""
+        while not self._stopping.wait(self.interval / 2):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue >= self.threshold and self._stall is None:
+                try:
+                    self._report(overdue)
+                except Exception as e:
+                    logging.error(f"Error capturing blocked loop stack: {e}")
+
+    def _report(self, overdue: float):
+        """Capture the loop thread's stack and attribute it to the running handler"""
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+
+        stack = traceback.extract_stack(frame)
+        handler = self._active_handler()
+        location = self._blocking_location(stack)
+        self._stall = (handler, location)
+        loop_stalls.inc(handler, location)
+
+        formatted = "".join(traceback.format_list(stack[-self.stack_depth:]))
+        logging.warning(
+            f"Event loop blocked for {overdue * 1000:.0f} ms+ in {handler} at {location}\n{formatted.rstrip()}"
+        )
+
+    def _active_handler(self) -> str:
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return 'loop'
+        return active_handlers.get(task) or f"task:{task.get_name()}"
+
+    @staticmethod
+    def _blocking_location(stack: List[traceback.FrameSummary]) -> str:
+        """Innermost frame in project code, e.g. datamanager.py:get_feed"""
+        for frame in reversed(stack):
+            if (frame.filename.startswith(PROJECT_DIR) and 'site-packages' not in frame.filename
+                    and os.path.basename(frame.filename) not in INSTRUMENTATION_FILES):
+                return f"{os.path.basename(frame.filename)}:{frame.name}"
+        return f"{os.path.basename(stack[-1].filename)}:{stack[-1].name}" if stack else 'unknown'
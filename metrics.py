@@ -0,0 +1,365 @@
+# metrics.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Metrics
+Counters and histograms for handlers, DB time and Bot API calls,
+served in Prometheus text format or dumped to a file
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from telegram import Update
+from telegram.request import BaseRequest
+
+from config import Config
+
+
+# Seconds, tuned for sub-millisecond DB calls up to slow Bot API round trips
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# DB seconds charged to the update being handled, None outside a handler
+_request_db_time: ContextVar[Optional[List[float]]] = ContextVar('request_db_time', default=None)
+# Set while a DB method runs so nested calls are not charged twice
+_in_db_call: ContextVar[bool] = ContextVar('in_db_call', default=False)
+
+# Task -> "kind:route" for handlers currently running, read by the loop watchdog
+active_handlers: Dict[asyncio.Task, str] = {}
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[Any, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[Any, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}" for labels, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[Any, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, [list(entry[0]), entry[1], entry[2]]) for labels, entry in self._values.items())
+
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus gauges read from callbacks at scrape time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, documentation, labelnames))
+
+    def gauge_callback(self, name: str, documentation: str, collect: Callable[[], Dict[str, float]]):
+        """Register collect() -> {label value: number}, exposed with a `name` label"""
+        self._gauges[name] = (documentation, collect)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+
+        for name, (documentation, collect) in self._gauges.items():
+            try:
+                values = collect()
+            except Exception as e:
+                logging.error(f"Error collecting gauge {name}: {e}")
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in sorted(values.items()):
+                lines.append(f'{name}{{name="{_escape(key)}"}} {float(value):g}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+handler_seconds = registry.histogram(
+    'soccerforum_handler_seconds', "Time spent handling an update", ('kind', 'route'))
+handler_errors = registry.counter(
+    'soccerforum_handler_errors_total', "Handlers that raised", ('kind', 'route'))
+request_db_seconds = registry.histogram(
+    'soccerforum_request_db_seconds', "Database time charged to one update", ('kind', 'route'))
+db_call_seconds = registry.histogram(
+    'soccerforum_db_call_seconds', "Time per SuperDatabase method call", ('method',))
+api_seconds = registry.histogram(
+    'soccerforum_api_seconds', "Outbound Bot API call latency", ('endpoint',))
+api_errors = registry.counter(
+    'soccerforum_api_errors_total', "Bot API calls that failed or returned an error status", ('endpoint',))
+callbacks_throttled = registry.counter(
+    'soccerforum_callbacks_throttled_total', "Callback queries refused by the rate limiter", ('route',))
+user_data_evicted = registry.counter(
+    'soccerforum_user_data_evicted_total', "Users whose conversation state was dropped", ('reason',))
+edits_skipped = registry.counter(
+    'soccerforum_edits_skipped_total', "Card edits skipped because the message already showed the card", ('route',))
+
+
+# ==================== ROUTE LABELS ====================
+# Callback data the bot's keyboards produce. Clients can send any string, so
+# everything else shares the 'unknown' label instead of minting new series.
+CALLBACK_ROUTES = frozenset({
+    'menu', 'help', 'guide', 'settings', 'quick_play', 'cancel',
+    'profile', 'profile_stats', 'profile_badges', 'profile_achievements', 'profile_edit',
+    'forums', 'forum_my', 'forum_popular', 'forum_recent', 'forum_search',
+    'social', 'social_find', 'social_following', 'social_followers', 'social_leaderboard',
+    'social_recommended', 'social_top', 'player_search',
+    'tournaments', 'tournament_create', 'tournament_my', 'tournament_leaderboard',
+    'leaderboard', 'leaderboard_week', 'leaderboard_month', 'leaderboard_all'
+})
+# Followed by one or two ids, e.g. thread_replies_{id}_{id}
+CALLBACK_ROUTE_PREFIXES = (
+    'feed_more_', 'forum_view_', 'forum_threads_', 'forum_popular_', 'forum_follow_', 'forum_unfollow_',
+    'thread_view_', 'thread_replies_', 'thread_create_', 'reply_create_',
+    'social_view_', 'social_threads_', 'social_follow_', 'social_unfollow_', 'player_search_page_',
+    'tournament_view_', 'tournament_join_', 'tournament_leave_', 'tournament_participants_',
+    'tournament_fixtures_', 'tournament_winner_', 'tournament_win_',
+    'leaderboard_week_', 'leaderboard_month_', 'leaderboard_all_'
+)
+_ID_PATTERN = re.compile(r'\d+')
+_ID_SUFFIX = re.compile(r'\d+(?:_\d+)?')
+
+
+def callback_route(update: Update) -> str:
+    """Known callback data with ids collapsed, e.g. thread_view_{id}, else 'unknown'"""
+    query = update.callback_query if isinstance(update, Update) else None
+    if query is None or not query.data:
+        return 'unknown'
+    
+    data = query.data
+    if data in CALLBACK_ROUTES:
+        return data
+    for prefix in CALLBACK_ROUTE_PREFIXES:
+        if data.startswith(prefix) and _ID_SUFFIX.fullmatch(data, len(prefix)):
+            return prefix + _ID_PATTERN.sub('{id}', data[len(prefix):])
+    return 'unknown'
+
+
+# ==================== INSTRUMENTATION ====================
+def track_handler(kind: str, handler: Callable, route: Optional[str] = None) -> Callable:
+    """Wrap an async handler to record latency, errors and DB time.
+
+    Without a fixed route the label is taken from the callback data. Returns
+    the handler untouched when metrics are disabled.
+    """
+    if not Config.METRICS_ENABLED:
+        return handler
+
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        label = route or callback_route(update)
+        task = asyncio.current_task()
+        active_handlers[task] = f"{kind}:{label}"
+        db_time = [0.0]
+        token = _request_db_time.set(db_time)
+        started = time.perf_counter()
+        try:
+            return await handler(update, context)
+        except Exception:
+            handler_errors.inc(kind, label)
+            raise
+        finally:
+            handler_seconds.observe(time.perf_counter() - started, kind, label)
+            request_db_seconds.observe(db_time[0], kind, label)
+            _request_db_time.reset(token)
+            active_handlers.pop(task, None)
+
+    return wrapper
+
+
+def _timed_db_method(name: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if _in_db_call.get():
+            return method(*args, **kwargs)
+
+        token = _in_db_call.set(True)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_db_call.reset(token)
+            db_call_seconds.observe(elapsed, name)
+            db_time = _request_db_time.get()
+            if db_time is not None:
+                db_time[0] += elapsed
+
+    return wrapper
+
+
+def instrument_database(db) -> None:
+    """Time every public method of a SuperDatabase instance"""
+    if not Config.METRICS_ENABLED:
+        return
+
+    for name, member in inspect.getmembers(type(db), inspect.isfunction):
+        if name.startswith('_') or name == 'get_connection':
+            continue
+        setattr(db, name, _timed_db_method(name, getattr(db, name)))
+
+
+class TimedRequest(BaseRequest):
+    """BaseRequest wrapper recording latency per Bot API endpoint"""
+
+    def __init__(self, inner: BaseRequest):
+        self.inner = inner
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return self.inner.read_timeout
+
+    async def initialize(self):
+        await self.inner.initialize()
+
+    async def shutdown(self):
+        await self.inner.shutdown()
+
+    async def do_request(self, url: str, method: str, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None) -> Tuple[int, bytes]:
+        endpoint = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        try:
+            code, payload = await self.inner.do_request(
+                url, method, request_data=request_data, read_timeout=read_timeout,
+                write_timeout=write_timeout, connect_timeout=connect_timeout, pool_timeout=pool_timeout
+            )
+        except Exception:
+            api_errors.inc(endpoint)
+            raise
+        finally:
+            api_seconds.observe(time.perf_counter() - started, endpoint)
+
+        if code >= 400:
+            api_errors.inc(endpoint)
+        return code, payload
+
+
+# ==================== EXPORT ====================
+class MetricsServer:
+    """Minimal HTTP server answering GET /metrics on a local port"""
+
+    def __init__(self, host: str = Config.METRICS_HOST, port: int = Config.METRICS_PORT):
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            logging.error(f"Error starting metrics server on {self.host}:{self.port}: {e}")
+            return
+        logging.info(f"Metrics available on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers, the request body is never used
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b'\r\n', b'\n', b''):
+                pass
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, body = '200 OK', registry.render().encode()
+            else:
+                status, body = '404 Not Found', b'Not found\n'
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except Exception as e:
+            logging.error(f"Error serving metrics: {e}")
+        finally:
+            writer.close()
+
+
+def dump_metrics(path: str):
+    """Write the current metrics to path atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
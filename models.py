@@ -0,0 +1,156 @@
+# models.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Row Models
+Compact __slots__ records returned by SuperDatabase getters
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Type, TypeVar
+
+R = TypeVar('R', bound='Record')
+
+
+class Record:
+    """Base for slot-based rows.
+
+    Only the columns a query selects are set. Item access and get() mirror
+    the dicts these rows replace, so cards keep using row['title'].
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def row_factory(cls, cursor, values):
+        """sqlite3 row factory building one record per fetched row"""
+        record = object.__new__(cls)
+        for column, value in zip(cursor.description, values):
+            setattr(record, column[0], value)
+        return record
+
+    @classmethod
+    def from_row(cls: Type[R], row, columns: Tuple[str, ...], prefix: str = '') -> R:
+        """Build a record from some columns of a wider row, e.g. one side of a JOIN"""
+        record = object.__new__(cls)
+        for column in columns:
+            setattr(record, column, row[prefix + column])
+        return record
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+        record = object.__new__(cls)
+        for key, value in data.items():
+            setattr(record, key, value)
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> List[str]:
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def __eq__(self, other) -> bool:
+        return type(other) is type(self) and other.to_dict() == self.to_dict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+class User(Record):
+    __slots__ = (
+        'telegram_id', 'username', 'full_name', 'role', 'level', 'experience', 'threads_created',
+        'replies_posted', 'tournaments_joined', 'reputation', 'created_at', 'last_active',
+        'post_count', 'badge_count', 'following_count', 'follower_count', 'is_following',
+        'points', 'threads', 'replies'  # windowed leaderboard aggregates
+    )
+
+    PROFILE = (
+        "u.telegram_id, u.username, u.full_name, u.role, u.level, u.experience, u.threads_created, "
+        "u.replies_posted, u.tournaments_joined, u.reputation, u.created_at, u.last_active"
+    )
+    LISTING = "u.telegram_id, u.username, u.level, u.reputation"
+
+
+class Forum(Record):
+    __slots__ = (
+        'id', 'name', 'slug', 'description', 'category', 'icon', 'color',
+        'thread_count', 'reply_count', 'is_featured', 'created_at', 'is_following'
+    )
+
+    DETAIL = (
+        "f.id, f.name, f.slug, f.description, f.category, f.icon, f.color, "
+        "f.thread_count, f.reply_count, f.is_featured, f.created_at"
+    )
+    SUMMARY = "f.id, f.name, f.icon, f.thread_count, f.reply_count"
+
+
+class Thread(Record):
+    __slots__ = (
+        'id', 'title', 'content', 'forum_id', 'creator_id', 'reply_count', 'views', 'is_pinned',
+        'is_locked', 'last_reply_at', 'created_at', 'hot_score', 'hot_updated_at',
+        'creator_name', 'forum_name'
+    )
+
+    DETAIL = (
+        "t.id, t.title, t.content, t.forum_id, t.creator_id, t.reply_count, t.views, "
+        "t.is_pinned, t.is_locked, t.last_reply_at, t.created_at"
+    )
+    # Lists never show the body, which is most of a thread's bytes
+    SUMMARY = "t.id, t.title, t.forum_id, t.creator_id, t.reply_count, t.views, t.created_at"
+
+
+class Reply(Record):
+    __slots__ = ('id', 'content', 'thread_id', 'user_id', 'created_at', 'username')
+
+    DETAIL = "r.id, r.content, r.thread_id, r.user_id, r.created_at"
+
+
+class Tournament(Record):
+    __slots__ = (
+        'id', 'name', 'game_version', 'max_teams', 'description', 'creator_id', 'status',
+        'current_teams', 'prize_pool', 'rules', 'banner_url', 'created_at', 'creator_name'
+    )
+
+    DETAIL = (
+        "t.id, t.name, t.game_version, t.max_teams, t.description, t.creator_id, t.status, "
+        "t.current_teams, t.prize_pool, t.rules, t.banner_url, t.created_at"
+    )
+    SUMMARY = "t.id, t.name, t.game_version, t.max_teams, t.creator_id, t.status, t.current_teams, t.created_at"
+
+
+@lru_cache(maxsize=None)
+def column_names(projection: str) -> Tuple[str, ...]:
+    """Names a projection like "t.id, t.title" selects"""
+    return tuple(part.strip().split('.')[-1] for part in projection.split(','))
+
+
+def prefixed(projection: str, prefix: str) -> str:
+    """The projection with each column renamed prefix + name, so two models can share a row"""
+    return ", ".join(f"{part.strip()} AS {prefix}{name}" for part, name in zip(projection.split(','), column_names(projection)))
+
+
+def fetch_all(conn, model: Type[R], sql: str, params=()) -> List[R]:
+    """Run a query and build `model` records instead of sqlite3.Row"""
+    cursor = conn.cursor()
+    cursor.row_factory = model.row_factory
+    return cursor.execute(sql, params).fetchall()
+
+
+def fetch_one(conn, model: Type[R], sql: str, params=()) -> Optional[R]:
+    cursor = conn.cursor()
+    cursor.row_factory = model.row_factory
+    return cursor.execute(sql, params).fetchone()
@@ -0,0 +1,124 @@
+# profiler.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Sampling Profiler
+Samples the event loop thread's stack for a fixed time and writes a
+hotspot report plus a collapsed-stack file for flame graphs
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Any, Tuple
+
+from config import Config
+
+
+# Leaf functions that mean the loop was waiting for work, not running code
+IDLE_FUNCTIONS = {('selectors.py', 'select'), ('selectors.py', '_select')}
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Periodically snapshots one thread's stack from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float = Config.PROFILE_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        # Stack of code objects (root first) -> samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.duration = 0.0
+
+    def run(self, seconds: float):
+        """Sample for `seconds`, blocking the calling thread"""
+        started = time.monotonic()
+        deadline = started + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+        self.duration = time.monotonic() - started
+
+    def _record(self, frame):
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+
+        self.samples += 1
+        leaf = codes[-1]
+        if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_FUNCTIONS:
+            self.idle_samples += 1
+            return
+        self.stacks[tuple(codes)] += 1
+
+    def hotspots(self) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        """(self samples, inclusive samples) per function, busiest first"""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for codes, count in self.stacks.items():
+            own[_frame_label(codes[-1])] += count
+            for label in {_frame_label(code) for code in codes}:
+                inclusive[label] += count
+        return own.most_common(), inclusive.most_common()
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        own, _ = self.hotspots()
+        busy = self.samples - self.idle_samples
+        return {
+            'seconds': self.duration,
+            'samples': self.samples,
+            'busy_percent': busy * 100 / self.samples if self.samples else 0.0,
+            'top': [(label, count * 100 / busy) for label, count in own[:top]] if busy else []
+        }
+
+    def write_reports(self, directory: str = Config.PROFILE_OUTPUT_DIR) -> Tuple[str, str]:
+        """Write the hotspot report and collapsed stacks, returns their paths"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        report_path = os.path.join(directory, f"profile-{stamp}.txt")
+        collapsed_path = os.path.join(directory, f"profile-{stamp}.collapsed")
+
+        own, inclusive = self.hotspots()
+        busy = self.samples - self.idle_samples
+        with open(report_path, 'w') as f:
+            f.write(f"Sampled {self.samples} stacks over {self.duration:.1f}s every {self.interval * 1000:.1f} ms\n")
+            f.write(f"Loop busy in {busy} samples ({self.summary()['busy_percent']:.1f}%), idle in {self.idle_samples}\n\n")
+            for title, rows in (("Self time", own), ("Inclusive time", inclusive)):
+                f.write(f"{title} (% of busy samples)\n")
+                for label, count in rows[:50]:
+                    f.write(f"  {count * 100 / busy if busy else 0:6.2f}%  {count:7d}  {label}\n")
+                f.write("\n")
+
+        with open(collapsed_path, 'w') as f:
+            for codes, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                f.write(";".join(_frame_label(code) for code in codes) + f" {count}\n")
+
+        return report_path, collapsed_path
+
+
+_profile_lock = asyncio.Lock()
+
+
+async def profile_loop(seconds: float) -> Tuple[SamplingProfiler, str, str]:
+    """Profile the running loop's thread without blocking it, one run at a time"""
+    if _profile_lock.locked():
+        raise RuntimeError("A profile is already running")
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(threading.get_ident())
+        sampler = threading.Thread(target=profiler.run, args=(seconds,), name='profiler', daemon=True)
+        sampler.start()
+        while sampler.is_alive():
+            await asyncio.sleep(0.1)
+        report_path, collapsed_path = profiler.write_reports()
+        return profiler, report_path, collapsed_path
@@ -0,0 +1,187 @@
+# querylog.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Query Instrumentation
+Per-statement timing and a slow query log with captured plans
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+
+from config import Config
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and literals so equivalent statements share a key"""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def params_shape(params: Any) -> str:
+    """Describe parameters by type and size without logging their values"""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {_value_shape(value)}" for key, value in params.items()) + "}"
+    return "(" + ", ".join(_value_shape(value) for value in params) + ")"
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+class QueryStats:
+    """Count, total and max time per normalized statement"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[float]] = {}
+        self._slow_logger = None
+
+    def record(self, key: str, elapsed: float, executed: bool):
+        """Add elapsed seconds to a statement, counting it once per execute"""
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [0, 0.0, 0.0]
+            if executed:
+                entry[0] += 1
+            entry[1] += elapsed
+
+    def record_max(self, key: str, elapsed: float):
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry and elapsed > entry[2]:
+                entry[2] = elapsed
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Statements ordered by total time"""
+        with self._lock:
+            rows = [
+                {'sql': key, 'count': int(count), 'total_ms': total * 1000, 'max_ms': max_elapsed * 1000,
+                 'avg_ms': total * 1000 / count if count else 0.0}
+                for key, (count, total, max_elapsed) in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def log_slow(self, conn: sqlite3.Connection, sql: str, params: Any, elapsed: float):
+        """Write a slow statement with its parameter shape and query plan"""
+        try:
+            plan_rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+            plan = "\n".join(f"    {row[3]}" for row in plan_rows) or "    (no plan)"
+        except sqlite3.Error as e:
+            plan = f"    (plan unavailable: {e})"
+
+        if self._slow_logger is None:
+            self._slow_logger = logging.getLogger('soccerforum.slow_queries')
+            self._slow_logger.propagate = False
+            handler = logging.FileHandler(Config.SLOW_QUERY_LOG_PATH)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self._slow_logger.addHandler(handler)
+            self._slow_logger.setLevel(logging.INFO)
+
+        self._slow_logger.info(
+            f"{elapsed * 1000:.1f} ms {normalize_sql(sql)}\n  params: {params_shape(params)}\n  plan:\n{plan}"
+        )
+        logging.warning(f"Slow query ({elapsed * 1000:.1f} ms): {normalize_sql(sql)[:120]}")
+
+
+query_stats = QueryStats()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that charges execute and fetch time to the statement"""
+
+    def _begin(self, sql: str, params: Any):
+        self._sql = sql
+        self._params = params
+        self._key = normalize_sql(sql)
+        self._elapsed = 0.0
+        self._slow_logged = False
+
+    def _charge(self, elapsed: float, executed: bool = False):
+        self._elapsed += elapsed
+        query_stats.record(self._key, elapsed, executed)
+        query_stats.record_max(self._key, self._elapsed)
+        if not self._slow_logged and self._elapsed * 1000 >= Config.SLOW_QUERY_THRESHOLD_MS:
+            self._slow_logged = True
+            query_stats.log_slow(self.connection, self._sql, self._params, self._elapsed)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - started, executed=True)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, None)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - started, executed=True)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._charge(time.perf_counter() - started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(size if size is not None else self.arraysize)
+        finally:
+            self._charge(time.perf_counter() - started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._charge(time.perf_counter() - started)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            self._charge(time.perf_counter() - started)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors record per-statement timing"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute builds a plain cursor internally, route it through ours
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection, instrumented only when Config.QUERY_STATS_ENABLED"""
+    if Config.QUERY_STATS_ENABLED:
+        return sqlite3.connect(db_path, factory=InstrumentedConnection)
+    return sqlite3.connect(db_path)
@@ -0,0 +1,70 @@
+# ratelimit.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Rate Limiting
+In-memory token buckets that throttle button taps per user and per route
+"""
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from config import Config
+
+
+class TokenBuckets:
+    """Token buckets keyed by anything hashable.
+
+    A bucket left alone for burst / rate seconds has refilled completely, so
+    it is forgotten then without changing any decision. Keys are kept in
+    last-use order, which makes that eviction a pop from the front.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = Config.THROTTLE_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_after = burst / rate
+        # key -> (tokens, updated_at), least recently used first
+        self.buckets: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def allow(self, key: Hashable, now: float = None, cost: float = 1.0) -> bool:
+        """Take `cost` tokens from key's bucket, False if it doesn't hold that many"""
+        if now is None:
+            now = time.monotonic()
+        entry = self.buckets.pop(key, None)
+        tokens = self.burst if entry is None else min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = (tokens, now)
+        self.evict(now)
+        return allowed
+
+    def evict(self, now: float = None):
+        """Forget refilled buckets, and the least recently used past max_keys"""
+        if now is None:
+            now = time.monotonic()
+        buckets = self.buckets
+        while buckets:
+            key, (_, updated_at) = next(iter(buckets.items()))
+            if now - updated_at < self.idle_after and len(buckets) <= self.max_keys:
+                break
+            del buckets[key]
+
+
+class CallbackThrottle:
+    """Per-user budget for all taps plus a tighter one for repeating a route"""
+
+    def __init__(self):
+        self.users = TokenBuckets(Config.THROTTLE_USER_RATE, Config.THROTTLE_USER_BURST)
+        self.routes = TokenBuckets(Config.THROTTLE_ROUTE_RATE, Config.THROTTLE_ROUTE_BURST)
+
+    def __len__(self) -> int:
+        return len(self.users) + len(self.routes)
+
+    def allow(self, user_id: int, route: str) -> bool:
+        now = time.monotonic()
+        return self.users.allow(user_id, now) and self.routes.allow((user_id, route), now)
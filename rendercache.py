@@ -0,0 +1,80 @@
+# rendercache.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Edit Deduplication
+Remembers what each recent bot message shows so re-rendering the same card
+into it costs no Bot API call
+"""
+
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from telegram import CallbackQuery, InlineKeyboardMarkup, Message
+from telegram.error import BadRequest
+
+from config import Config
+
+
+def fingerprint(text: str, reply_markup: Optional[InlineKeyboardMarkup] = None, parse_mode: Optional[str] = None) -> int:
+    """Hash of everything an edit can change; keyboards hash and compare by their buttons"""
+    return hash((text, reply_markup, parse_mode))
+
+
+class RenderedMessages:
+    """(chat_id, message_id) -> fingerprint of its last rendering.
+
+    Every edit of a bot message has to go through edit() (or forget() the
+    message), otherwise a stale fingerprint would swallow a real change.
+    Holds at most `capacity` messages, least recently touched evicted first.
+    """
+
+    def __init__(self, capacity: int = Config.RENDERED_MESSAGES_SIZE):
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def remember(self, key: Tuple[int, int], rendered: int):
+        self.entries[key] = rendered
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def forget(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def shows(self, key: Tuple[int, int], rendered: int) -> bool:
+        if self.entries.get(key) != rendered:
+            return False
+        self.entries.move_to_end(key)
+        return True
+
+    async def edit(self, query: CallbackQuery, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                   parse_mode: Optional[str] = None) -> bool:
+        """Edit the query's message unless it already shows this, True if an edit was sent"""
+        rendered = fingerprint(text, reply_markup, parse_mode)
+        # Inline-mode messages have no chat message, always edit those
+        key = (query.message.chat_id, query.message.message_id) if query.message else None
+        if key and self.shows(key, rendered):
+            return False
+
+        try:
+            await query.edit_message_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        except BadRequest as e:
+            # Shown before we started remembering it (e.g. across a restart)
+            if 'not modified' not in str(e).lower():
+                self.forget(key)
+                raise
+        except Exception:
+            self.forget(key)
+            raise
+        if key:
+            self.remember(key, rendered)
+        return True
+
+    async def reply(self, message: Message, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                    parse_mode: Optional[str] = None) -> Message:
+        """Send a new message and remember what it shows"""
+        sent = await message.reply_text(text, reply_markup=reply_markup, parse_mode=parse_mode)
+        self.remember((sent.chat_id, sent.message_id), fingerprint(text, reply_markup, parse_mode))
+        return sent
@@ -0,0 +1,238 @@
+# seed_data.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Synthetic Data Seeder
+Fills a database with realistic, skewed community data for benchmarking
+
+Usage:
+    python seed_data.py --db bench.db --users 100000 --threads 50000 --replies 100000
+"""
+
+import argparse
+import logging
+import random
+import time
+from itertools import accumulate
+from typing import Dict, List, Any
+
+from config import Config
+from datamanager import SuperDatabase
+
+
+SEED_BATCH_SIZE = 10000
+SEED_HISTORY_DAYS = 90
+
+
+class ZipfSampler:
+    """Sample ids where rank k is chosen with weight 1 / k ** s"""
+
+    def __init__(self, ids: List[int], s: float, rng: random.Random):
+        self.ids = ids
+        self.rng = rng
+        self.cum_weights = list(accumulate(1.0 / rank ** s for rank in range(1, len(ids) + 1)))
+
+    def sample(self, k: int = 1) -> List[int]:
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights, k=k)
+
+
+def _timestamp(rng: random.Random, now: float, max_age_days: int = SEED_HISTORY_DAYS) -> str:
+    """Random SQLite timestamp within the history window"""
+    seconds_ago = rng.random() ** 2 * max_age_days * 86400  # skew towards recent
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(now - seconds_ago))
+
+
+def _insert_batches(conn, sql: str, rows, batch_size: int = SEED_BATCH_SIZE):
+    """executemany in fixed-size batches so generators stay lazy"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def recompute_counters(conn):
+    """Recompute denormalized counters from the seeded rows"""
+    conn.execute(
+        "UPDATE forums SET "
+        "thread_count = (SELECT COUNT(*) FROM threads t WHERE t.forum_id = forums.id), "
+        "reply_count = (SELECT COUNT(*) FROM replies r JOIN threads t ON r.thread_id = t.id WHERE t.forum_id = forums.id)"
+    )
+    conn.execute(
+        "UPDATE threads SET reply_count = (SELECT COUNT(*) FROM replies r WHERE r.thread_id = threads.id), "
+        "last_reply_at = COALESCE((SELECT MAX(r.created_at) FROM replies r WHERE r.thread_id = threads.id), created_at)"
+    )
+    conn.execute(
+        "UPDATE tournaments SET current_teams = "
+        "(SELECT COUNT(*) FROM tournament_participants p WHERE p.tournament_id = tournaments.id)"
+    )
+    conn.execute(
+        "UPDATE users SET "
+        "threads_created = (SELECT COUNT(*) FROM threads t WHERE t.creator_id = users.telegram_id), "
+        "replies_posted = (SELECT COUNT(*) FROM replies r WHERE r.user_id = users.telegram_id), "
+        "tournaments_joined = (SELECT COUNT(*) FROM tournament_participants p WHERE p.user_id = users.telegram_id)"
+    )
+    conn.execute(
+        "UPDATE user_stats SET "
+        "post_count = (SELECT COUNT(*) FROM replies r WHERE r.user_id = user_stats.user_id), "
+        "badge_count = (SELECT COUNT(*) FROM user_badges b WHERE b.user_id = user_stats.user_id), "
+        "following_count = (SELECT COUNT(*) FROM user_follows f WHERE f.follower_id = user_stats.user_id), "
+        "follower_count = (SELECT COUNT(*) FROM user_follows f WHERE f.followed_id = user_stats.user_id)"
+    )
+
+
+def seed_database(db_path: str, users: int = 1000, threads: int = 500, replies: int = 2000, follows: int = 2000,
+                  forum_follows: int = 1000, tournaments: int = 20, participants: int = 200, badges: int = 100,
+                  zipf_s: float = 1.1, seed: int = 42) -> Dict[str, Any]:
+    """Seed db_path with synthetic data, returns row counts"""
+    rng = random.Random(seed)
+    now = time.time()
+    db = SuperDatabase(db_path)
+
+    with db.get_connection() as conn:
+        first_user = (conn.execute("SELECT MAX(telegram_id) FROM users").fetchone()[0] or 0) + 1
+        user_ids = list(range(first_user, first_user + users))
+        # A handful of power users produce most content and gather most followers
+        active_users = ZipfSampler(user_ids, zipf_s, rng)
+
+        _insert_batches(
+            conn,
+            "INSERT INTO users (telegram_id, username, full_name, experience, reputation, created_at, last_active) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (user_id, f"player_{user_id}", f"Player {user_id}", int(rng.paretovariate(1.2) * 20),
+                 int(rng.paretovariate(1.5) * 5), _timestamp(rng, now, 365), _timestamp(rng, now))
+                for user_id in user_ids
+            )
+        )
+        _insert_batches(conn, "INSERT INTO user_stats (user_id) VALUES (?)", ((user_id,) for user_id in user_ids))
+
+        forum_ids = [row[0] for row in conn.execute("SELECT id FROM forums ORDER BY id")]
+        popular_forums = ZipfSampler(forum_ids, zipf_s, rng)
+
+        first_thread = (conn.execute("SELECT MAX(id) FROM threads").fetchone()[0] or 0) + 1
+        thread_authors = active_users.sample(threads)
+        thread_forums = popular_forums.sample(threads)
+        _insert_batches(
+            conn,
+            "INSERT INTO threads (title, content, forum_id, creator_id, views, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (f"Thread {i} about tactics", "Synthetic content " * rng.randint(1, 20), thread_forums[i],
+                 thread_authors[i], int(rng.paretovariate(1.1) * 10), _timestamp(rng, now))
+                for i in range(threads)
+            )
+        )
+
+        if threads:
+            thread_ids = list(range(first_thread, first_thread + threads))
+            # Reply volume is skewed towards a few hot threads
+            hot_threads = ZipfSampler(rng.sample(thread_ids, len(thread_ids)), zipf_s, rng)
+            reply_threads = hot_threads.sample(replies)
+            reply_authors = active_users.sample(replies)
+            _insert_batches(
+                conn,
+                "INSERT INTO replies (content, thread_id, user_id, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    ("Synthetic reply " * rng.randint(1, 10), reply_threads[i], reply_authors[i], _timestamp(rng, now))
+                    for i in range(replies)
+                )
+            )
+
+        followed = active_users.sample(follows)
+        _insert_batches(
+            conn,
+            "INSERT OR IGNORE INTO user_follows (follower_id, followed_id, created_at) VALUES (?, ?, ?)",
+            (
+                (rng.choice(user_ids), followed_id, _timestamp(rng, now))
+                for followed_id in followed
+            )
+        )
+        conn.execute("DELETE FROM user_follows WHERE follower_id = followed_id")
+
+        _insert_batches(
+            conn,
+            "INSERT OR IGNORE INTO forum_follows (user_id, forum_id) VALUES (?, ?)",
+            ((rng.choice(user_ids), forum_id) for forum_id in popular_forums.sample(forum_follows))
+        )
+
+        first_tournament = (conn.execute("SELECT MAX(id) FROM tournaments").fetchone()[0] or 0) + 1
+        statuses = ['pending'] * 6 + ['active'] * 3 + ['completed']
+        _insert_batches(
+            conn,
+            "INSERT INTO tournaments (name, game_version, max_teams, description, creator_id, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (f"Cup {i}", rng.choice(['FIFA 14', 'FIFA 16', 'eFootball 2025']), Config.MAX_TOURNAMENT_TEAMS,
+                 "Synthetic tournament", rng.choice(thread_authors or user_ids), rng.choice(statuses), _timestamp(rng, now))
+                for i in range(tournaments)
+            )
+        )
+
+        if tournaments:
+            tournament_ids = ZipfSampler(list(range(first_tournament, first_tournament + tournaments)), zipf_s, rng)
+            _insert_batches(
+                conn,
+                "INSERT OR IGNORE INTO tournament_participants (tournament_id, user_id, joined_at) VALUES (?, ?, ?)",
+                (
+                    (tournament_id, user_id, _timestamp(rng, now))
+                    for tournament_id, user_id in zip(tournament_ids.sample(participants), active_users.sample(participants))
+                )
+            )
+
+        badge_names = [row[0] for row in conn.execute("SELECT name FROM badges ORDER BY id")]
+        _insert_batches(
+            conn,
+            "INSERT INTO user_badges (user_id, badge_name, awarded_at) VALUES (?, ?, ?)",
+            (
+                (user_id, rng.choice(badge_names), _timestamp(rng, now))
+                for user_id in active_users.sample(badges)
+            )
+        )
+
+        recompute_counters(conn)
+        conn.execute(f"UPDATE users SET level = {db.LEVEL_FOR_EXPERIENCE_SQL}", (0,))
+        db.backfill_hot_scores(conn)
+        conn.execute("DELETE FROM activity_rollup")
+        db.backfill_activity_rollup(conn)
+
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ['users', 'threads', 'replies', 'user_follows', 'forum_follows',
+                          'tournaments', 'tournament_participants', 'user_badges']
+        }
+
+    conn.execute("ANALYZE")
+    conn.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a SoccerForum database with synthetic data")
+    parser.add_argument('--db', default='seed.db', help="Database path (created if missing)")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=500)
+    parser.add_argument('--replies', type=int, default=2000)
+    parser.add_argument('--follows', type=int, default=2000)
+    parser.add_argument('--forum-follows', type=int, default=1000)
+    parser.add_argument('--tournaments', type=int, default=20)
+    parser.add_argument('--participants', type=int, default=200)
+    parser.add_argument('--badges', type=int, default=100)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Zipf exponent for activity skew")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = seed_database(
+        args.db, users=args.users, threads=args.threads, replies=args.replies, follows=args.follows,
+        forum_follows=args.forum_follows, tournaments=args.tournaments, participants=args.participants,
+        badges=args.badges, zipf_s=args.zipf, seed=args.seed
+    )
+    print(f"🌱 Seeded {args.db} in {time.perf_counter() - started:.1f}s")
+    for table, count in counts.items():
+        print(f"   {table}: {count}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
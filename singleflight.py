@@ -0,0 +1,44 @@
+# singleflight.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Read Coalescing
+Identical reads running at the same time share one query instead of each
+hitting SQLite
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """At most one call per key in flight; callers arriving meanwhile await it.
+
+    Lives on the event loop: the call itself should do its blocking work off
+    the loop (asyncio.to_thread), otherwise nothing can arrive while it runs.
+    Nothing is kept once the call returns, so this never serves a result
+    older than a query that was already running when the caller arrived.
+    Waiters get the very same object, which must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0  # calls answered by another caller's query
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            flight.add_done_callback(lambda done: self._land(key, done))
+        else:
+            self.shared += 1
+        # One caller giving up (e.g. its update timing out) must not cancel
+        # the query for everyone else waiting on it
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            flight.exception()  # retrieved by the waiters, keep asyncio from warning
@@ -0,0 +1,147 @@
+# spamguard.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Duplicate Post Detection
+MinHash signatures of post text and a bounded LSH index of recent posts
+for near-duplicate lookup
+"""
+
+import array
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+from zlib import crc32
+
+from config import Config
+
+
+_WORDS = re.compile(r'\w+')
+_EMPTY = 1 << 32  # larger than any bucket value
+
+
+def normalize(text: str) -> str:
+    """Case-folded words joined by single spaces, so punctuation and spacing tricks don't matter"""
+    return ' '.join(_WORDS.findall(text.casefold()))
+
+
+def minhash(text: str, size: int = Config.SPAM_SIGNATURE_SIZE, shingle_size: int = Config.SPAM_SHINGLE_SIZE,
+            min_length: int = Config.SPAM_MIN_LENGTH) -> Optional[Tuple[int, ...]]:
+    """One-permutation MinHash of the text's character shingles, None if too short.
+
+    Each shingle is hashed once (crc32 is stable across restarts, unlike
+    hash()) and its low bits pick one of `size` buckets that keeps its
+    minimum, so the cost is about one C call per shingle.
+    """
+    normalized = normalize(text).encode()
+    if len(normalized) < min_length:
+        return None
+
+    hashes = set(map(crc32, [normalized[i:i + shingle_size] for i in range(len(normalized) - shingle_size + 1)]))
+    # Visiting hashes largest first leaves each bucket holding its minimum
+    filled = {h % size: h // size for h in sorted(hashes, reverse=True)}
+    mins = [filled.get(bucket, _EMPTY) for bucket in range(size)]
+
+    # Short posts leave buckets empty: borrow the next filled one so that
+    # two empty buckets don't count as agreement
+    for i in range(size):
+        if mins[i] == _EMPTY:
+            j = 1
+            while mins[(i + j) % size] == _EMPTY:
+                j += 1
+            mins[i] = mins[(i + j) % size]
+    return tuple(mins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def pack_signature(signature: Tuple[int, ...]) -> bytes:
+    """4 bytes per bucket for the fingerprint table"""
+    return array.array('I', signature).tobytes()
+
+
+def unpack_signature(blob: bytes) -> Tuple[int, ...]:
+    values = array.array('I')
+    values.frombytes(blob)
+    return tuple(values)
+
+
+class DuplicateIndex:
+    """Recent signatures bucketed by LSH bands of `band_rows` values each.
+
+    Posts sharing any band are candidates and are confirmed by estimated
+    similarity. Holds at most `capacity` entries no older than `window`
+    seconds, oldest evicted first.
+    """
+
+    def __init__(self, capacity: int = Config.SPAM_INDEX_CAPACITY, window: float = Config.SPAM_WINDOW,
+                 band_rows: int = Config.SPAM_BAND_ROWS, threshold: float = Config.SPAM_SIMILARITY):
+        self.capacity = capacity
+        self.window = window
+        self.band_rows = band_rows
+        self.threshold = threshold
+        # seq -> (packed signature, user_id, created_at), oldest first
+        self.entries: OrderedDict = OrderedDict()
+        # band key -> seq, or a set of seqs when several posts share it. One
+        # flat dict with plain ints for the common unshared case keeps this small
+        self.bands: Dict[int, Any] = {}
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        rows = self.band_rows
+        return [hash((band,) + signature[band * rows:(band + 1) * rows]) for band in range(len(signature) // rows)]
+
+    def add(self, signature: Tuple[int, ...], user_id: int, created_at: float = None):
+        seq = self._next_seq
+        self._next_seq += 1
+        self.entries[seq] = (pack_signature(signature), user_id, created_at or time.time())
+        for key in self._band_keys(signature):
+            members = self.bands.get(key)
+            if members is None:
+                self.bands[key] = seq
+            elif isinstance(members, set):
+                members.add(seq)
+            else:
+                self.bands[key] = {members, seq}
+        self.evict()
+
+    def evict(self, now: float = None):
+        """Drop entries past capacity or older than the window"""
+        cutoff = (now or time.time()) - self.window
+        while self.entries:
+            seq, (packed, _, created_at) = next(iter(self.entries.items()))
+            if len(self.entries) <= self.capacity and created_at >= cutoff:
+                break
+            del self.entries[seq]
+            for key in self._band_keys(unpack_signature(packed)):
+                members = self.bands.get(key)
+                if isinstance(members, set):
+                    members.discard(seq)
+                    if len(members) == 1:
+                        self.bands[key] = members.pop()
+                elif members == seq:
+                    del self.bands[key]
+
+    def matches(self, signature: Tuple[int, ...], now: float = None) -> List[Tuple[bytes, int, float]]:
+        """(packed signature, user_id, created_at) of entries at least `threshold`
+        similar to signature and inside the window"""
+        cutoff = (now or time.time()) - self.window
+        candidates = set()
+        for key in self._band_keys(signature):
+            members = self.bands.get(key)
+            if isinstance(members, set):
+                candidates |= members
+            elif members is not None:
+                candidates.add(members)
+
+        found = []
+        for seq in candidates:
+            entry = self.entries[seq]
+            if entry[2] >= cutoff and similarity(unpack_signature(entry[0]), signature) >= self.threshold:
+                found.append(entry)
+        return found
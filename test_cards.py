@@ -0,0 +1,136 @@
+# test_cards.py
+"""
+🎮 SOCCERFORUM SUPER BOT - Card Query Tests
+Every card built on a fused SuperDatabase read renders from one statement
+"""
+
+import asyncio
+
+import pytest
+
+from bot import CardSystem
+from config import Config
+from datamanager import SuperDatabase
+from querylog import query_stats
+from seed_data import seed_database
+
+
+@pytest.fixture(scope='module')
+def seeded(tmp_path_factory):
+    """Small seeded database with some threads archived, counted by querylog"""
+    workdir = tmp_path_factory.mktemp('cards')
+    db_path, archive_path = str(workdir / 'cards.db'), str(workdir / 'cards-archive.db')
+    seed_database(db_path, users=60, threads=80, replies=600, follows=200, forum_follows=40, tournaments=3,
+                  participants=40, badges=40)
+
+    with pytest.MonkeyPatch.context() as patch:
+        # Only connections opened while this is set are instrumented
+        patch.setattr(Config, 'QUERY_STATS_ENABLED', True)
+        db = SuperDatabase(db_path, archive_path=archive_path)
+        with db.get_connection() as conn:
+            conn.execute(
+                "UPDATE threads SET created_at = datetime('now', '-400 days'), last_reply_at = datetime('now', '-400 days') "
+                "WHERE id % 4 = 0"
+            )
+            conn.execute(
+                "INSERT INTO forums (name, slug, description, category, icon, color, is_featured) "
+                "VALUES ('Empty', 'empty', 'No threads yet', 'fifa', '🎮', '#e74c3c', 0)"
+            )
+        db.archive_old_threads(older_than_days=30)
+        # First attach sets the archive file up, later ones are what a card pays
+        db.get_connection(archive=True).close()
+        yield db
+
+
+@pytest.fixture
+def cards(seeded):
+    return CardSystem(seeded)
+
+
+def pick(db: SuperDatabase, sql: str, params=()) -> int:
+    with db.get_connection(archive=True) as conn:
+        row = conn.execute(sql, params).fetchone()
+    assert row, f"seed data has no row for: {sql}"
+    return row[0]
+
+
+def statements(build) -> int:
+    """Statements executed while rendering one card"""
+    query_stats.reset()
+    card = asyncio.run(build())
+    assert 'Oops!' not in card['text']
+    return sum(row['count'] for row in query_stats.snapshot())
+
+
+CASES = {
+    'forums_menu_following': lambda db: (
+        'create_forums_menu', pick(db, "SELECT user_id FROM forum_follows")
+    ),
+    'forums_menu_following_none': lambda db: (
+        'create_forums_menu', pick(db, "SELECT telegram_id FROM users WHERE telegram_id NOT IN (SELECT user_id FROM forum_follows)")
+    ),
+    'forum_card': lambda db: (
+        'create_forum_card', pick(db, "SELECT user_id FROM forum_follows"), pick(db, "SELECT forum_id FROM forum_follows")
+    ),
+    'forum_card_without_threads': lambda db: (
+        'create_forum_card', pick(db, "SELECT telegram_id FROM users"),
+        pick(db, "SELECT id FROM forums WHERE id NOT IN (SELECT forum_id FROM threads)")
+    ),
+    'thread_card': lambda db: (
+        'create_thread_card', pick(db, "SELECT telegram_id FROM users"),
+        pick(db, "SELECT thread_id FROM replies GROUP BY thread_id HAVING COUNT(*) > 3")
+    ),
+    'thread_card_without_replies': lambda db: (
+        'create_thread_card', pick(db, "SELECT telegram_id FROM users"),
+        pick(db, "SELECT id FROM threads WHERE id NOT IN (SELECT thread_id FROM replies)")
+    ),
+    'profile_card_own': lambda db: (
+        'create_user_profile_card', *[pick(db, "SELECT user_id FROM user_badges")] * 2
+    ),
+    'profile_card_followed': lambda db: (
+        'create_user_profile_card', pick(db, "SELECT follower_id FROM user_follows"),
+        pick(db, "SELECT followed_id FROM user_follows WHERE follower_id = (SELECT follower_id FROM user_follows)")
+    ),
+    'profile_card_without_badges': lambda db: (
+        'create_user_profile_card', pick(db, "SELECT telegram_id FROM users"),
+        pick(db, "SELECT telegram_id FROM users WHERE telegram_id NOT IN (SELECT user_id FROM user_badges)")
+    )
+}
+
+
+@pytest.mark.parametrize('case', list(CASES))
+def test_card_renders_from_one_statement(seeded, cards, case):
+    method, *args = CASES[case](seeded)
+    assert statements(lambda: getattr(cards, method)(*args)) == 1
+
+
+def test_archived_thread_card(seeded, cards):
+    """Miss in the live tables, attach check and ATTACH, then the one archive read"""
+    thread_id = pick(seeded, "SELECT id FROM archive.threads")
+    user_id = pick(seeded, "SELECT telegram_id FROM users")
+    assert statements(lambda: cards.create_thread_card(user_id, thread_id)) == 4
+
+
+def test_statements_are_counted(seeded):
+    """Guards the test itself: a plain two-query read must show up as two"""
+    user_id = pick(seeded, "SELECT telegram_id FROM users")
+    query_stats.reset()
+    seeded.get_user(user_id)
+    seeded.get_quick_stats()
+    assert sum(row['count'] for row in query_stats.snapshot()) >= 2
+
+
+def test_declare_winner_card_pages_every_participant(seeded, cards):
+    """Tournament lookup plus one JOINed page of players, and every player is reachable"""
+    tournament_id = pick(seeded, "SELECT tournament_id FROM tournament_participants GROUP BY tournament_id "
+                                 f"HAVING COUNT(*) > {Config.TOURNAMENT_PLAYERS_PAGE_SIZE}")
+    creator_id = pick(seeded, "SELECT creator_id FROM tournaments WHERE id = ?", (tournament_id,))
+    shown, page = [], 0
+    while page is not None:
+        assert statements(lambda: cards.create_declare_winner_card(creator_id, tournament_id, page)) == 2
+        card = asyncio.run(cards.create_declare_winner_card(creator_id, tournament_id, page))
+        buttons = [button.callback_data for row in card['reply_markup'].inline_keyboard for button in row]
+        shown += [data for data in buttons if data.startswith('tournament_win_')]
+        page = page + 1 if f"tournament_winner_{tournament_id}_{page + 1}" in buttons else None
+    participants = seeded.get_tournament_participants(tournament_id)
+    assert sorted(shown) == sorted(f"tournament_win_{tournament_id}_{user_id}" for user_id in participants)